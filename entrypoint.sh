@@ -8,27 +8,10 @@ while ! nc -z -w 1 $POSTGRES_HOST $POSTGRES_PORT; do
 done
 echo "PostgreSQL is up and running!"
 
-# Create and apply migrations
-echo "Creating migrations..."
-python manage.py makemigrations
-
-echo "Applying migrations..."
-python manage.py migrate
-
-# Load initial data
-echo "Loading initial data..."
-python manage.py load_initial_data
-
-# Create superuser
-echo "Creating superuser..."
-python manage.py shell -c "
-from django.contrib.auth.models import User
-if not User.objects.filter(username='admin').exists():
-    User.objects.create_superuser('admin', 'admin@example.com', 'admin')
-    print('Superuser created.')
-else:
-    print('Superuser already exists.')
-"
+# Collect static files, apply migrations, load initial data and create the superuser
+# in one process.
+# Migrations are generated during development and committed, never at container start.
+python manage.py bootstrap || exit 1
 
 # Run the command provided as arguments to this script
-exec "$@" 
\ No newline at end of file
+exec "$@"
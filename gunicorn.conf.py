@@ -0,0 +1,61 @@
+"""
+Gunicorn configuration, loaded automatically from the working directory.
+
+Workers are threaded: the staff order stream holds a request open for minutes,
+which would take a whole sync worker out of service. A stream still holds one
+thread, so each process serves at most ORDER_STREAM_MAX_STREAMS of them and keeps
+its other threads for customers. Every value can be overridden with the
+GUNICORN_* environment variable next to it.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Each thread may hold a database connection, so workers * threads bounds connections;
+# keep threads above ORDER_STREAM_MAX_STREAMS
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Load Django once in the master; workers share its memory copy-on-write
+preload_app = True
+
+# Recycle workers gradually so leaks cannot build up, staggered by the jitter so
+# workers do not all restart at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+
+
+def when_ready(server):
+    from django.db import connections
+
+    from menu_app.services import warmup_service
+
+    timings = warmup_service.warm_code()
+    # Forked workers must open their own connections
+    connections.close_all()
+    # Keep the garbage collector from writing to the preloaded objects, which would
+    # copy their pages into every worker
+    gc.freeze()
+    server.log.info(
+        'Warmed code in master: '
+        + ', '.join(f'{step} {seconds * 1000:.0f} ms' for step, seconds in timings.items())
+    )
+
+
+def post_fork(server, worker):
+    from menu_app.services import warmup_service
+
+    timings = warmup_service.warm_data()
+    server.log.info(
+        f'Worker {worker.pid} warmed: '
+        + ', '.join(f'{step} {seconds * 1000:.0f} ms' for step, seconds in timings.items())
+    )
@@ -1,4 +1,8 @@
+from decimal import Decimal
+
 from django.contrib import admin
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 
 from menu_app.models.inventory import InventoryItem
 from menu_app.models.menu_item import MenuItem
@@ -10,23 +14,72 @@ class MenuItemAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'price')
     list_filter = ('category',)
     search_fields = ('name',)
+    show_full_result_count = False
 
 
 @admin.register(InventoryItem)
 class InventoryItemAdmin(admin.ModelAdmin):
-    list_display = ('menu_item', 'quantity')
+    list_display = ('menu_item_name', 'quantity', 'is_low_stock')
+    list_select_related = ('menu_item',)
+    list_filter = ('is_low_stock',)
     search_fields = ('menu_item__name',)
+    autocomplete_fields = ('menu_item',)
+    show_full_result_count = False
+
+    @admin.display(description='Menu item', ordering='menu_item__name')
+    def menu_item_name(self, obj):
+        return obj.menu_item.name
 
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 1
     readonly_fields = ('price_at_time_of_order',)
+    # A select listing every menu item would be rendered once per inline row
+    autocomplete_fields = ('menu_item',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('menu_item')
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('id', 'status', 'created_at', 'total_price')
+    list_display = ('id', 'status', 'created_at', 'order_total')
     list_filter = ('status', 'created_at')
     inlines = [OrderItemInline]
     readonly_fields = ('created_at', 'updated_at')
+    # Counting every order on each changelist page is a full scan
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # A correlated subquery is only evaluated for the orders on the page, unlike a
+        # join with GROUP BY, which aggregates every order before paginating
+        totals = (
+            OrderItem.objects.filter(order_id=OuterRef('pk'))
+            .order_by()
+            .values('order_id')
+            .annotate(
+                total=Sum(
+                    ExpressionWrapper(
+                        F('quantity') * F('price_at_time_of_order'),
+                        output_field=DecimalField(max_digits=10, decimal_places=2),
+                    )
+                )
+            )
+            .values('total')
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                _total=Coalesce(
+                    Subquery(totals, output_field=DecimalField(max_digits=10, decimal_places=2)),
+                    Value(0),
+                    output_field=DecimalField(max_digits=10, decimal_places=2),
+                )
+            )
+        )
+
+    @admin.display(description='Total price', ordering='_total')
+    def order_total(self, obj):
+        return obj._total.quantize(Decimal('0.01'))
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MenuAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'menu_app'
+
+    def ready(self):
+        from menu_app import signals  # noqa: F401
+        from menu_app.services import inventory_events, order_events  # noqa: F401
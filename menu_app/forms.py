@@ -4,6 +4,9 @@ from menu_app.models.menu_item import MenuItem
 
 
 class MenuForm(forms.ModelForm):
+    # Not a model field on the form, so the submitted version is compared, never saved
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
     class Meta:
         model = MenuItem
         fields = ['name', 'price', 'category']
@@ -12,3 +15,8 @@ class MenuForm(forms.ModelForm):
             'price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'category': forms.Select(attrs={'class': 'form-control'}),
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['version'].initial = self.instance.version
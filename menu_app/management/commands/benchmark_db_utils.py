@@ -0,0 +1,64 @@
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.menu_item import MenuItem
+from menu_app.services import db_utils
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the per-call overhead of db_utils updates: field metadata rebuilt per '
+        'call versus cached, and full-row saves versus partial updates. '
+        'Rows are created in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Calls per case')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        def rebuilt():
+            return {f.name: f for f in InventoryItem._meta.get_fields()}
+
+        def cached():
+            return db_utils.get_model_fields(InventoryItem)
+
+        self._report('field map, rebuilt per call', self._time(rebuilt, iterations), iterations)
+        self._report('field map, cached', self._time(cached, iterations), iterations)
+
+        with transaction.atomic():
+            menu_item = MenuItem.objects.create(
+                name=f'Benchmark {uuid.uuid4().hex[:8]}', category='main', price=Decimal('1.00')
+            )
+            item = InventoryItem.objects.create(menu_item=menu_item, quantity=iterations * 2)
+
+            def full_save():
+                # What update_model_instance did before fields were cached and writes partial
+                fields = rebuilt()
+                fields['quantity'].validate(item.quantity - 1, item)
+                item.quantity -= 1
+                item.save()
+
+            def partial_update():
+                db_utils.update_model_instance(item, quantity=item.quantity - 1)
+
+            self._report('rebuilt fields, full save', self._time(full_save, iterations), iterations)
+            self._report(
+                'update_model_instance()', self._time(partial_update, iterations), iterations
+            )
+            transaction.set_rollback(True)
+
+    def _time(self, call, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call()
+        return time.perf_counter() - started
+
+    def _report(self, label, elapsed, iterations):
+        self.stdout.write(f'{label:>28}: {elapsed / iterations * 1_000_000:9.1f} us/call')
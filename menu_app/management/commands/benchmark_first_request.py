@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from menu_app.services import warmup_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the latency of the first requests a fresh process serves, and its '
+        'throughput afterwards, with or without the gunicorn worker warm-up. Run it '
+        'once with --warm and once without; each run must be a new process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--warm', action='store_true', help='Warm up before measuring')
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Path to request (repeatable; default /menu/ and /menu/catalog.json)',
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Requests per path')
+        parser.add_argument(
+            '--host', help='Host header to send (default: the first of ALLOWED_HOSTS)'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/menu/', '/menu/catalog.json']
+        client = Client(
+            HTTP_HOST=options['host'] or next(iter(settings.ALLOWED_HOSTS), 'localhost')
+        )
+
+        if options['warm']:
+            started = time.perf_counter()
+            warmup_service.warm_code()
+            warmup_service.warm_data()
+            self.stdout.write(f'warm-up: {(time.perf_counter() - started) * 1000:.1f} ms')
+
+        for path in paths:
+            started = time.perf_counter()
+            response = client.get(path)
+            first = time.perf_counter() - started
+            if response.status_code != 200:
+                self.stdout.write(
+                    self.style.WARNING(f'{path}: status {response.status_code}, skipped')
+                )
+                continue
+
+            started = time.perf_counter()
+            for _ in range(options['requests']):
+                client.get(path)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{path}: first request {first * 1000:.1f} ms, '
+                f'then {options["requests"] / elapsed:.0f} requests/s'
+            )
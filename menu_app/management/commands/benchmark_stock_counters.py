@@ -0,0 +1,78 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.menu_item import MenuItem
+from menu_app.services import reservation_service, shard_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent checkout stock decrements on a single inventory row versus '
+        'sharded counters. Run it against PostgreSQL; SQLite locks the whole database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers')
+        parser.add_argument(
+            '--operations', type=int, default=200, help='Decrements per writer and mode'
+        )
+        parser.add_argument('--shards', type=int, default=8, help='Shards in the sharded mode')
+        parser.add_argument(
+            '--hold-ms',
+            type=float,
+            default=5.0,
+            help='Time each transaction keeps running after its decrement, '
+            'standing in for the rest of a checkout',
+        )
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        operations = options['operations']
+        menu_item = MenuItem.objects.create(
+            name=f'Benchmark {uuid.uuid4().hex[:8]}', category='main', price=Decimal('1.00')
+        )
+        InventoryItem.objects.create(menu_item=menu_item, quantity=threads * operations * 2)
+
+        try:
+            for shard_count in (1, options['shards']):
+                shard_service.configure_sharding(menu_item, shard_count)
+                elapsed = self._run(menu_item.id, threads, operations, options['hold_ms'] / 1000)
+                label = 'single row' if shard_count == 1 else f'{shard_count} shards'
+                self.stdout.write(
+                    f'{label:>12}: {threads * operations / elapsed:8.1f} decrements/s '
+                    f'({elapsed:.2f}s)'
+                )
+        finally:
+            menu_item.delete()
+
+    def _run(self, menu_item_id, threads, operations, hold):
+        errors = []
+
+        def writer():
+            try:
+                for _ in range(operations):
+                    with transaction.atomic():
+                        reservation_service.consume_holds(None, {menu_item_id: 1})
+                        time.sleep(hold)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=writer) for _ in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            self.stderr.write(self.style.WARNING(f'{len(errors)} writers failed: {errors[0]}'))
+        return elapsed
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from menu_app.models import MenuItem
+
+# Held while bootstrapping, so containers starting together do not migrate concurrently
+BOOTSTRAP_LOCK_ID = 0x4D41_B007
+# Written into STATIC_ROOT after collecting, to detect when sources have not changed
+STATIC_STAMP = '.bootstrap-static'
+
+
+class Command(BaseCommand):
+    help = (
+        'Prepare a container start in one process: collect static files, apply pending '
+        'migrations, load the initial menu and create the superuser. Steps with '
+        'nothing to do cost one query or one directory scan each.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--superuser-username',
+            default=os.environ.get('DJANGO_SUPERUSER_USERNAME', 'admin'),
+            help='Username of the superuser to create if missing',
+        )
+        parser.add_argument(
+            '--superuser-email',
+            default=os.environ.get('DJANGO_SUPERUSER_EMAIL', 'admin@example.com'),
+            help='Email of the superuser to create if missing',
+        )
+        parser.add_argument('--skip-seed', action='store_true', help='Do not load the initial menu')
+        parser.add_argument(
+            '--skip-static', action='store_true', help='Do not collect static files'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with self._lock():
+            if not options['skip_static']:
+                self._step('static files', self._collect_static)
+            self._step('migrations', self._migrate)
+            if not options['skip_seed']:
+                self._step('initial data', self._seed)
+            self._step(
+                'superuser',
+                lambda: self._create_superuser(
+                    options['superuser_username'], options['superuser_email']
+                ),
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Bootstrap finished in {time.perf_counter() - started:.2f}s')
+        )
+
+    @contextmanager
+    def _lock(self):
+        if connection.vendor != 'postgresql':
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s)', [BOOTSTRAP_LOCK_ID])
+            try:
+                yield
+            finally:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [BOOTSTRAP_LOCK_ID])
+
+    def _step(self, name, step):
+        started = time.perf_counter()
+        outcome = step()
+        self.stdout.write(f'{name}: {outcome} ({(time.perf_counter() - started) * 1000:.0f} ms)')
+
+    def _static_sources_hash(self):
+        digest = hashlib.sha256()
+        for finder in get_finders():
+            for path, storage in sorted(finder.list([]), key=lambda found: found[0]):
+                stat = os.stat(storage.path(path))
+                digest.update(f'{path}|{stat.st_size}|{stat.st_mtime_ns}\n'.encode())
+        return digest.hexdigest()
+
+    def _collect_static(self):
+        # STATIC_ROOT is a persistent volume shared with nginx and only seeded from the
+        # image when empty, so the hashed files and manifest are refreshed here
+        stamp = Path(settings.STATIC_ROOT) / STATIC_STAMP
+        sources = self._static_sources_hash()
+        if stamp.exists() and stamp.read_text() == sources:
+            return 'up to date'
+        call_command('collectstatic', interactive=False, verbosity=0)
+        stamp.write_text(sources)
+        return 'collected'
+
+    def _migrate(self):
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan:
+            return 'up to date'
+        call_command('migrate', interactive=False, verbosity=0)
+        return f'applied {len(plan)}'
+
+    def _seed(self):
+        if MenuItem.objects.exists():
+            return 'already loaded'
+        call_command('load_initial_data', stdout=self.stdout)
+        return f'loaded {MenuItem.objects.count()} menu items'
+
+    def _create_superuser(self, username, email):
+        if User.objects.filter(username=username).exists():
+            return 'already exists'
+        User.objects.create_superuser(
+            username, email, os.environ.get('DJANGO_SUPERUSER_PASSWORD', 'admin')
+        )
+        return f'created {username}'
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from menu_app.services import ledger_service, shard_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Fold pending inventory ledger movements into the stock snapshots '
+        'and rebalance sharded stock'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ledger_service.COMPACTION_BATCH_SIZE,
+            help='Movements folded per transaction',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0, help='Seconds to sleep between compactions'
+        )
+        parser.add_argument('--once', action='store_true', help='Compact once and exit')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Inventory ledger compaction started'))
+        try:
+            while True:
+                folded = ledger_service.compact_movements(options['batch_size'])
+                if folded:
+                    self.stdout.write(f'Folded {folded} movements')
+                shard_service.rebalance()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Inventory ledger compaction stopped'))
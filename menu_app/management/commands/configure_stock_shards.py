@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from menu_app.services import menu_utils, shard_service
+
+
+class Command(BaseCommand):
+    help = (
+        "Split a menu item's stock across sharded counters, or merge it back with --shards 1. "
+        'Carts do not hold stock of sharded items, so an item can only be sharded while no '
+        'cart holds it; sharded stock is checked when added to a cart and taken at checkout.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Name of the menu item')
+        parser.add_argument('--shards', type=int, required=True, help='Number of stock shards')
+
+    def handle(self, *args, **options):
+        menu_item = menu_utils.get_menu_item(name=options['name'])
+        if not menu_item:
+            raise CommandError(f'Menu item "{options["name"]}" not found')
+
+        try:
+            shard_service.configure_sharding(menu_item, options['shards'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{menu_item.name} now uses {options["shards"]} stock shards')
+        )
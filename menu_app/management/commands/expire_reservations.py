@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from menu_app.services import idempotency_service, reservation_service
+
+
+class Command(BaseCommand):
+    help = 'Release expired cart stock reservations and checkout idempotency keys in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=reservation_service.SWEEP_BATCH_SIZE,
+            help='Reservations released per transaction',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=30.0, help='Seconds to sleep between sweeps'
+        )
+        parser.add_argument('--once', action='store_true', help='Sweep once and exit')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Reservation sweeper started'))
+        try:
+            while True:
+                released = reservation_service.expire_reservations(options['batch_size'])
+                if released:
+                    self.stdout.write(f'Released {released} expired reservations')
+                deleted = idempotency_service.expire_keys()
+                if deleted:
+                    self.stdout.write(f'Deleted {deleted} expired idempotency keys')
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Reservation sweeper stopped'))
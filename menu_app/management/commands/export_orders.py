@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from menu_app.services import export_service
+
+
+def _date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f'Invalid date: {value}')
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Stream orders and their lines as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=sorted(export_service.EXPORT_FORMATS),
+            default='csv',
+            help='Output format',
+        )
+        parser.add_argument('--start', type=_date, help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--end', type=_date, help='Last day to include (YYYY-MM-DD)')
+        parser.add_argument('--status', help='Only export orders with this status')
+        parser.add_argument('--output', help='File to write to (default: stdout)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=export_service.EXPORT_CHUNK_SIZE,
+            help='Rows fetched from the database at a time',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            chunks = export_service.export_orders(
+                options['format'],
+                start_date=options['start'],
+                end_date=options['end'],
+                status=options['status'],
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f'Orders exported to {options["output"]}'))
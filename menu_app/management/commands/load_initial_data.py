@@ -5,17 +5,18 @@ from django.core.management.base import BaseCommand
 
 from menu_app.models import InventoryItem, MenuItem
 
+DATA_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'data',
+    'initial_menu_items.json',
+)
+
 
 class Command(BaseCommand):
     help = 'Load initial menu items and inventory data from JSON file'
 
     def handle(self, *args, **options):
-        # Get the path to the JSON file
-        data_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            'data',
-            'initial_menu_items.json',
-        )
+        data_file = DATA_FILE
 
         try:
             # Read the JSON file
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from menu_app.services import outbox_service
+
+
+class Command(BaseCommand):
+    help = 'Consume order events from the outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events claimed per batch')
+        parser.add_argument(
+            '--workers', type=int, default=4, help='Threads used to run event handlers'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0, help='Seconds to sleep when the outbox is empty'
+        )
+        parser.add_argument(
+            '--purge-after-days',
+            type=int,
+            default=7,
+            help='Delete processed events older than this many days',
+        )
+        parser.add_argument(
+            '--retry-dead-letters',
+            action='store_true',
+            help=f'Retry events that failed {outbox_service.MAX_ATTEMPTS} times before starting',
+        )
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Outbox worker started (batch={batch_size}, workers={workers})')
+        )
+        purged = outbox_service.purge_processed(options['purge_after_days'])
+        if purged:
+            self.stdout.write(f'Purged {purged} processed events')
+        if options['retry_dead_letters']:
+            retried = outbox_service.retry_dead_letters()
+            self.stdout.write(f'Retrying {retried} dead-lettered events')
+        dead = outbox_service.count_dead_letters()
+        if dead:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{dead} dead-lettered events are waiting; fix their handlers and '
+                    'restart with --retry-dead-letters'
+                )
+            )
+
+        try:
+            while True:
+                claimed = outbox_service.process_batch(batch_size=batch_size, max_workers=workers)
+                if claimed:
+                    self.stdout.write(f'Processed batch of {claimed} events')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Outbox worker stopped'))
@@ -0,0 +1,43 @@
+import random
+
+from django.conf import settings
+
+from menu_app.services import profiling_service
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests from staff that ask for it with ?profile=1 or an X-Profile: 1
+    header, plus a random PROFILING_SAMPLE_RATE share of all requests. The profile's
+    ID is returned in the X-Profile-Id header and listed on the staff profiles page.
+    Streaming responses are profiled until their headers are ready, not while the
+    body streams.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _wants_profile(self, request) -> bool:
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate > 0 and random.random() < rate:
+            return True
+        if request.GET.get('profile') != '1' and request.headers.get('X-Profile') != '1':
+            return False
+        # Only now touch request.user: reading it loads the session, which makes
+        # the response vary on Cookie and splits the edge cache per visitor
+        return request.user.is_staff
+
+    def __call__(self, request):
+        if not self._wants_profile(request):
+            return self.get_response(request)
+
+        with profiling_service.profile() as result:
+            response = self.get_response(request)
+        profile_id = profiling_service.save_profile(
+            result,
+            method=request.method,
+            path=request.get_full_path(),
+            status=response.status_code,
+        )
+        response['X-Profile-Id'] = profile_id
+        return response
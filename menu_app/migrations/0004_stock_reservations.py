@@ -0,0 +1,52 @@
+# Generated by Django 5.1 on 2026-10-18 23:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('menu_app', '0003_order_kitchen_claim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='reserved_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('holder', models.CharField(max_length=64)),
+                ('quantity', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                (
+                    'menu_item',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='reservations',
+                        to='menu_app.menuitem',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'ordering': ['expires_at'],
+                'indexes': [models.Index(fields=['expires_at'], name='reservation_expiry_idx')],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('holder', 'menu_item'), name='unique_reservation_per_holder'
+                    )
+                ],
+            },
+        ),
+    ]
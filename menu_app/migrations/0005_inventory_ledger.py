@@ -0,0 +1,69 @@
+# Generated by Django 5.1 on 2026-10-18 23:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('menu_app', '0004_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('sale', 'Sale'),
+                            ('cancel', 'Cancellation'),
+                            ('restock', 'Restock'),
+                            ('adjustment', 'Adjustment'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ('quantity_change', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('applied_at', models.DateTimeField(blank=True, null=True)),
+                (
+                    'menu_item',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='inventory_movements',
+                        to='menu_app.menuitem',
+                    ),
+                ),
+                (
+                    'order',
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name='inventory_movements',
+                        to='menu_app.order',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Inventory Movement',
+                'verbose_name_plural': 'Inventory Movements',
+                'ordering': ['id'],
+                'indexes': [
+                    models.Index(
+                        condition=models.Q(('applied_at__isnull', True)),
+                        fields=['menu_item', 'id'],
+                        name='movement_pending_idx',
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1 on 2026-10-19 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('menu_app', '0005_inventory_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='StockShard',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name='ID'
+                    ),
+                ),
+                ('index', models.PositiveSmallIntegerField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                (
+                    'menu_item',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='stock_shards',
+                        to='menu_app.menuitem',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'Stock Shard',
+                'verbose_name_plural': 'Stock Shards',
+                'ordering': ['menu_item', 'index'],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('menu_item', 'index'), name='unique_stock_shard'
+                    )
+                ],
+            },
+        ),
+    ]
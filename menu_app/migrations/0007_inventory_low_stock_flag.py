@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-19 00:02
+
+from django.db import migrations, models
+
+
+def flag_low_stock(apps, schema_editor):
+    InventoryItem = apps.get_model('menu_app', 'InventoryItem')
+    InventoryItem.objects.filter(quantity__lte=models.F('low_stock_threshold')).update(
+        is_low_stock=True
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('menu_app', '0006_stock_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='is_low_stock',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_low_stock, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(
+                condition=models.Q(('is_low_stock', True)),
+                fields=['quantity'],
+                name='inventory_low_stock_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-19 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('menu_app', '0008_checkout_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
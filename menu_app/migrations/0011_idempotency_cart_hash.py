@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('menu_app', '0010_order_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='cart_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -3,8 +3,22 @@ Data models for menu management application.
 Defines the database schema and business objects.
 """
 
-from menu_app.models.inventory import InventoryItem
+from menu_app.models.idempotency import IdempotencyKey
+from menu_app.models.inventory import InventoryItem, StockShard
+from menu_app.models.ledger import InventoryMovement
 from menu_app.models.menu_item import MenuItem
 from menu_app.models.order import Order, OrderItem
+from menu_app.models.outbox import OutboxEvent
+from menu_app.models.reservation import StockReservation
 
-__all__ = ['InventoryItem', 'MenuItem', 'Order', 'OrderItem']
+__all__ = [
+    'IdempotencyKey',
+    'InventoryItem',
+    'InventoryMovement',
+    'MenuItem',
+    'Order',
+    'OrderItem',
+    'OutboxEvent',
+    'StockReservation',
+    'StockShard',
+]
@@ -0,0 +1,35 @@
+from typing import ClassVar, List
+
+from django.db import models
+
+from .order import Order
+
+
+class IdempotencyKey(models.Model):
+    """
+    Represents a checkout submission, identified by the key its form or client sent.
+    A retried submission with the same key gets the order the first one placed.
+    """
+
+    # Fields
+    key = models.CharField(max_length=64, unique=True)
+    # Empty while the first submission is still placing its order
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, null=True, blank=True, related_name='+'
+    )
+    # Hash of the cart the key was first used with; a different cart cannot reuse it
+    cart_hash = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        ordering: ClassVar[List[str]] = ['expires_at']
+        indexes: ClassVar[List[models.Index]] = [
+            # The sweeper scans for expired keys
+            models.Index(fields=['expires_at'], name='idempotency_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.key} -> order {self.order_id}'
@@ -14,16 +14,42 @@ class InventoryItem(models.Model):
     # Fields
     menu_item = models.OneToOneField(MenuItem, on_delete=models.CASCADE, related_name='inventory')
     quantity = models.PositiveIntegerField(default=0)
+    # Stock held by live cart reservations, kept as a counter so availability
+    # never has to sum the reservation table
+    reserved_quantity = models.PositiveIntegerField(default=0)
     low_stock_threshold = models.PositiveIntegerField(default=5)
+    # Kept in step with quantity and low_stock_threshold on every change, so the
+    # low-stock list reads the flagged rows instead of scanning the table
+    is_low_stock = models.BooleanField(default=False)
+    # Best-sellers can split their stock across several StockShard rows so concurrent
+    # sales do not queue on this row; quantity then mirrors the shard total
+    shard_count = models.PositiveSmallIntegerField(default=1)
+    # Advanced on every staff stock count, so an editor working from an older copy
+    # is detected; sales and restocks leave it alone
+    version = models.PositiveIntegerField(default=0)
 
     class Meta:
         verbose_name = 'Inventory Item'
         verbose_name_plural = 'Inventory Items'
         ordering: ClassVar[List[str]] = ['menu_item__category', 'menu_item__name']
+        indexes: ClassVar[List[models.Index]] = [
+            models.Index(
+                fields=['quantity'],
+                name='inventory_low_stock_idx',
+                condition=models.Q(is_low_stock=True),
+            ),
+        ]
 
     def __str__(self):
         return f'{self.menu_item.name} - {self.quantity} available'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so signal handlers can detect state transitions
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def clean(self):
         """Validate the inventory item."""
         if self.quantity < 0:
@@ -33,17 +59,29 @@ class InventoryItem(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
+        self.is_low_stock = self.quantity <= self.low_stock_threshold
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'is_low_stock' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'is_low_stock']
         super().save(*args, **kwargs)
 
     @property
-    def is_low_stock(self) -> bool:
-        """Check if the item is low on stock."""
-        return self.quantity <= self.low_stock_threshold
+    def is_sharded(self) -> bool:
+        """Check if the stock is held in shards rather than in this row."""
+        return self.shard_count > 1
+
+    @property
+    def available_quantity(self) -> int:
+        """Stock that is neither sold nor held by a cart."""
+        return max(self.quantity - self.reserved_quantity, 0)
 
     @property
     def is_sold_out(self) -> bool:
-        """Check if the item is sold out."""
-        return self.quantity == 0
+        """
+        Check if the item is sold out. Rows annotated with pending_quantity also
+        count the ledger movements not yet folded into quantity.
+        """
+        return self.quantity + getattr(self, 'pending_quantity', 0) <= 0
 
     def add_stock(self, amount: int) -> None:
         """Add stock to inventory."""
@@ -60,3 +98,26 @@ class InventoryItem(models.Model):
             raise ValueError('Insufficient stock')
         self.quantity -= amount
         self.save()
+
+
+class StockShard(models.Model):
+    """
+    Represents one sub-counter of a sharded menu item's stock.
+    The item's stock is the sum of its shards.
+    """
+
+    # Fields
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='stock_shards')
+    index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Stock Shard'
+        verbose_name_plural = 'Stock Shards'
+        ordering: ClassVar[List[str]] = ['menu_item', 'index']
+        constraints: ClassVar[List[models.BaseConstraint]] = [
+            models.UniqueConstraint(fields=['menu_item', 'index'], name='unique_stock_shard'),
+        ]
+
+    def __str__(self):
+        return f'{self.menu_item.name} shard {self.index} - {self.quantity}'
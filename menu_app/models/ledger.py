@@ -0,0 +1,61 @@
+from typing import ClassVar, List, Tuple
+
+from django.db import models
+
+from .menu_item import MenuItem
+from .order import Order
+
+
+class InventoryMovement(models.Model):
+    """
+    Represents one change to a menu item's stock in the append-only inventory ledger.
+    Movements not yet applied are folded into InventoryItem.quantity by compaction.
+    """
+
+    SALE = 'sale'
+    CANCEL = 'cancel'
+    RESTOCK = 'restock'
+    ADJUSTMENT = 'adjustment'
+    KIND_CHOICES: ClassVar[List[Tuple[str, str]]] = [
+        (SALE, 'Sale'),
+        (CANCEL, 'Cancellation'),
+        (RESTOCK, 'Restock'),
+        (ADJUSTMENT, 'Adjustment'),
+    ]
+
+    # Fields
+    menu_item = models.ForeignKey(
+        MenuItem, on_delete=models.CASCADE, related_name='inventory_movements'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity_change = models.IntegerField()
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='inventory_movements',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    applied_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Inventory Movement'
+        verbose_name_plural = 'Inventory Movements'
+        ordering: ClassVar[List[str]] = ['id']
+        indexes: ClassVar[List[models.Index]] = [
+            # Compaction and stock levels only look at movements not yet applied
+            models.Index(
+                fields=['menu_item', 'id'],
+                name='movement_pending_idx',
+                condition=models.Q(applied_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.quantity_change:+d} {self.menu_item.name}'
+
+    @property
+    def is_applied(self) -> bool:
+        """Check if the movement has been folded into the stock snapshot."""
+        return self.applied_at is not None
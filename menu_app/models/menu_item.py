@@ -19,6 +19,8 @@ class MenuItem(models.Model):
     category = models.CharField(max_length=100, choices=CATEGORY_CHOICES)
     name = models.CharField(max_length=100, unique=True)
     price = models.DecimalField(max_digits=6, decimal_places=2)
+    # Advanced on every staff edit, so an editor working from an older copy is detected
+    version = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering: ClassVar[List[str]] = ['category', 'name']
@@ -28,5 +30,10 @@ class MenuItem(models.Model):
 
     @property
     def is_available(self):
-        """Check if the menu item is available (has inventory and not sold out)."""
-        return hasattr(self, 'inventory') and not self.inventory.is_sold_out
+        """
+        Check if the menu item is available (has inventory and not sold out).
+        Items annotated with pending_quantity also count unfolded ledger movements.
+        """
+        if not hasattr(self, 'inventory'):
+            return False
+        return self.inventory.quantity + getattr(self, 'pending_quantity', 0) > 0
@@ -24,9 +24,24 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    claimed_by = models.CharField(max_length=50, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering: ClassVar[List[str]] = ['-created_at']
+        indexes: ClassVar[List[models.Index]] = [
+            # Kitchen stations claim pending orders oldest first
+            models.Index(
+                fields=['created_at'],
+                name='order_pending_queue_idx',
+                condition=models.Q(status='pending'),
+            ),
+            # The staff dashboard and order list read recent orders by creation time
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            # The dashboard counts orders closed today, and the staff order stream
+            # polls for changes, by last update time
+            models.Index(fields=['updated_at'], name='order_updated_idx'),
+        ]
 
     def __str__(self):
         return f'Order {self.id} ({self.status})'
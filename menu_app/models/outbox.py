@@ -0,0 +1,39 @@
+from typing import ClassVar, List
+
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    Represents a domain event written in the same transaction as the change it
+    describes, and consumed asynchronously by the outbox worker.
+    """
+
+    # Fields
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+        ordering: ClassVar[List[str]] = ['id']
+        indexes: ClassVar[List[models.Index]] = [
+            # The worker only ever scans unprocessed events, oldest first
+            models.Index(
+                fields=['id'],
+                name='outbox_pending_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} #{self.id}'
+
+    @property
+    def is_processed(self) -> bool:
+        """Check if the event has been consumed."""
+        return self.processed_at is not None
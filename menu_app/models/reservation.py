@@ -0,0 +1,42 @@
+from typing import ClassVar, List
+
+from django.db import models
+from django.utils import timezone
+
+from .menu_item import MenuItem
+
+
+class StockReservation(models.Model):
+    """
+    Represents stock held for a customer's cart until it expires or is checked out.
+    The held quantity is also counted in InventoryItem.reserved_quantity.
+    """
+
+    # Fields
+    holder = models.CharField(max_length=64)
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        ordering: ClassVar[List[str]] = ['expires_at']
+        constraints: ClassVar[List[models.BaseConstraint]] = [
+            models.UniqueConstraint(
+                fields=['holder', 'menu_item'], name='unique_reservation_per_holder'
+            ),
+        ]
+        indexes: ClassVar[List[models.Index]] = [
+            # The sweeper scans for expired holds
+            models.Index(fields=['expires_at'], name='reservation_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.quantity} x {self.menu_item.name} held by {self.holder}'
+
+    @property
+    def is_expired(self) -> bool:
+        """Check if the hold has expired."""
+        return self.expires_at <= timezone.now()
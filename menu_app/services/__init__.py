@@ -3,6 +3,36 @@ Service layer for menu management application.
 Provides business logic and data access operations.
 """
 
-from menu_app.services import inventory_service, menu_service, order_service
+from menu_app.services import (
+    admission_service,
+    cache_service,
+    cart_service,
+    export_service,
+    idempotency_service,
+    inventory_service,
+    kitchen_service,
+    ledger_service,
+    low_stock_service,
+    menu_service,
+    order_service,
+    outbox_service,
+    reservation_service,
+    shard_service,
+)
 
-__all__ = ['inventory_service', 'menu_service', 'order_service']
+__all__ = [
+    'admission_service',
+    'cache_service',
+    'cart_service',
+    'export_service',
+    'idempotency_service',
+    'inventory_service',
+    'kitchen_service',
+    'ledger_service',
+    'low_stock_service',
+    'menu_service',
+    'order_service',
+    'outbox_service',
+    'reservation_service',
+    'shard_service',
+]
@@ -0,0 +1,160 @@
+"""
+Admission control for checkouts.
+When a popular item runs low, checkouts for it would all queue on the same stock
+row lock and tie up every worker. Checkouts are therefore admitted before they
+open a transaction: items in the cached sold-out set are turned away at once, and
+each item lets at most CHECKOUT_ITEM_CONCURRENCY checkouts through per process,
+the others waiting up to CHECKOUT_ADMISSION_TIMEOUT for a slot. On PostgreSQL the
+limit also holds across processes, using session-level advisory locks taken before
+the checkout transaction opens, so a waiting checkout holds no row locks.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from menu_app.models import inventory, menu_item
+from menu_app.services import cache_service, db_utils, ledger_service
+
+logger = logging.getLogger(__name__)
+
+SOLD_OUT_KEY = 'checkout:sold_out:{}'
+METRIC_KEY = 'checkout:admission:{}'
+METRICS = ('admitted', 'queued', 'rejected_sold_out', 'rejected_busy')
+# Advisory lock keys are (ADVISORY_LOCK_CLASS + slot, menu item ID)
+ADVISORY_LOCK_CLASS = 0x4D41_0000
+ADVISORY_RETRY_INTERVAL = 0.05
+
+_semaphores: Dict[int, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def _record(metric: str) -> None:
+    key = METRIC_KEY.format(metric)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, timeout=None)
+
+
+def get_metrics() -> Dict[str, int]:
+    """
+    Get the admission counters: checkouts admitted, admitted after waiting for a
+    slot, and turned away because an item was sold out or busy.
+    """
+    values = cache.get_many([METRIC_KEY.format(metric) for metric in METRICS])
+    return {metric: values.get(METRIC_KEY.format(metric), 0) for metric in METRICS}
+
+
+def get_sold_out_ids() -> Set[int]:
+    """
+    Get the IDs of sold-out menu items.
+    The set is cached under the availability version, which is bumped whenever an
+    item sells out or comes back, so it is only rebuilt after such a change.
+    """
+    key = SOLD_OUT_KEY.format(cache_service.get_menu_versions()['availability'])
+    sold_out = cache.get(key)
+    if sold_out is None:
+        # Sold-out items are always flagged low on stock, so this reads the partial index;
+        # restocks still waiting in the ledger bring an item back
+        sold_out = set(
+            db_utils.get_model_queryset(inventory.InventoryItem, is_low_stock=True, quantity=0)
+            .annotate(pending_quantity=ledger_service.pending_quantity_subquery())
+            .filter(pending_quantity__lte=0)
+            .values_list('menu_item_id', flat=True)
+        )
+        cache.set(key, sold_out, settings.CHECKOUT_SOLD_OUT_TIMEOUT)
+    return sold_out
+
+
+def _semaphore(menu_item_id: int) -> threading.BoundedSemaphore:
+    with _semaphores_lock:
+        semaphore = _semaphores.get(menu_item_id)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(settings.CHECKOUT_ITEM_CONCURRENCY)
+            _semaphores[menu_item_id] = semaphore
+        return semaphore
+
+
+def _try_slot(cursor, menu_item_id: int, slot_count: int) -> Optional[Tuple[int, int]]:
+    """Take a free cross-process slot for the item, returning its lock key or None."""
+    # Start at a random slot so concurrent checkouts spread over the slots
+    first = random.randrange(slot_count)
+    for offset in range(slot_count):
+        key = (ADVISORY_LOCK_CLASS + (first + offset) % slot_count, menu_item_id)
+        cursor.execute('SELECT pg_try_advisory_lock(%s, %s)', key)
+        if cursor.fetchone()[0]:
+            return key
+    return None
+
+
+def _release_slot(key: Tuple[int, int]) -> None:
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s, %s)', key)
+    except Exception as e:
+        # Session locks end with the connection, so a broken one frees the slot anyway
+        logger.warning(f'Could not release checkout slot {key}: {e!s}')
+
+
+def _turn_away(menu_item: menu_item.MenuItem) -> RuntimeError:
+    _record('rejected_busy')
+    logger.warning(f'Turned away a checkout for busy menu item {menu_item.id}')
+    return RuntimeError(f'Too many orders for {menu_item.name}, please try again')
+
+
+@contextmanager
+def admit_checkout(menu_items: Dict[int, menu_item.MenuItem]) -> Iterator[None]:
+    """
+    Admit a checkout for the given items for the duration of the block.
+    Slots are taken in ID order, so checkouts sharing items cannot deadlock. Call
+    it outside any transaction: waiting for a slot must not hold row locks.
+
+    Args:
+        menu_items: Dict mapping menu item IDs to the items being ordered
+
+    Raises:
+        RuntimeError: If an item is sold out, or no slot for it frees up in time
+    """
+    sold_out = get_sold_out_ids().intersection(menu_items)
+    if sold_out:
+        _record('rejected_sold_out')
+        raise RuntimeError(f'{menu_items[min(sold_out)].name} is sold out')
+
+    deadline = time.monotonic() + settings.CHECKOUT_ADMISSION_TIMEOUT
+    cross_process = connection.vendor == 'postgresql'
+    queued = False
+    with ExitStack() as held:
+        for menu_item_id in sorted(menu_items):
+            semaphore = _semaphore(menu_item_id)
+            if not semaphore.acquire(blocking=False):
+                queued = True
+                if not semaphore.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                    raise _turn_away(menu_items[menu_item_id])
+            held.callback(semaphore.release)
+
+            if not cross_process:
+                continue
+            with connection.cursor() as cursor:
+                key = _try_slot(cursor, menu_item_id, settings.CHECKOUT_ITEM_CONCURRENCY)
+                while key is None:
+                    if time.monotonic() >= deadline:
+                        raise _turn_away(menu_items[menu_item_id])
+                    queued = True
+                    time.sleep(ADVISORY_RETRY_INTERVAL)
+                    key = _try_slot(cursor, menu_item_id, settings.CHECKOUT_ITEM_CONCURRENCY)
+            held.callback(_release_slot, key)
+
+        if queued:
+            _record('queued')
+        _record('admitted')
+        yield
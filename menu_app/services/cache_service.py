@@ -0,0 +1,130 @@
+"""
+Cache versioning for the customer-facing menu.
+Rendered fragments are keyed by these versions, so bumping a version invalidates them.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from typing import Dict, Iterator
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = 'menu:catalog_version'
+AVAILABILITY_VERSION_KEY = 'menu:availability_version'
+ORDERS_VERSION_KEY = 'orders:version'
+
+# Bumps requested inside batch_invalidation(), per thread
+_deferred = threading.local()
+
+
+def _new_version() -> int:
+    """Versions are nanosecond timestamps so they double as modification times."""
+    return time.time_ns()
+
+
+def get_menu_versions() -> Dict[str, int]:
+    """
+    Get the current catalog and availability versions in one cache round trip.
+
+    Returns:
+        Dict with 'catalog' and 'availability' version numbers
+    """
+    versions = cache.get_many([CATALOG_VERSION_KEY, AVAILABILITY_VERSION_KEY])
+    missing = {
+        key: _new_version()
+        for key in (CATALOG_VERSION_KEY, AVAILABILITY_VERSION_KEY)
+        if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {
+        'catalog': versions[CATALOG_VERSION_KEY],
+        'availability': versions[AVAILABILITY_VERSION_KEY],
+    }
+
+
+def get_menu_version_token() -> str:
+    """
+    Get a compact token identifying the current menu state, used in versioned URLs.
+    """
+    versions = get_menu_versions()
+    return f'{versions["catalog"]:x}-{versions["availability"]:x}'
+
+
+def get_menu_last_modified() -> datetime:
+    """
+    Get the time of the most recent catalog or availability change.
+    """
+    versions = get_menu_versions()
+    latest = max(versions.values())
+    return datetime.fromtimestamp(latest / 1_000_000_000, tz=timezone.utc)
+
+
+def _bump(key: str) -> None:
+    cache.set(key, _new_version(), timeout=None)
+    logger.debug(f'Bumped cache version {key}')
+
+
+def _schedule_bump(key: str) -> None:
+    pending = getattr(_deferred, 'keys', None)
+    if pending is not None:
+        pending.add(key)
+    else:
+        transaction.on_commit(partial(_bump, key))
+
+
+@contextmanager
+def batch_invalidation() -> Iterator[None]:
+    """
+    Collect the version bumps requested inside the block and schedule each version
+    once when it ends, so a batch of changes invalidates the cache a single time
+    instead of once per row.
+    """
+    if getattr(_deferred, 'keys', None) is not None:
+        yield
+        return
+
+    _deferred.keys = set()
+    try:
+        yield
+    finally:
+        keys, _deferred.keys = _deferred.keys, None
+        for key in keys:
+            transaction.on_commit(partial(_bump, key))
+
+
+def bump_catalog_version() -> None:
+    """
+    Invalidate cached menu fragments after names, prices or categories change.
+    The bump runs on commit so a concurrent request cannot re-cache stale rows.
+    """
+    _schedule_bump(CATALOG_VERSION_KEY)
+
+
+def bump_availability_version() -> None:
+    """
+    Invalidate cached menu fragments after an item sells out or comes back in stock.
+    """
+    _schedule_bump(AVAILABILITY_VERSION_KEY)
+
+
+def get_orders_version() -> int:
+    """
+    Get the version of order data shown on staff screens.
+    """
+    return cache.get_or_set(ORDERS_VERSION_KEY, _new_version, timeout=None)
+
+
+def bump_orders_version() -> None:
+    """
+    Invalidate cached order summaries after an order is placed or changes state.
+    """
+    _schedule_bump(ORDERS_VERSION_KEY)
@@ -0,0 +1,286 @@
+"""
+Cart storage for customers.
+The cart can live in a signed cookie (no database round trips) or in the session.
+"""
+
+import json
+import logging
+import secrets
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from menu_app.services import menu_utils, reservation_service
+
+logger = logging.getLogger(__name__)
+
+SESSION_CART_KEY = 'cart'
+CART_ACTIONS = ('add', 'decrease', 'update', 'remove')
+MAX_OPERATIONS = 100
+
+
+def validate_cart(cart: Dict[str, int]) -> Dict[str, int]:
+    """
+    Validate cart size limits.
+
+    Args:
+        cart: Dict mapping menu item IDs (as strings) to quantities
+
+    Returns:
+        The validated cart
+
+    Raises:
+        ValueError: If the cart has too many lines or a quantity is out of range
+    """
+    if len(cart) > settings.CART_MAX_ITEMS:
+        raise ValueError(f'Cart cannot hold more than {settings.CART_MAX_ITEMS} different items')
+    for quantity in cart.values():
+        if quantity <= 0 or quantity > settings.CART_MAX_QUANTITY:
+            raise ValueError(f'Quantity must be between 1 and {settings.CART_MAX_QUANTITY}')
+    return cart
+
+
+def apply_operations(cart: Dict[str, int], operations: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Apply a batch of cart operations. The batch is applied to a copy,
+    so the original cart is unchanged if any operation is invalid.
+
+    Args:
+        cart: Dict mapping menu item IDs (as strings) to quantities
+        operations: List of dicts with 'action', 'menu_item_id' and optional 'quantity'
+
+    Returns:
+        The updated cart
+
+    Raises:
+        ValueError: If an operation is malformed or the result exceeds the cart limits
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ValueError('Operations must be a non-empty list')
+    if len(operations) > MAX_OPERATIONS:
+        raise ValueError(f'Cannot apply more than {MAX_OPERATIONS} operations at once')
+
+    cart = dict(cart)
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise ValueError('Each operation must be an object')
+        action = operation.get('action')
+        if action not in CART_ACTIONS:
+            raise ValueError(f'Invalid action. Must be one of: {", ".join(CART_ACTIONS)}')
+        try:
+            menu_item_id = str(int(operation.get('menu_item_id')))
+            quantity = int(operation.get('quantity', 1))
+        except (TypeError, ValueError):
+            raise ValueError('menu_item_id and quantity must be integers')
+
+        if action == 'add':
+            if quantity <= 0:
+                raise ValueError('Quantity must be positive')
+            cart[menu_item_id] = cart.get(menu_item_id, 0) + quantity
+        elif action == 'decrease':
+            if quantity <= 0:
+                raise ValueError('Quantity must be positive')
+            remaining = cart.get(menu_item_id, 0) - quantity
+            if remaining > 0:
+                cart[menu_item_id] = remaining
+            else:
+                cart.pop(menu_item_id, None)
+        elif action == 'update':
+            if quantity > 0:
+                cart[menu_item_id] = quantity
+            else:
+                cart.pop(menu_item_id, None)
+        else:
+            cart.pop(menu_item_id, None)
+
+    return validate_cart(cart)
+
+
+def price_cart(cart: Dict[str, int]) -> Tuple[List[Dict[str, Any]], Decimal]:
+    """
+    Price a cart with a single bulk menu item lookup.
+    Items that no longer exist on the menu are left out.
+
+    Args:
+        cart: Dict mapping menu item IDs (as strings) to quantities
+
+    Returns:
+        Tuple of (cart lines with menu_item, quantity and total_price, cart total)
+    """
+    if not cart:
+        return [], Decimal('0')
+
+    ids = []
+    for menu_item_id in cart:
+        try:
+            ids.append(int(menu_item_id))
+        except ValueError:
+            logger.warning(f'Ignoring invalid menu item id in cart: {menu_item_id}')
+    menu_items = menu_utils.get_menu_items_bulk(menu_item_ids=ids) if ids else {}
+
+    cart_items = []
+    total_price = Decimal('0')
+    for menu_item_id, quantity in cart.items():
+        menu_item = menu_items.get(int(menu_item_id)) if menu_item_id.isdigit() else None
+        if not menu_item:
+            continue
+        item_total = menu_item.price * quantity
+        total_price += item_total
+        cart_items.append(
+            {
+                'menu_item': menu_item,
+                'quantity': quantity,
+                'total_price': item_total,
+            }
+        )
+    return cart_items, total_price
+
+
+class SessionCartStorage:
+    """
+    Stores the cart in the session. Each change is a session write, which costs
+    a database UPDATE with the default session engine.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    def load(self) -> Dict[str, int]:
+        return dict(self.request.session.get(SESSION_CART_KEY, {}))
+
+    def save(self, response, cart: Dict[str, int]) -> None:
+        if cart:
+            self.request.session[SESSION_CART_KEY] = validate_cart(cart)
+        else:
+            self.request.session.pop(SESSION_CART_KEY, None)
+
+
+class SignedCookieCartStorage:
+    """
+    Stores the cart in a signed cookie so cart interactions never touch the database.
+    Carts still held in the session are moved into the cookie on their next save.
+    """
+
+    salt = 'menu_app.cart'
+
+    def __init__(self, request):
+        self.request = request
+
+    def _has_session(self) -> bool:
+        # Only look at the session when the visitor has one, to avoid loading it for nothing
+        return settings.SESSION_COOKIE_NAME in self.request.COOKIES
+
+    def load(self) -> Dict[str, int]:
+        value = self.request.get_signed_cookie(
+            settings.CART_COOKIE_NAME,
+            default=None,
+            salt=self.salt,
+            max_age=settings.CART_COOKIE_AGE,
+        )
+        if value is not None:
+            try:
+                return {str(key): int(quantity) for key, quantity in json.loads(value).items()}
+            except (ValueError, TypeError, AttributeError):
+                logger.warning('Discarding malformed cart cookie')
+                return {}
+
+        if self._has_session():
+            return dict(self.request.session.get(SESSION_CART_KEY, {}))
+        return {}
+
+    def save(self, response, cart: Dict[str, int]) -> None:
+        if self._has_session() and SESSION_CART_KEY in self.request.session:
+            del self.request.session[SESSION_CART_KEY]
+
+        if not cart:
+            response.delete_cookie(settings.CART_COOKIE_NAME, samesite='Lax')
+            return
+
+        response.set_signed_cookie(
+            settings.CART_COOKIE_NAME,
+            json.dumps(validate_cart(cart), separators=(',', ':')),
+            salt=self.salt,
+            max_age=settings.CART_COOKIE_AGE,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite='Lax',
+        )
+
+
+CART_STORAGE_BACKENDS = {
+    'session': SessionCartStorage,
+    'signed_cookie': SignedCookieCartStorage,
+}
+
+
+def get_cart_storage(request):
+    """
+    Get the configured cart storage for a request.
+
+    Raises:
+        ValueError: If CART_STORAGE is not a known backend
+    """
+    try:
+        storage_class = CART_STORAGE_BACKENDS[settings.CART_STORAGE]
+    except KeyError:
+        raise ValueError(f'Unknown cart storage backend: {settings.CART_STORAGE}')
+    return storage_class(request)
+
+
+def get_cart(request) -> Dict[str, int]:
+    """
+    Get the visitor's cart, loading it at most once per request.
+    """
+    if not hasattr(request, '_cart'):
+        request._cart = get_cart_storage(request).load()
+    return request._cart
+
+
+def get_cart_holder(request) -> str:
+    """
+    Get the token identifying the visitor's cart for stock reservations.
+    A new token is generated for visitors without one and stored by save_cart.
+    """
+    if not hasattr(request, '_cart_holder'):
+        holder = request.get_signed_cookie(
+            settings.CART_HOLDER_COOKIE_NAME, default=None, salt=SignedCookieCartStorage.salt
+        )
+        request._cart_holder = holder or secrets.token_urlsafe(24)
+    return request._cart_holder
+
+
+def save_cart(request, response, cart: Dict[str, int]) -> None:
+    """
+    Persist the visitor's cart on the response.
+    """
+    get_cart_storage(request).save(response, cart)
+    request._cart = cart
+
+    holder = getattr(request, '_cart_holder', None)
+    if cart and holder and settings.CART_HOLDER_COOKIE_NAME not in request.COOKIES:
+        response.set_signed_cookie(
+            settings.CART_HOLDER_COOKIE_NAME,
+            holder,
+            salt=SignedCookieCartStorage.salt,
+            max_age=settings.CART_COOKIE_AGE,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite='Lax',
+        )
+
+
+@transaction.atomic
+def update_cart(request, response, cart: Dict[str, int]) -> None:
+    """
+    Hold stock for the new cart contents, then persist the cart.
+
+    Raises:
+        ValueError: If there is not enough stock for a line; the cart is left unchanged
+    """
+    if cart:
+        reservation_service.sync_holds(get_cart_holder(request), cart)
+    elif settings.CART_HOLDER_COOKIE_NAME in request.COOKIES:
+        reservation_service.release_holds(get_cart_holder(request))
+    save_cart(request, response, cart)
@@ -0,0 +1,81 @@
+"""
+Summary figures for the staff dashboard.
+Every figure is bounded by the orders placed or closed today, the pending queue or
+the flagged low-stock rows, each read through an index, so the dashboard costs the
+same however long the order history grows. The summary is cached per orders version
+for DASHBOARD_SUMMARY_TIMEOUT seconds.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from menu_app.models import inventory, order
+from menu_app.services import cache_service, db_utils
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEY = 'dashboard:summary:{}'
+TOP_SELLER_COUNT = 5
+
+
+def _compute_summary() -> Dict[str, Any]:
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Completed and cancelled orders are never updated again, so updated_at is when
+    # they were closed, whatever day they were placed
+    counts = (
+        db_utils.get_model_queryset(order.Order)
+        .filter(Q(status='pending') | Q(updated_at__gte=today))
+        .aggregate(
+            pending=Count('id', filter=Q(status='pending')),
+            completed_today=Count('id', filter=Q(status='completed', updated_at__gte=today)),
+            cancelled_today=Count('id', filter=Q(status='cancelled', updated_at__gte=today)),
+        )
+    )
+
+    # One row per menu item sold today; revenue is the sum over all of them
+    line_total = ExpressionWrapper(
+        F('quantity') * F('price_at_time_of_order'),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    sales = list(
+        db_utils.get_model_queryset(order.OrderItem, order__created_at__gte=today)
+        .exclude(order__status='cancelled')
+        .order_by()
+        .values('menu_item_id', 'menu_item__name')
+        .annotate(sold=Sum('quantity'), revenue=Sum(line_total))
+    )
+    sales.sort(key=lambda row: (-row['sold'], row['menu_item__name']))
+
+    low_stock = db_utils.get_model_queryset(inventory.InventoryItem, is_low_stock=True).count()
+
+    return {
+        **counts,
+        'revenue_today': sum((row['revenue'] for row in sales), Decimal('0.00')).quantize(
+            Decimal('0.01')
+        ),
+        'low_stock': low_stock,
+        'top_sellers': [
+            {'name': row['menu_item__name'], 'sold': row['sold']}
+            for row in sales[:TOP_SELLER_COUNT]
+        ],
+        'computed_at': timezone.now(),
+    }
+
+
+def get_summary() -> Dict[str, Any]:
+    """
+    Get the staff dashboard summary.
+
+    Returns:
+        Dict with the pending order count, today's completed and cancelled order
+        counts, today's revenue, the low-stock item count and today's top sellers
+    """
+    key = SUMMARY_KEY.format(cache_service.get_orders_version())
+    return cache.get_or_set(key, _compute_summary, settings.DASHBOARD_SUMMARY_TIMEOUT)
@@ -1,13 +1,19 @@
 import logging
-from typing import Any, Dict, List, Type, TypeVar, Union
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Type, TypeVar, Union
 
-from django.db.models import Model, QuerySet
+from django.db.models import F, Field, Model, QuerySet
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=Model)
 
 
+class VersionConflictError(ValueError):
+    """Raised when a versioned row was changed since the caller read it."""
+
+
 def get_model_instance(
     model_class: Type[T],
     id: Union[int, None] = None,
@@ -98,6 +104,59 @@ def get_model_queryset(model_class: Type[T], **kwargs: Any) -> QuerySet[T]:
     return model_class.objects.filter(**kwargs)
 
 
+@lru_cache(maxsize=None)
+def get_model_fields(model_class: Type[Model]) -> Dict[str, Field]:
+    """
+    Get a model's fields by name, with foreign keys also under their column
+    attribute (e.g. 'menu_item_id'). Model metadata does not change at runtime,
+    so the map is built once per model instead of on every call.
+
+    Args:
+        model_class: The Django model class
+
+    Returns:
+        Dictionary mapping field and attribute names to fields
+    """
+    fields = {}
+    for field in model_class._meta.get_fields():
+        fields[field.name] = field
+        attname = getattr(field, 'attname', None)
+        if attname:
+            fields[attname] = field
+    return fields
+
+
+@lru_cache(maxsize=None)
+def _get_auto_now_fields(model_class: Type[Model]) -> Tuple[str, ...]:
+    return tuple(
+        field.name
+        for field in model_class._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+    )
+
+
+def _check_field_names(model_class: Type[Model], names: Iterable[str]) -> Dict[str, Field]:
+    model_fields = get_model_fields(model_class)
+    invalid_fields = set(names) - model_fields.keys()
+    if invalid_fields:
+        raise ValueError(f'Invalid fields for {model_class.__name__}: {invalid_fields}')
+    return model_fields
+
+
+def _validate_values(instance: Model, model_fields: Dict[str, Field], values: Dict) -> None:
+    for name, value in values.items():
+        field = model_fields[name]
+        # Relations are enforced by foreign key constraints, without a query per value
+        if not field.is_relation and hasattr(field, 'validate'):
+            field.validate(value, instance)
+
+
+def _with_auto_now(model_class: Type[Model], fields: Iterable[str]) -> List[str]:
+    """Fields written by a partial update, plus auto_now timestamps it must keep fresh."""
+    fields = list(fields)
+    return fields + [name for name in _get_auto_now_fields(model_class) if name not in fields]
+
+
 def create_model_instance(model_class: Type[T], **kwargs: Any) -> T:
     """
     Create a new model instance.
@@ -109,18 +168,13 @@ def create_model_instance(model_class: Type[T], **kwargs: Any) -> T:
     Returns:
         Newly created model instance
     """
-    # Validate that all fields exist in the model
-    model_fields = {f.name for f in model_class._meta.get_fields()}
-    invalid_fields = set(kwargs.keys()) - model_fields
-    if invalid_fields:
-        raise ValueError(f'Invalid fields for {model_class.__name__}: {invalid_fields}')
-
+    _check_field_names(model_class, kwargs)
     return model_class.objects.create(**kwargs)
 
 
 def update_model_instance(instance: T, **kwargs: Any) -> T:
     """
-    Update an existing model instance.
+    Update an existing model instance, writing only the given fields.
 
     Args:
         instance: The model instance to update
@@ -129,21 +183,105 @@ def update_model_instance(instance: T, **kwargs: Any) -> T:
     Returns:
         Updated model instance
     """
-    # Get all field information once
-    meta = instance._meta
-    model_fields = {f.name: f for f in meta.get_fields()}
-
-    # Validate that all fields exist in the model
-    invalid_fields = set(kwargs.keys()) - model_fields.keys()
-    if invalid_fields:
-        raise ValueError(f'Invalid fields for {instance.__class__.__name__}: {invalid_fields}')
-
-    # Validate and set field values in a single loop
+    model_fields = _check_field_names(type(instance), kwargs)
+    _validate_values(instance, model_fields, kwargs)
     for field, value in kwargs.items():
-        field_obj = model_fields[field]
-        if hasattr(field_obj, 'validate'):
-            field_obj.validate(value, instance)
         setattr(instance, field, value)
 
-    instance.save()
+    if instance.pk is None:
+        instance.save()
+    else:
+        instance.save(update_fields=_with_auto_now(type(instance), kwargs))
     return instance
+
+
+def claim_version(instance: Model, expected_version: Union[int, None] = None) -> int:
+    """
+    Advance an instance's version column, inside the caller's transaction.
+    With an expected version this is a compare-and-swap
+    (UPDATE ... SET version = version + 1 WHERE id = ? AND version = ?), so a
+    concurrent edit is detected without holding a lock while the editor works.
+
+    Args:
+        instance: A model instance with a version field
+        expected_version: Version the caller's copy was read at; None always claims
+
+    Returns:
+        The new version, also set on the instance
+
+    Raises:
+        VersionConflictError: If the row's version is not the expected one
+    """
+    rows = type(instance).objects.filter(pk=instance.pk)
+    if expected_version is None:
+        expected_version = rows.select_for_update().values_list('version', flat=True).get()
+    if not rows.filter(version=expected_version).update(version=F('version') + 1):
+        raise VersionConflictError(f'{instance} was changed by someone else')
+    instance.version = expected_version + 1
+    return instance.version
+
+
+def delete_model_instance(instance: Model) -> None:
+    """
+    Delete a model instance.
+
+    Args:
+        instance: The model instance to delete
+    """
+    instance.delete()
+
+
+def bulk_create_instances(
+    model_class: Type[T], rows: Iterable[Dict[str, Any]], batch_size: Union[int, None] = None
+) -> List[T]:
+    """
+    Create model instances in as few INSERTs as possible.
+    Like any bulk_create, this skips save() and its signals.
+
+    Args:
+        model_class: The Django model class
+        rows: Fields and values for each new instance
+        batch_size: Maximum number of rows per INSERT
+
+    Returns:
+        The created instances
+    """
+    rows = list(rows)
+    _check_field_names(model_class, {name for row in rows for name in row})
+    return model_class.objects.bulk_create(
+        [model_class(**row) for row in rows], batch_size=batch_size
+    )
+
+
+def bulk_update_instances(
+    instances: List[T], fields: List[str], batch_size: Union[int, None] = None
+) -> int:
+    """
+    Write the given fields of several instances of one model in as few UPDATEs as possible.
+    Like any bulk_update, this skips save() and its signals.
+
+    Args:
+        instances: Model instances with their new values already set
+        fields: Names of the fields to write
+        batch_size: Maximum number of instances per UPDATE
+
+    Returns:
+        Number of rows updated
+    """
+    if not instances:
+        return 0
+    model_class = type(instances[0])
+    model_fields = _check_field_names(model_class, fields)
+    checked = [name for name in fields if not model_fields[name].is_relation]
+    for instance in instances:
+        _validate_values(
+            instance, model_fields, {name: getattr(instance, name) for name in checked}
+        )
+
+    auto_now = [name for name in _get_auto_now_fields(model_class) if name not in fields]
+    if auto_now:
+        now = timezone.now()
+        for instance in instances:
+            for name in auto_now:
+                setattr(instance, name, now)
+    return model_class.objects.bulk_update(instances, [*fields, *auto_now], batch_size=batch_size)
@@ -0,0 +1,215 @@
+"""
+Streaming export of orders and their lines as CSV or JSON Lines.
+Rows are read with a chunked iterator and written out as they arrive, so an
+export of any size runs in constant memory and starts sending immediately.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from menu_app.models import order
+from menu_app.services import db_utils
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+EXPORT_CHUNK_SIZE = 2000
+# Lines are sent in blocks of roughly this many characters rather than one write per row
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+CSV_COLUMNS = [
+    'order_id',
+    'created_at',
+    'status',
+    'menu_item_id',
+    'menu_item_name',
+    'quantity',
+    'unit_price',
+    'line_total',
+]
+
+_ROW_FIELDS = (
+    'id',
+    'created_at',
+    'status',
+    'items__menu_item_id',
+    'items__menu_item__name',
+    'items__quantity',
+    'items__price_at_time_of_order',
+)
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_export_queryset(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+) -> QuerySet:
+    """
+    Build the export query: one row per order line, ordered by order.
+    Orders without lines appear once with empty line fields.
+
+    Args:
+        start_date: First day to include (inclusive)
+        end_date: Last day to include (inclusive)
+        status: Only include orders with this status
+
+    Returns:
+        QuerySet of row dicts
+
+    Raises:
+        ValueError: If the status is unknown or the date range is reversed
+    """
+    filters = {}
+    if status:
+        if status not in dict(order.Order.STATUS_CHOICES):
+            raise ValueError(f'Invalid status: {status}')
+        filters['status'] = status
+    if start_date and end_date and start_date > end_date:
+        raise ValueError('Start date must not be after end date')
+    # Plain range bounds rather than __date, so the created_at comparison can use an index
+    if start_date:
+        filters['created_at__gte'] = _day_start(start_date)
+    if end_date:
+        filters['created_at__lt'] = _day_start(end_date + timedelta(days=1))
+
+    return (
+        db_utils.get_model_queryset(order.Order, **filters)
+        .order_by('created_at', 'id', 'items__id')
+        .values(*_ROW_FIELDS)
+    )
+
+
+def iter_orders(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Group consecutive line rows into one dict per order.
+    Rows must be ordered by order, which keeps only one order in memory at a time.
+    """
+    for order_id, order_rows in groupby(rows, key=lambda row: row['id']):
+        first = next(order_rows)
+        lines = []
+        total = Decimal('0.00')
+        for row in (first, *order_rows):
+            if row['items__menu_item_id'] is None:
+                continue
+            line_total = row['items__quantity'] * row['items__price_at_time_of_order']
+            total += line_total
+            lines.append(
+                {
+                    'menu_item_id': row['items__menu_item_id'],
+                    'menu_item_name': row['items__menu_item__name'],
+                    'quantity': row['items__quantity'],
+                    'unit_price': str(row['items__price_at_time_of_order']),
+                    'line_total': str(line_total),
+                }
+            )
+        yield {
+            'order_id': order_id,
+            'created_at': first['created_at'].isoformat(),
+            'status': first['status'],
+            'total_price': str(total),
+            'items': lines,
+        }
+
+
+def _csv_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def render(values):
+        writer.writerow(values)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    yield render(CSV_COLUMNS)
+    for row in rows:
+        has_line = row['items__menu_item_id'] is not None
+        yield render(
+            [
+                row['id'],
+                row['created_at'].isoformat(),
+                row['status'],
+                row['items__menu_item_id'] if has_line else '',
+                row['items__menu_item__name'] if has_line else '',
+                row['items__quantity'] if has_line else '',
+                row['items__price_at_time_of_order'] if has_line else '',
+                row['items__quantity'] * row['items__price_at_time_of_order'] if has_line else '',
+            ]
+        )
+
+
+def _jsonl_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for order_data in iter_orders(rows):
+        yield json.dumps(order_data, separators=(',', ':')) + '\n'
+
+
+def _buffered(lines: Iterable[str], size: int = EXPORT_BUFFER_SIZE) -> Iterator[str]:
+    chunk = []
+    length = 0
+    for line in lines:
+        chunk.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+def export_orders(
+    export_format: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Stream orders and their lines in the given format.
+
+    The arguments are validated immediately; the query only runs once the
+    returned iterator is consumed.
+
+    Args:
+        export_format: 'csv' (one row per order line) or 'jsonl' (one object per order)
+        start_date: First day to include (inclusive)
+        end_date: Last day to include (inclusive)
+        status: Only include orders with this status
+        chunk_size: Number of rows fetched from the database at a time
+
+    Returns:
+        Iterator of text chunks
+
+    Raises:
+        ValueError: If the format or filters are invalid
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Invalid format. Must be one of: {", ".join(EXPORT_FORMATS)}')
+    if chunk_size <= 0:
+        raise ValueError('Chunk size must be positive')
+
+    rows = get_export_queryset(start_date=start_date, end_date=end_date, status=status)
+    render = _csv_lines if export_format == 'csv' else _jsonl_lines
+
+    def generate():
+        logger.info(f'Exporting orders as {export_format}')
+        yield from _buffered(render(rows.iterator(chunk_size=chunk_size)))
+
+    return generate()
@@ -0,0 +1,126 @@
+"""
+Idempotency keys for checkout.
+Each checkout form carries a fresh key. The first submission with a key claims it
+before taking any stock; a double-click or retry then costs one indexed lookup and
+gets the order the first submission placed, instead of placing it again.
+"""
+
+import hashlib
+import json
+import logging
+import secrets
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from menu_app.models import idempotency, order
+from menu_app.services import db_utils
+
+logger = logging.getLogger(__name__)
+
+KEY_MAX_LENGTH = 64
+SWEEP_BATCH_SIZE = 1000
+
+
+def new_key() -> str:
+    """
+    Generate a key for a checkout form.
+    """
+    return secrets.token_urlsafe(24)
+
+
+def validate_key(key: str) -> None:
+    """
+    Raises:
+        ValueError: If the key is empty or too long to store
+    """
+    if not key or len(key) > KEY_MAX_LENGTH:
+        raise ValueError(f'Idempotency key must be 1 to {KEY_MAX_LENGTH} characters')
+
+
+def cart_hash(cart: Dict[str, int]) -> str:
+    """
+    Hash a cart's contents, independent of key order and ID types.
+    """
+    normalized = sorted((int(menu_item_id), quantity) for menu_item_id, quantity in cart.items())
+    return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+
+def get_order(key: str, cart: Optional[Dict[str, int]] = None) -> Optional[order.Order]:
+    """
+    Get the order placed by an earlier submission with this key, if any.
+
+    Args:
+        key: The idempotency key
+        cart: Cart of the current submission; an empty cart is a retry arriving
+            after the first submission cleared it
+
+    Raises:
+        ValueError: If the key was used for a different cart, e.g. a stale page
+            submitted again after more items were added
+    """
+    claimed = (
+        db_utils.get_model_queryset(idempotency.IdempotencyKey, key=key, order__isnull=False)
+        .select_related('order')
+        .first()
+    )
+    if not claimed:
+        return None
+    if cart and claimed.cart_hash != cart_hash(cart):
+        logger.warning(f'Idempotency key reused for a different cart (order {claimed.order_id})')
+        raise ValueError(
+            'This checkout form was already used for another order, please check out again'
+        )
+    return claimed.order
+
+
+def claim_key(key: str, cart: Dict[str, int]) -> idempotency.IdempotencyKey:
+    """
+    Claim a key for a checkout of the given cart, inside the checkout's transaction.
+    A concurrent submission with the same key waits on the unique index until this
+    transaction ends, and then fails with an IntegrityError.
+    """
+    return idempotency.IdempotencyKey.objects.create(
+        key=key,
+        cart_hash=cart_hash(cart),
+        expires_at=timezone.now() + timedelta(seconds=settings.CHECKOUT_IDEMPOTENCY_TTL),
+    )
+
+
+def expire_keys(batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Delete expired keys, one batch per transaction.
+
+    Args:
+        batch_size: Maximum number of keys deleted per transaction
+
+    Returns:
+        Number of keys deleted
+    """
+    if batch_size <= 0:
+        raise ValueError('Batch size must be positive')
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids: List[int] = list(
+                db_utils.get_model_queryset(
+                    idempotency.IdempotencyKey, expires_at__lte=timezone.now()
+                )
+                .select_for_update(skip_locked=True)
+                .order_by('expires_at')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            db_utils.get_model_queryset(idempotency.IdempotencyKey, id__in=ids).delete()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if total:
+        logger.info(f'Deleted {total} expired checkout idempotency keys')
+    return total
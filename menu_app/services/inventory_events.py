@@ -0,0 +1,30 @@
+"""
+Consumers for inventory events published through the outbox.
+These run in the outbox worker, outside the request that changed the stock.
+"""
+
+import logging
+from typing import Any, Dict
+
+from menu_app.services import outbox_service
+
+logger = logging.getLogger(__name__)
+notification_logger = logging.getLogger('menu_app.notifications')
+
+INVENTORY_LOW_STOCK = 'inventory.low_stock'
+INVENTORY_RESTOCKED = 'inventory.restocked'
+
+
+@outbox_service.register_handler(INVENTORY_LOW_STOCK)
+def notify_low_stock(payload: Dict[str, Any]) -> None:
+    """Alert staff that an item fell to its low-stock threshold."""
+    notification_logger.warning(
+        f'{payload["name"]} is low on stock: {payload["quantity"]} left '
+        f'(threshold {payload["threshold"]})'
+    )
+
+
+@outbox_service.register_handler(INVENTORY_RESTOCKED)
+def notify_restocked(payload: Dict[str, Any]) -> None:
+    """Let staff know an item is back above its low-stock threshold."""
+    notification_logger.info(f'{payload["name"]} is back in stock: {payload["quantity"]} left')
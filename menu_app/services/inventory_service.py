@@ -2,9 +2,17 @@ import logging
 from typing import Dict, List, Optional
 
 from django.db import transaction
-
-from menu_app.models import inventory, menu_item
-from menu_app.services import db_utils, menu_utils
+from django.db.models import F
+
+from menu_app.models import inventory, ledger, menu_item
+from menu_app.services import (
+    cache_service,
+    db_utils,
+    ledger_service,
+    low_stock_service,
+    menu_utils,
+    shard_service,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -85,9 +93,14 @@ def get_inventory(menu_item: menu_item.MenuItem) -> Optional[inventory.Inventory
 
 def get_all_inventory_items() -> List[inventory.InventoryItem]:
     """
-    Get all inventory items with their related menu items
+    Get all inventory items with their related menu items, annotated with the
+    stock changes still pending in the inventory ledger
     """
-    return list(_get_base_inventory_queryset().all())
+    return list(
+        _get_base_inventory_queryset().annotate(
+            pending_quantity=ledger_service.pending_quantity_subquery()
+        )
+    )
 
 
 def get_inventory_by_menu_item(
@@ -122,32 +135,36 @@ def get_inventory_by_menu_item_name(name: str) -> Optional[inventory.InventoryIt
     return get_inventory(menu_item)
 
 
-def get_low_stock_items(threshold: int = 10) -> List[inventory.InventoryItem]:
+def get_low_stock_items() -> List[inventory.InventoryItem]:
     """
-    Get inventory items with quantity below threshold
-
-    Args:
-        threshold: Minimum quantity threshold
-
-    Returns:
-        List of inventory items below threshold
-
-    Raises:
-        ValueError: If threshold is not positive
+    Get inventory items at or below their own low stock threshold, lowest stock first.
+    Only the flagged rows are read, through a partial index, so the cost follows
+    the number of low stock items rather than the size of the table.
     """
-    if threshold <= 0:
-        raise ValueError('Threshold must be positive')
-    return list(_get_base_inventory_queryset().filter(quantity__lt=threshold))
+    return list(
+        _get_base_inventory_queryset()
+        .filter(is_low_stock=True)
+        .order_by('quantity', 'menu_item__name')
+    )
 
 
 @transaction.atomic
-def add_stock(menu_item: menu_item.MenuItem, quantity: int) -> None:
+def add_stock(
+    menu_item: menu_item.MenuItem,
+    quantity: int,
+    kind: str = ledger.InventoryMovement.RESTOCK,
+    order_id: Optional[int] = None,
+) -> None:
     """
-    Add stock to a menu item's inventory
+    Add stock to a menu item's inventory.
+    The increase is recorded in the inventory ledger and reaches the stock
+    snapshot when the ledger is compacted.
 
     Args:
         menu_item: The MenuItem to add stock to
         quantity: Amount of stock to add
+        kind: Ledger movement kind (default: restock)
+        order_id: ID of the order returning the stock, if any
 
     Raises:
         ValueError: If quantity is not positive
@@ -157,45 +174,124 @@ def add_stock(menu_item: menu_item.MenuItem, quantity: int) -> None:
         raise ValueError('Quantity must be positive')
 
     try:
-        inventory_item = get_inventory(menu_item)
-        if not inventory_item:
-            inventory_item = create_inventory(menu_item, initial_quantity=0)
-        inventory_item.quantity += quantity
-        db_utils.update_model_instance(inventory_item, quantity=inventory_item.quantity)
+        if not get_inventory(menu_item):
+            create_inventory(menu_item, initial_quantity=0)
+        ledger_service.record_increase(menu_item.id, quantity, kind, order_id=order_id)
     except Exception as e:
         logger.error(f'Error adding stock to {menu_item.name}: {e!s}')
         raise RuntimeError(f'Failed to add stock: {e!s}')
 
 
+def _take_stock(menu_item_id: int, quantity: int) -> bool:
+    """Take stock from the row in one conditional UPDATE, leaving carts' holds alone."""
+    return bool(
+        db_utils.get_model_queryset(
+            inventory.InventoryItem,
+            menu_item_id=menu_item_id,
+            quantity__gte=F('reserved_quantity') + quantity,
+        ).update(quantity=F('quantity') - quantity)
+    )
+
+
 @transaction.atomic
-def remove_stock(menu_item: menu_item.MenuItem, quantity: int) -> None:
+def remove_stock(
+    menu_item: menu_item.MenuItem,
+    quantity: int,
+    kind: str = ledger.InventoryMovement.ADJUSTMENT,
+    order_id: Optional[int] = None,
+) -> None:
     """
-    Remove stock from a menu item's inventory
+    Remove stock from a menu item's inventory.
+    The stock is taken with one conditional UPDATE, so concurrent sales and
+    compactions are never overwritten and stock held by carts is left alone.
 
     Args:
         menu_item: The MenuItem to remove stock from
         quantity: Amount of stock to remove
+        kind: Ledger movement kind (default: adjustment)
+        order_id: ID of the order taking the stock, if any
 
     Raises:
-        ValueError: If quantity is not positive or insufficient stock
-        RuntimeError: If there are issues removing stock
+        ValueError: If quantity is not positive, the item has no inventory or
+            there is not enough unreserved stock
     """
     if quantity <= 0:
         raise ValueError('Quantity must be positive')
 
-    if not menu_utils.check_item_availability(menu_item, quantity):
-        raise ValueError(f'Insufficient stock for {menu_item.name}')
+    inventory_item = get_inventory(menu_item)
+    if inventory_item and inventory_item.is_sharded:
+        try:
+            shard_service.take_stock(menu_item.id, quantity)
+        except ValueError:
+            raise ValueError(f'Insufficient stock for {menu_item.name}')
+        ledger_service.record_applied({menu_item.id: -quantity}, kind, order_id=order_id)
+        return
+
+    if not _take_stock(menu_item.id, quantity):
+        # The stock may be waiting in the ledger; fold it into the row and retry
+        if not ledger_service.compact_movements(menu_item_ids=[menu_item.id]):
+            raise ValueError(f'Insufficient stock for {menu_item.name}')
+        if not _take_stock(menu_item.id, quantity):
+            raise ValueError(f'Insufficient stock for {menu_item.name}')
+
+    ledger_service.record_applied({menu_item.id: -quantity}, kind, order_id=order_id)
+    # Queryset updates bypass signals, so report sold-out and low-stock transitions here
+    if db_utils.get_model_queryset(
+        inventory.InventoryItem, menu_item_id=menu_item.id, quantity=0
+    ).exists():
+        cache_service.bump_availability_version()
+    low_stock_service.refresh_low_stock([menu_item.id])
 
-    try:
-        inventory_item = get_inventory(menu_item)
-        if not inventory_item:
-            raise ValueError(f'No inventory found for menu item {menu_item.name}')
 
-        inventory_item.quantity -= quantity
-        db_utils.update_model_instance(inventory_item, quantity=inventory_item.quantity)
-    except Exception as e:
-        logger.error(f'Error removing stock from {menu_item.name}: {e!s}')
-        raise RuntimeError(f'Failed to remove stock: {e!s}')
+@transaction.atomic
+def set_stock(
+    menu_item: menu_item.MenuItem, quantity: int, expected_version: Optional[int] = None
+) -> None:
+    """
+    Set a menu item's stock to a counted quantity.
+    The stock row is locked first, then the item's pending ledger movements are
+    marked applied, since the count supersedes them; the difference is recorded
+    as an adjustment.
+
+    Args:
+        menu_item: The MenuItem whose stock was counted
+        quantity: The counted quantity
+        expected_version: Inventory version the count was entered against; when
+            given, the count fails instead of overwriting another editor's count
+
+    Raises:
+        ValueError: If quantity is negative
+        VersionConflictError: If the stock was counted by someone else since
+            expected_version
+    """
+    if quantity < 0:
+        raise ValueError('Quantity cannot be negative')
+
+    if not get_inventory(menu_item):
+        create_inventory(menu_item, initial_quantity=0)
+
+    with transaction.atomic():
+        inventory_item = (
+            db_utils.get_model_queryset(inventory.InventoryItem, menu_item=menu_item)
+            .select_for_update()
+            .get()
+        )
+        db_utils.claim_version(inventory_item, expected_version)
+        pending = ledger_service.settle_pending([menu_item.id]).get(menu_item.id, 0)
+        if inventory_item.is_sharded:
+            previous = shard_service.set_stock(menu_item.id, quantity)
+        else:
+            previous = inventory_item.quantity
+        change = quantity - previous - pending
+        if inventory_item.quantity != quantity:
+            db_utils.update_model_instance(inventory_item, quantity=quantity)
+        elif pending and quantity == 0:
+            # The item looked in stock through its pending restocks
+            cache_service.bump_availability_version()
+        if change:
+            ledger_service.record_applied(
+                {menu_item.id: change}, ledger.InventoryMovement.ADJUSTMENT
+            )
 
 
 def check_availability(menu_item: menu_item.MenuItem, quantity: int) -> bool:
@@ -283,3 +379,110 @@ def bulk_update_inventory(updates: Dict[int, int]) -> Dict[int, bool]:
             results[menu_item_id] = False
 
     return results
+
+
+def set_stock_levels(
+    counts: Dict[int, int], expected_versions: Optional[Dict[int, int]] = None
+) -> Dict[int, str]:
+    """
+    Apply a stock take: set many items' stock to counted quantities at once.
+    The counted rows are read with one locked query and written with one bulk
+    UPDATE, and the differences are recorded as adjustments in one insert,
+    however many items were counted. Rows that fail validation are skipped and
+    reported; the others are applied.
+
+    Args:
+        counts: Dict mapping menu item IDs to counted quantities
+        expected_versions: Dict mapping menu item IDs to the inventory version each
+            count was entered against; rows counted by someone else since are skipped
+
+    Returns:
+        Dict mapping the menu item IDs of skipped rows to the reason
+
+    Raises:
+        ValueError: If no counts are given
+    """
+    if not counts:
+        raise ValueError('No stock counts given')
+    expected_versions = expected_versions or {}
+
+    errors = {
+        menu_item_id: 'Quantity cannot be negative'
+        for menu_item_id, quantity in counts.items()
+        if quantity < 0
+    }
+    wanted = {
+        menu_item_id: quantity
+        for menu_item_id, quantity in counts.items()
+        if menu_item_id not in errors
+    }
+    with transaction.atomic():
+        items = {
+            item.menu_item_id: item
+            for item in db_utils.get_model_queryset(
+                inventory.InventoryItem, menu_item_id__in=list(wanted)
+            )
+            .select_for_update()
+            .order_by('id')
+        }
+        # Counts supersede the movements not yet folded in; the rows are locked first
+        pending = ledger_service.settle_pending(
+            [
+                menu_item_id
+                for menu_item_id, item in items.items()
+                if expected_versions.get(menu_item_id) in (None, item.version)
+            ]
+        )
+
+        counted = []
+        changes = {}
+        sold_out_changed = False
+        for menu_item_id, quantity in wanted.items():
+            item = items.get(menu_item_id)
+            expected_version = expected_versions.get(menu_item_id)
+            if not item:
+                errors[menu_item_id] = 'No inventory for this item'
+                continue
+            if expected_version is not None and item.version != expected_version:
+                errors[menu_item_id] = 'Counted by someone else in the meantime'
+                continue
+
+            if item.is_sharded:
+                previous = shard_service.set_stock(menu_item_id, quantity)
+            else:
+                previous = item.quantity
+            previous += pending.get(menu_item_id, 0)
+            if quantity != previous:
+                changes[menu_item_id] = quantity - previous
+            sold_out_changed |= (item.quantity + pending.get(menu_item_id, 0) == 0) != (
+                quantity == 0
+            )
+            item.quantity = quantity
+            item.version += 1
+            counted.append(item)
+
+        db_utils.bulk_update_instances(counted, ['quantity', 'version'])
+        if changes:
+            ledger_service.record_applied(changes, ledger.InventoryMovement.ADJUSTMENT)
+        # Bulk writes bypass signals, so report sold-out and low-stock transitions here
+        if sold_out_changed:
+            cache_service.bump_availability_version()
+        low_stock_service.refresh_low_stock([item.menu_item_id for item in counted])
+
+    logger.info(f'Stock take applied to {len(counted)} items, {len(errors)} skipped')
+    return errors
+
+
+def restore_stock_for_orders(order_ids: List[int]) -> int:
+    """
+    Return the stock held by the given orders to inventory.
+    The returns are recorded in the inventory ledger with a single insert and
+    reach the stock snapshots when the ledger is compacted.
+
+    Args:
+        order_ids: IDs of the orders whose lines should be restocked
+
+    Returns:
+        Number of order lines returned
+    """
+    return ledger_service.record_order_returns(order_ids)
@@ -0,0 +1,129 @@
+"""
+Kitchen work queue.
+Stations claim pending orders oldest first; claiming skips rows another
+station is claiming at the same moment, so stations never wait on each other.
+"""
+
+import logging
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from menu_app.models import order
+from menu_app.services import db_utils, order_service
+
+logger = logging.getLogger(__name__)
+
+
+def validate_station(station: str) -> str:
+    """Validate and standardize a station name"""
+    if not station or not station.strip():
+        raise ValueError('Station cannot be empty')
+    station = station.strip()
+    if len(station) > order.Order._meta.get_field('claimed_by').max_length:
+        raise ValueError('Station name is too long')
+    return station
+
+
+def _claimable_orders():
+    """
+    Pending orders that are unclaimed, or whose claim has expired.
+    """
+    expired = timezone.now() - timedelta(seconds=settings.KITCHEN_CLAIM_TIMEOUT)
+    return db_utils.get_model_queryset(order.Order, status='pending').filter(
+        Q(claimed_by='') | Q(claimed_at__lt=expired)
+    )
+
+
+@transaction.atomic
+def claim_next_orders(station: str, limit: int = 1) -> List[order.Order]:
+    """
+    Claim the oldest claimable orders for a station.
+
+    Args:
+        station: Name of the claiming station
+        limit: Maximum number of orders to claim
+
+    Returns:
+        The claimed orders, oldest first
+
+    Raises:
+        ValueError: If station is empty or limit is not positive
+    """
+    station = validate_station(station)
+    if limit <= 0:
+        raise ValueError('Limit must be positive')
+
+    claimed_ids = list(
+        _claimable_orders()
+        .select_for_update(skip_locked=True)
+        .order_by('created_at', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not claimed_ids:
+        return []
+
+    now = timezone.now()
+    db_utils.get_model_queryset(order.Order, id__in=claimed_ids).update(
+        claimed_by=station, claimed_at=now, updated_at=now
+    )
+    logger.info(f'Station {station} claimed orders {claimed_ids}')
+    return get_station_orders(station, order_ids=claimed_ids)
+
+
+def get_station_orders(station: str, order_ids: Optional[List[int]] = None) -> List[order.Order]:
+    """
+    Get the pending orders currently claimed by a station, oldest first.
+    """
+    station = validate_station(station)
+    queryset = db_utils.get_model_queryset(
+        order.Order, status='pending', claimed_by=station
+    ).prefetch_related('items', 'items__menu_item')
+    if order_ids is not None:
+        queryset = queryset.filter(id__in=order_ids)
+    return list(queryset.order_by('created_at', 'id'))
+
+
+def count_waiting_orders() -> int:
+    """
+    Count pending orders that no station is working on.
+    """
+    return _claimable_orders().count()
+
+
+@transaction.atomic
+def complete_station_orders(station: str, order_ids: List[int]) -> List[int]:
+    """
+    Complete a batch of orders claimed by a station.
+    Orders claimed by another station are skipped.
+
+    Returns:
+        IDs of the orders that were completed
+    """
+    station = validate_station(station)
+    own_ids = list(
+        db_utils.get_model_queryset(order.Order, id__in=order_ids, claimed_by=station).values_list(
+            'id', flat=True
+        )
+    )
+    if not own_ids:
+        return []
+    return order_service.complete_orders(own_ids)
+
+
+@transaction.atomic
+def release_station_orders(station: str, order_ids: List[int]) -> int:
+    """
+    Put orders claimed by a station back on the queue.
+
+    Returns:
+        Number of orders released
+    """
+    station = validate_station(station)
+    return db_utils.get_model_queryset(
+        order.Order, id__in=order_ids, claimed_by=station, status='pending'
+    ).update(claimed_by='', claimed_at=None, updated_at=timezone.now())
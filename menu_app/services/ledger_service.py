@@ -0,0 +1,287 @@
+"""
+Append-only inventory ledger.
+Every stock change is recorded as a movement. Decreases are applied to the stock
+row as they happen, since they must be checked against the stock; increases
+(restocks, cancellations) are only inserted, so concurrent writers never wait on
+a hot row, and compaction later folds them into the InventoryItem.quantity snapshot.
+Current stock is the snapshot plus the movements not yet applied, and every read
+that decides whether stock can be sold counts both.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from menu_app.models import inventory, ledger, order
+from menu_app.services import cache_service, db_utils, low_stock_service, shard_service
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_BATCH_SIZE = 1000
+
+
+def _pending_movements(**filters):
+    return db_utils.get_model_queryset(ledger.InventoryMovement, applied_at__isnull=True, **filters)
+
+
+def _report_restocked(menu_item_ids: Iterable[int]) -> None:
+    # Reads count pending movements, so an item at zero is back in stock right away
+    if db_utils.get_model_queryset(
+        inventory.InventoryItem, menu_item_id__in=menu_item_ids, quantity=0
+    ).exists():
+        cache_service.bump_availability_version()
+
+
+def record_increase(
+    menu_item_id: int, quantity: int, kind: str, order_id: Optional[int] = None
+) -> ledger.InventoryMovement:
+    """
+    Record stock coming back or arriving. The stock row is not touched until compaction.
+
+    Args:
+        menu_item_id: ID of the menu item
+        quantity: Amount of stock added
+        kind: Movement kind (restock, cancel or adjustment)
+        order_id: ID of the order the movement belongs to, if any
+
+    Returns:
+        The recorded movement
+
+    Raises:
+        ValueError: If quantity is not positive
+    """
+    if quantity <= 0:
+        raise ValueError('Quantity must be positive')
+    movement = db_utils.create_model_instance(
+        ledger.InventoryMovement,
+        menu_item_id=menu_item_id,
+        kind=kind,
+        quantity_change=quantity,
+        order_id=order_id,
+    )
+    _report_restocked([menu_item_id])
+    return movement
+
+
+def record_applied(
+    changes: Dict[int, int], kind: str, order_id: Optional[int] = None
+) -> List[ledger.InventoryMovement]:
+    """
+    Record stock changes that were already applied to the stock rows, in one insert.
+
+    Args:
+        changes: Dict mapping menu item IDs to signed quantity changes
+        kind: Movement kind
+        order_id: ID of the order the movements belong to, if any
+
+    Returns:
+        The recorded movements
+    """
+    now = timezone.now()
+    return db_utils.bulk_create_instances(
+        ledger.InventoryMovement,
+        [
+            {
+                'menu_item_id': menu_item_id,
+                'kind': kind,
+                'quantity_change': change,
+                'order_id': order_id,
+                'applied_at': now,
+            }
+            for menu_item_id, change in changes.items()
+        ],
+    )
+
+
+def record_order_returns(order_ids: List[int]) -> int:
+    """
+    Record the stock held by the given orders as returned, one movement per order line.
+
+    Returns:
+        Number of movements recorded
+    """
+    lines = list(
+        db_utils.get_model_queryset(order.OrderItem, order_id__in=order_ids).values_list(
+            'order_id', 'menu_item_id', 'quantity'
+        )
+    )
+    movements = db_utils.bulk_create_instances(
+        ledger.InventoryMovement,
+        [
+            {
+                'menu_item_id': menu_item_id,
+                'kind': ledger.InventoryMovement.CANCEL,
+                'quantity_change': quantity,
+                'order_id': order_id,
+            }
+            for order_id, menu_item_id, quantity in lines
+        ],
+    )
+    if lines:
+        _report_restocked({menu_item_id for _, menu_item_id, _ in lines})
+    return len(movements)
+
+
+def get_pending_quantities(menu_item_ids: Optional[List[int]] = None) -> Dict[int, int]:
+    """
+    Sum the movements not yet folded into the stock snapshot.
+
+    Returns:
+        Dict mapping menu item IDs to pending quantity changes
+    """
+    pending = _pending_movements()
+    if menu_item_ids is not None:
+        pending = pending.filter(menu_item_id__in=menu_item_ids)
+    return dict(
+        pending.order_by()
+        .values('menu_item_id')
+        .annotate(total=Sum('quantity_change'))
+        .values_list('menu_item_id', 'total')
+    )
+
+
+def pending_quantity_subquery(menu_item_ref: str = 'menu_item_id'):
+    """
+    Expression for the pending quantity change of a row, for annotations and filters.
+
+    Args:
+        menu_item_ref: Field of the outer row holding the menu item ID; 'id' when
+            the outer rows are menu items
+    """
+    pending = (
+        _pending_movements(menu_item_id=OuterRef(menu_item_ref))
+        .order_by()
+        .values('menu_item_id')
+        .annotate(total=Sum('quantity_change'))
+        .values('total')
+    )
+    return Coalesce(Subquery(pending), Value(0))
+
+
+def settle_pending(menu_item_ids: List[int]) -> Dict[int, int]:
+    """
+    Mark the given items' pending movements applied without folding them, for a stock
+    count that overwrites the snapshot. Call it inside a transaction that already
+    holds the items' stock row locks; the movements are waited on, not skipped, so
+    none of them can be folded on top of the count afterwards.
+
+    Returns:
+        Dict mapping menu item IDs to the pending quantity change settled
+    """
+    movements = list(
+        _pending_movements(menu_item_id__in=menu_item_ids)
+        .select_for_update()
+        .order_by('id')
+        .values_list('id', 'menu_item_id', 'quantity_change')
+    )
+    settled: Dict[int, int] = {}
+    for _, menu_item_id, change in movements:
+        settled[menu_item_id] = settled.get(menu_item_id, 0) + change
+    if movements:
+        db_utils.get_model_queryset(
+            ledger.InventoryMovement, id__in=[movement[0] for movement in movements]
+        ).update(applied_at=timezone.now())
+    return settled
+
+
+def get_stock_level(menu_item_id: int) -> int:
+    """
+    Get the current stock of a menu item: its snapshot plus pending movements.
+    """
+    snapshot = (
+        db_utils.get_model_queryset(inventory.InventoryItem, menu_item_id=menu_item_id)
+        .values_list('quantity', 'shard_count')
+        .first()
+    )
+    if not snapshot:
+        quantity = 0
+    elif snapshot[1] > 1:
+        quantity = shard_service.get_total(menu_item_id)
+    else:
+        quantity = snapshot[0]
+    return quantity + get_pending_quantities([menu_item_id]).get(menu_item_id, 0)
+
+
+def compact_movements(
+    batch_size: int = COMPACTION_BATCH_SIZE, menu_item_ids: Optional[List[int]] = None
+) -> int:
+    """
+    Fold pending movements into the stock snapshots, one batch per transaction.
+    Each batch costs one UPDATE of the affected stock rows, however many
+    movements it holds.
+
+    Args:
+        batch_size: Maximum number of movements folded per transaction
+        menu_item_ids: Only fold movements for these menu items
+
+    Returns:
+        Number of movements folded
+    """
+    if batch_size <= 0:
+        raise ValueError('Batch size must be positive')
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            pending = _pending_movements()
+            if menu_item_ids is not None:
+                pending = pending.filter(menu_item_id__in=menu_item_ids)
+            candidates = list(pending.order_by('id').values_list('id', 'menu_item_id')[:batch_size])
+            if not candidates:
+                break
+
+            # Lock the stock rows before the movements, the order stock counts use,
+            # so a count and a compaction never wait on each other's locks
+            list(
+                db_utils.get_model_queryset(
+                    inventory.InventoryItem,
+                    menu_item_id__in={menu_item_id for _, menu_item_id in candidates},
+                )
+                .select_for_update()
+                .order_by('id')
+                .values_list('id', flat=True)
+            )
+            ids = list(
+                pending.filter(id__in=[movement_id for movement_id, _ in candidates])
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)
+            )
+
+            batch = db_utils.get_model_queryset(ledger.InventoryMovement, id__in=ids)
+            changes = dict(
+                batch.order_by()
+                .values('menu_item_id')
+                .annotate(total=Sum('quantity_change'))
+                .values_list('menu_item_id', 'total')
+            )
+            # Sharded items take their increases into a shard instead of the stock row
+            for menu_item_id in shard_service.get_sharded_item_ids(changes):
+                shard_service.add_stock(menu_item_id, changes.pop(menu_item_id))
+
+            snapshots = db_utils.get_model_queryset(
+                inventory.InventoryItem, menu_item_id__in=list(changes)
+            )
+            # Queryset updates bypass signals, so report items coming back into stock here
+            if snapshots.filter(quantity=0).exists():
+                cache_service.bump_availability_version()
+            snapshots.update(
+                quantity=F('quantity')
+                + Case(
+                    *[When(menu_item_id=item_id, then=Value(n)) for item_id, n in changes.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+            batch.update(applied_at=timezone.now())
+            low_stock_service.refresh_low_stock(changes)
+        total += len(ids)
+        if len(candidates) < batch_size:
+            break
+
+    if total:
+        logger.info(f'Folded {total} inventory movements into stock snapshots')
+    return total
@@ -0,0 +1,92 @@
+"""
+Low-stock tracking.
+InventoryItem.is_low_stock is recomputed whenever an item is saved; stock changes
+made with queryset updates call refresh_low_stock() for the rows they touched.
+Every transition into or out of the low-stock set publishes an inventory event.
+"""
+
+import logging
+from typing import Iterable
+
+from django.db.models import F, Q
+
+from menu_app.models import inventory
+from menu_app.services import db_utils, inventory_events, outbox_service
+
+logger = logging.getLogger(__name__)
+
+
+def _payload(menu_item_id: int, name: str, quantity: int, threshold: int):
+    return {
+        'menu_item_id': menu_item_id,
+        'name': name,
+        'quantity': quantity,
+        'threshold': threshold,
+    }
+
+
+def publish_transition(inventory_item: inventory.InventoryItem) -> None:
+    """
+    Publish the event for an item that just entered or left the low-stock set.
+    """
+    event_type = (
+        inventory_events.INVENTORY_LOW_STOCK
+        if inventory_item.is_low_stock
+        else inventory_events.INVENTORY_RESTOCKED
+    )
+    outbox_service.publish(
+        event_type,
+        _payload(
+            inventory_item.menu_item_id,
+            inventory_item.menu_item.name,
+            inventory_item.quantity,
+            inventory_item.low_stock_threshold,
+        ),
+    )
+
+
+def refresh_low_stock(menu_item_ids: Iterable[int]) -> int:
+    """
+    Bring the low-stock flag of the given items in line with their stock after a
+    queryset update, publishing an event for each transition.
+    Only the given rows are read, never the whole table.
+
+    Args:
+        menu_item_ids: IDs of the menu items whose stock changed
+
+    Returns:
+        Number of items whose flag changed
+    """
+    rows = db_utils.get_model_queryset(
+        inventory.InventoryItem, menu_item_id__in=list(menu_item_ids)
+    )
+    threshold = F('low_stock_threshold')
+    changed = list(
+        rows.filter(
+            Q(is_low_stock=False, quantity__lte=threshold)
+            | Q(is_low_stock=True, quantity__gt=threshold)
+        ).values_list(
+            'id',
+            'menu_item_id',
+            'menu_item__name',
+            'quantity',
+            'low_stock_threshold',
+            'is_low_stock',
+        )
+    )
+    if not changed:
+        return 0
+
+    for was_low, event_type in (
+        (False, inventory_events.INVENTORY_LOW_STOCK),
+        (True, inventory_events.INVENTORY_RESTOCKED),
+    ):
+        batch = [row for row in changed if row[5] == was_low]
+        if not batch:
+            continue
+        db_utils.get_model_queryset(
+            inventory.InventoryItem, id__in=[row[0] for row in batch]
+        ).update(is_low_stock=not was_low)
+        outbox_service.publish_many(event_type, [_payload(*row[1:5]) for row in batch])
+
+    return len(changed)
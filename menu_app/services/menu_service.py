@@ -1,15 +1,29 @@
 import logging
+from collections import Counter
+from decimal import Decimal
 from functools import wraps
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import QuerySet
-
-from menu_app.models import menu_item
-from menu_app.services import db_utils, menu_utils
+from django.db.models import DecimalField, F, Q, QuerySet, Value
+from django.db.models.functions import Round
+
+from menu_app.models import inventory, menu_item, order
+from menu_app.services import (
+    cache_service,
+    db_utils,
+    ledger_service,
+    low_stock_service,
+    menu_utils,
+)
 
 logger = logging.getLogger(__name__)
 
+# Largest price a MenuItem.price column (6 digits, 2 decimal places) can hold
+MAX_PRICE = Decimal('9999.99')
+
 
 def validate_category(category: str) -> str:
     """Validate and standardize category name"""
@@ -121,6 +135,47 @@ def get_menu(
         raise
 
 
+def with_stock(queryset: QuerySet[menu_item.MenuItem]) -> QuerySet[menu_item.MenuItem]:
+    """
+    Load each menu item's inventory and pending ledger movements in the same query,
+    so is_available needs no further queries and counts restocks not yet compacted.
+    """
+    return queryset.select_related('inventory').annotate(
+        pending_quantity=ledger_service.pending_quantity_subquery('id')
+    )
+
+
+def get_catalog(category: Optional[str] = None) -> List[Dict]:
+    """
+    Get the public menu catalog as plain data, cached per menu version.
+
+    Args:
+        category: Optional category to filter by
+
+    Returns:
+        List of dicts with id, name, category, price and availability
+    """
+    if category:
+        category = validate_category(category)
+
+    cache_key = f'menu:catalog:{category or "all"}:{cache_service.get_menu_version_token()}'
+
+    def build_catalog():
+        queryset = with_stock(get_menu(category=category))
+        return [
+            {
+                'id': item.id,
+                'name': item.name,
+                'category': item.category,
+                'price': str(item.price),
+                'available': item.is_available,
+            }
+            for item in queryset
+        ]
+
+    return cache.get_or_set(cache_key, build_catalog, settings.MENU_CACHE_TIMEOUT)
+
+
 def search_menu(query: str) -> List[menu_item.MenuItem]:
     """
     Search the menu by name or category
@@ -197,25 +252,173 @@ def modify_menu_item(
     name: Optional[str] = None,
     price: Optional[float] = None,
     category: Optional[str] = None,
+    expected_version: Optional[int] = None,
 ) -> menu_item.MenuItem:
     """
     Modify an existing menu item
+
+    Args:
+        menu_item: The MenuItem to modify
+        name: New name
+        price: New price
+        category: New category
+        expected_version: Version the editor's copy was read at; when given, the
+            edit fails instead of overwriting a change made since
+
+    Raises:
+        ValueError: If a value is invalid
+        VersionConflictError: If the item changed since expected_version
     """
     if not menu_item:
         raise ValueError('Menu item cannot be None')
 
+    changes = {}
     if name is not None:
         standardized_name = validate_name(name)
-        if standardized_name != menu_item.name:
-            if menu_utils.get_menu_item(name=standardized_name):
-                raise ValueError(f"Menu item with name '{standardized_name}' already exists")
-            menu_item.name = standardized_name
+        existing = menu_utils.get_menu_item(name=standardized_name)
+        if existing and existing.id != menu_item.id:
+            raise ValueError(f"Menu item with name '{standardized_name}' already exists")
+        changes['name'] = standardized_name
 
     if price is not None:
-        menu_item.price = validate_price(price)
+        changes['price'] = validate_price(price)
 
     if category is not None:
-        menu_item.category = validate_category(category)
+        changes['category'] = validate_category(category)
 
-    menu_item.save()
+    with transaction.atomic():
+        db_utils.claim_version(menu_item, expected_version)
+        db_utils.update_model_instance(menu_item, **changes)
     return menu_item
+
+
+@with_transaction
+def bulk_add_menu_items(items: List[Dict]) -> List[menu_item.MenuItem]:
+    """
+    Add several menu items, each with an empty inventory item, with a fixed number of
+    queries however many items are added.
+
+    Args:
+        items: Dicts with the name, price and category of each new item
+
+    Returns:
+        The created menu items
+
+    Raises:
+        ValueError: If an item is invalid, or a name is repeated or already on the menu;
+            nothing is created in that case
+    """
+    if not items:
+        raise ValueError('No menu items given')
+
+    rows = [
+        {
+            'name': validate_name(item.get('name', '')),
+            'price': validate_price(item.get('price', 0)),
+            'category': validate_category(item.get('category', '')),
+        }
+        for item in items
+    ]
+    names = Counter(row['name'] for row in rows)
+    repeated = sorted(name for name, count in names.items() if count > 1)
+    if repeated:
+        raise ValueError(f'Names given more than once: {", ".join(repeated)}')
+    existing = sorted(
+        db_utils.get_model_queryset(menu_item.MenuItem, name__in=list(names)).values_list(
+            'name', flat=True
+        )
+    )
+    if existing:
+        raise ValueError(f'Menu items already exist: {", ".join(existing)}')
+
+    created = db_utils.bulk_create_instances(menu_item.MenuItem, rows)
+    db_utils.bulk_create_instances(
+        inventory.InventoryItem, [{'menu_item': item, 'quantity': 0} for item in created]
+    )
+    # bulk_create skips save() and its signals, so flag the empty items as low on
+    # stock here, publishing their inventory.low_stock events in one insert
+    low_stock_service.refresh_low_stock([item.id for item in created])
+    # Bulk inserts send no signals, so invalidate the catalog once for the batch
+    cache_service.bump_catalog_version()
+    logger.info(f'Created {len(created)} menu items with inventory')
+    return created
+
+
+@with_transaction
+def adjust_category_prices(
+    category: str, percent: Optional[Decimal] = None, amount: Optional[Decimal] = None
+) -> int:
+    """
+    Change the price of every item in a category with a single UPDATE.
+
+    Args:
+        category: Category whose prices change
+        percent: Percentage to change prices by, e.g. 10 or -5
+        amount: Amount to add to every price, e.g. 0.50 or -1
+
+    Returns:
+        Number of items repriced
+
+    Raises:
+        ValueError: If not exactly one of percent and amount is given, or the change
+            would take a price out of range; no price changes in that case
+    """
+    category = validate_category(category)
+    if (percent is None) == (amount is None):
+        raise ValueError('Give either a percentage or an amount')
+
+    if percent is not None:
+        factor = Value(1 + Decimal(percent) / 100, output_field=DecimalField())
+        new_price = Round(F('price') * factor, 2, output_field=DecimalField())
+    else:
+        new_price = F('price') + Value(Decimal(amount), output_field=DecimalField())
+
+    items = db_utils.get_model_queryset(menu_item.MenuItem, category=category)
+    out_of_range = items.alias(new_price=new_price).filter(
+        Q(new_price__lte=0) | Q(new_price__gt=MAX_PRICE)
+    )
+    if out_of_range.exists():
+        raise ValueError(f'The change would take some prices out of range (0 to {MAX_PRICE})')
+
+    # Each price change is an edit, so editors with an older copy see a conflict
+    repriced = items.update(price=new_price, version=F('version') + 1)
+    if repriced:
+        cache_service.bump_catalog_version()
+    logger.info(f'Repriced {repriced} items in category {category}')
+    return repriced
+
+
+@with_transaction
+def delete_menu_items(menu_item_ids: List[int]) -> Tuple[int, List[int]]:
+    """
+    Delete several menu items, keeping those that orders still refer to.
+    The references are checked with one query rather than one per item.
+
+    Args:
+        menu_item_ids: IDs of the menu items to delete
+
+    Returns:
+        Number of menu items deleted, and the IDs kept because orders refer to them
+
+    Raises:
+        ValueError: If no IDs are given
+    """
+    if not menu_item_ids:
+        raise ValueError('No menu items given')
+
+    ids = set(menu_item_ids)
+    protected = set(
+        db_utils.get_model_queryset(order.OrderItem, menu_item_id__in=ids)
+        .order_by()
+        .values_list('menu_item_id', flat=True)
+        .distinct()
+    )
+    # Each deleted row sends its own signals; they invalidate the cache once
+    with cache_service.batch_invalidation():
+        _, deleted = db_utils.get_model_queryset(
+            menu_item.MenuItem, id__in=ids - protected
+        ).delete()
+
+    count = deleted.get(menu_item.MenuItem._meta.label, 0)
+    logger.info(f'Deleted {count} menu items, kept {len(protected)} referenced by orders')
+    return count, sorted(protected)
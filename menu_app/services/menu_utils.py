@@ -8,7 +8,7 @@ from typing import Dict, List, Optional, Union
 from django.db.models import Q
 
 from menu_app.models import inventory, menu_item
-from menu_app.services import db_utils
+from menu_app.services import db_utils, ledger_service, shard_service
 
 logger = logging.getLogger(__name__)
 
@@ -112,11 +112,21 @@ def search_menu_items(query: str) -> List[menu_item.MenuItem]:
 
 def check_item_availability(menu_item: menu_item.MenuItem, quantity: int = 1) -> bool:
     """
-    Check if the requested quantity of a menu item is available based on inventory
+    Check if the requested quantity of a menu item is available based on inventory.
+    Stock held by carts is not available; restocks still pending in the ledger are.
+    A sharded item's stock is read from its shards, since quantity only mirrors
+    their total after a rebalance.
     """
     try:
-        inventory_item = inventory.InventoryItem.objects.get(menu_item=menu_item)
-        return inventory_item.quantity >= quantity
+        inventory_item = inventory.InventoryItem.objects.annotate(
+            pending_quantity=ledger_service.pending_quantity_subquery()
+        ).get(menu_item=menu_item)
+        if inventory_item.is_sharded:
+            stock = shard_service.get_total(menu_item.id, cached=False)
+        else:
+            stock = inventory_item.quantity
+        available = stock + inventory_item.pending_quantity - inventory_item.reserved_quantity
+        return available >= quantity
     except inventory.InventoryItem.DoesNotExist:
         logger.warning(f'No inventory found for menu item {menu_item.name}')
         return False
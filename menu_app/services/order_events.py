@@ -0,0 +1,30 @@
+"""
+Consumers for order events published through the outbox.
+These run in the outbox worker, outside the request that changed the order.
+"""
+
+import logging
+from typing import Any, Dict
+
+from menu_app.services import cache_service, outbox_service
+
+logger = logging.getLogger(__name__)
+notification_logger = logging.getLogger('menu_app.notifications')
+
+ORDER_PLACED = 'order.placed'
+ORDER_COMPLETED = 'order.completed'
+ORDER_CANCELLED = 'order.cancelled'
+
+
+@outbox_service.register_handler(ORDER_PLACED, ORDER_COMPLETED, ORDER_CANCELLED)
+def invalidate_order_caches(payload: Dict[str, Any]) -> None:
+    """Refresh cached order summaries shown to staff."""
+    cache_service.bump_orders_version()
+
+
+@outbox_service.register_handler(ORDER_PLACED, ORDER_COMPLETED, ORDER_CANCELLED)
+def notify_staff(payload: Dict[str, Any]) -> None:
+    """Send a staff notification for the order state change."""
+    notification_logger.info(
+        f'Order {payload["order_id"]} is now {payload["status"]} (total ${payload["total"]})'
+    )
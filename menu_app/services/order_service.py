@@ -4,12 +4,25 @@ This module manages orders and their items.
 """
 
 import logging
-from typing import List, Optional
-
-from django.db import transaction
-
-from menu_app.models import menu_item, order
-from menu_app.services import db_utils, inventory_service, menu_utils
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from menu_app.models import ledger, menu_item, order
+from menu_app.services import (
+    admission_service,
+    db_utils,
+    idempotency_service,
+    inventory_service,
+    ledger_service,
+    menu_utils,
+    order_events,
+    outbox_service,
+    reservation_service,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +52,43 @@ def get_order(order_id: str) -> Optional[order.Order]:
         return None
 
 
+def _order_totals(order_ids: List[int]) -> Dict[int, Decimal]:
+    """
+    Compute order totals for several orders with a single aggregate query.
+    """
+    line_total = ExpressionWrapper(
+        F('quantity') * F('price_at_time_of_order'),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    totals = (
+        db_utils.get_model_queryset(order.OrderItem, order_id__in=order_ids)
+        .values('order_id')
+        .annotate(total=Sum(line_total))
+    )
+    result = {order_id: Decimal('0.00') for order_id in order_ids}
+    for row in totals:
+        result[row['order_id']] = row['total'].quantize(Decimal('0.01'))
+    return result
+
+
+def _publish_order_events(event_type: str, order_ids: List[int], status: str) -> None:
+    """
+    Record order state changes in the outbox, inside the caller's transaction.
+    """
+    totals = _order_totals(order_ids)
+    outbox_service.publish_many(
+        event_type,
+        [
+            {'order_id': order_id, 'status': status, 'total': str(totals[order_id])}
+            for order_id in order_ids
+        ],
+    )
+
+
+def _publish_order_event(event_type: str, order_obj: order.Order) -> None:
+    _publish_order_events(event_type, [order_obj.id], order_obj.status)
+
+
 def get_all_orders() -> List[order.Order]:
     """
     Get all orders with their items
@@ -58,6 +108,165 @@ def create_order() -> order.Order:
         raise RuntimeError(f'Failed to create order: {e!s}')
 
 
+def checkout(
+    cart: Dict[str, int], holder: Optional[str] = None, idempotency_key: Optional[str] = None
+) -> order.Order:
+    """
+    Place an order for the contents of a cart.
+    The checkout must first be admitted: sold-out items fail at once, and checkouts
+    beyond the per-item concurrency limit wait briefly for a slot or fail, instead
+    of queueing on the stock row.
+
+    Args:
+        cart: Dict mapping menu item IDs to quantities
+        holder: Token of the cart's stock reservations, if it has any
+        idempotency_key: Key sent with the checkout; a repeated submission with the
+            same key returns the order placed by the first one
+
+    Returns:
+        The placed order
+
+    Raises:
+        ValueError: If the cart is empty, or the idempotency key is invalid or was
+            used for a different cart
+        RuntimeError: If an item is not on the menu, not in stock, or too busy
+    """
+    if idempotency_key is not None:
+        idempotency_service.validate_key(idempotency_key)
+        placed = idempotency_service.get_order(idempotency_key, cart)
+        if placed:
+            logger.info(f'Returning order {placed.id} for a repeated checkout')
+            return placed
+    if not cart:
+        raise ValueError('Cart cannot be empty')
+
+    try:
+        quantities = {int(menu_item_id): quantity for menu_item_id, quantity in cart.items()}
+        menu_items = menu_utils.get_menu_items_bulk(menu_item_ids=list(quantities))
+        missing = sorted(set(quantities) - set(menu_items))
+        if missing:
+            raise ValueError(f'Menu item {missing[0]} not found')
+    except ValueError as e:
+        logger.error(f'Error placing order: {e!s}')
+        raise RuntimeError(f'Failed to place order: {e!s}')
+
+    with admission_service.admit_checkout(menu_items):
+        try:
+            return _place_order(quantities, menu_items, holder, idempotency_key, cart)
+        except IntegrityError:
+            # A concurrent submission with the same key placed the order first
+            placed = (
+                idempotency_service.get_order(idempotency_key, cart) if idempotency_key else None
+            )
+            if not placed:
+                raise
+            return placed
+
+
+@transaction.atomic
+def _place_order(
+    quantities: Dict[int, int],
+    menu_items: Dict[int, menu_item.MenuItem],
+    holder: Optional[str],
+    idempotency_key: Optional[str],
+    cart: Dict[str, int],
+) -> order.Order:
+    """
+    Take the stock for an admitted checkout and write the order.
+    The idempotency key is claimed first, so a duplicate submission waits on it
+    rather than on the stock. The stock is then taken, turning the cart's
+    reservations into sold stock, so an unavailable item fails the checkout before
+    any order rows are written. The order, its items, the stock changes and the
+    outbox event commit together.
+    """
+    claimed = idempotency_service.claim_key(idempotency_key, cart) if idempotency_key else None
+    try:
+        reservation_service.consume_holds(holder, quantities)
+
+        new_order = create_order()
+        db_utils.bulk_create_instances(
+            order.OrderItem,
+            [
+                {
+                    'order': new_order,
+                    'menu_item': menu_items[menu_item_id],
+                    'quantity': quantity,
+                    'price_at_time_of_order': menu_items[menu_item_id].price,
+                }
+                for menu_item_id, quantity in quantities.items()
+            ],
+        )
+        ledger_service.record_applied(
+            {menu_item_id: -quantity for menu_item_id, quantity in quantities.items()},
+            ledger.InventoryMovement.SALE,
+            order_id=new_order.id,
+        )
+    except ValueError as e:
+        logger.error(f'Error placing order: {e!s}')
+        raise RuntimeError(f'Failed to place order: {e!s}')
+
+    if claimed:
+        claimed.order = new_order
+        claimed.save(update_fields=['order'])
+    _publish_order_event(order_events.ORDER_PLACED, new_order)
+    return new_order
+
+
+@transaction.atomic
+def complete_order(order_id: str) -> order.Order:
+    """
+    Mark a pending order as completed
+
+    Args:
+        order_id: The ID of the order to complete
+
+    Returns:
+        The completed order
+
+    Raises:
+        ValueError: If order is not found or not in pending status
+    """
+    order_obj = get_order(order_id)
+    if not order_obj:
+        raise ValueError(f'Order {order_id} not found')
+
+    order_obj.complete()
+    _publish_order_event(order_events.ORDER_COMPLETED, order_obj)
+    return order_obj
+
+
+@transaction.atomic
+def complete_orders(order_ids: List[int]) -> List[int]:
+    """
+    Mark several pending orders as completed at once.
+    Orders that are missing or no longer pending are skipped.
+
+    Args:
+        order_ids: IDs of the orders to complete
+
+    Returns:
+        IDs of the orders that were completed
+
+    Raises:
+        ValueError: If order_ids is empty
+    """
+    if not order_ids:
+        raise ValueError('Order IDs list cannot be empty')
+
+    locked_ids = list(
+        db_utils.get_model_queryset(order.Order, id__in=order_ids, status='pending')
+        .select_for_update()
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    if locked_ids:
+        db_utils.get_model_queryset(order.Order, id__in=locked_ids).update(
+            status='completed', updated_at=timezone.now()
+        )
+        _publish_order_events(order_events.ORDER_COMPLETED, locked_ids, 'completed')
+    return locked_ids
+
+
 @transaction.atomic
 def add_item_to_order(order_id: str, menu_item_id: int, quantity: int = 1) -> None:
     """
@@ -93,7 +302,9 @@ def add_item_to_order(order_id: str, menu_item_id: int, quantity: int = 1) -> No
             existing_item.quantity += quantity
             db_utils.update_model_instance(existing_item, quantity=existing_item.quantity)
             # Reduce inventory for the additional quantity
-            inventory_service.remove_stock(menu_item_obj, quantity)
+            inventory_service.remove_stock(
+                menu_item_obj, quantity, kind=ledger.InventoryMovement.SALE, order_id=order_obj.id
+            )
         else:
             # Check if we have enough inventory for the new item
             if not menu_utils.check_item_availability(menu_item_obj, quantity):
@@ -106,7 +317,9 @@ def add_item_to_order(order_id: str, menu_item_id: int, quantity: int = 1) -> No
                 quantity=quantity,
             )
             # Reduce inventory
-            inventory_service.remove_stock(menu_item_obj, quantity)
+            inventory_service.remove_stock(
+                menu_item_obj, quantity, kind=ledger.InventoryMovement.SALE, order_id=order_obj.id
+            )
     except Exception as e:
         logger.error(f'Error adding item to order {order_id}: {e!s}')
         raise RuntimeError(f'Failed to add item to order: {e!s}')
@@ -146,10 +359,17 @@ def remove_item_from_order(order_id: str, menu_item_id: int, quantity: int = 1)
             existing_item.quantity -= quantity
             db_utils.update_model_instance(existing_item, quantity=existing_item.quantity)
             # Restore inventory for the removed quantity
-            inventory_service.add_stock(menu_item_obj, quantity)
+            inventory_service.add_stock(
+                menu_item_obj, quantity, kind=ledger.InventoryMovement.CANCEL, order_id=order_obj.id
+            )
         else:
             # Restore all inventory for this item
-            inventory_service.add_stock(menu_item_obj, existing_item.quantity)
+            inventory_service.add_stock(
+                menu_item_obj,
+                existing_item.quantity,
+                kind=ledger.InventoryMovement.CANCEL,
+                order_id=order_obj.id,
+            )
             db_utils.delete_model_instance(existing_item)
     except Exception as e:
         logger.error(f'Error removing item from order {order_id}: {e!s}')
@@ -219,6 +439,18 @@ def get_item_quantity(order_id: str, menu_item_id: int) -> int:
     return order_obj.get_item_quantity(menu_item_obj)
 
 
+def _cancel_locked_orders(order_ids: List[int]) -> None:
+    """
+    Cancel orders that the caller has locked and verified to be pending.
+    Stock for all their lines is restored in one statement.
+    """
+    inventory_service.restore_stock_for_orders(order_ids)
+    db_utils.get_model_queryset(order.Order, id__in=order_ids).update(
+        status='cancelled', updated_at=timezone.now()
+    )
+    _publish_order_events(order_events.ORDER_CANCELLED, order_ids, 'cancelled')
+
+
 @transaction.atomic
 def cancel_order(order_id: str) -> None:
     """
@@ -232,24 +464,53 @@ def cancel_order(order_id: str) -> None:
         RuntimeError: If there are issues cancelling the order
     """
     try:
-        order_obj = get_order(order_id)
-        if not order_obj:
+        status = (
+            db_utils.get_model_queryset(order.Order, id=order_id)
+            .select_for_update()
+            .values_list('status', flat=True)
+            .first()
+        )
+        if status is None:
             raise ValueError(f'Order {order_id} not found')
 
-        if order_obj.status != 'pending':
+        if status != 'pending':
             raise ValueError('Only pending orders can be cancelled')
 
-        # Restore inventory for all items in the order
-        for order_item in order_obj.items.all():
-            try:
-                inventory_service.add_stock(order_item.menu_item, order_item.quantity)
-            except Exception as e:
-                logger.error(f'Error restoring inventory for {order_item.menu_item.name}: {e!s}')
-                # Continue with cancellation even if inventory restoration fails
-
-        # Mark the order as cancelled
-        order_obj.status = 'cancelled'
-        db_utils.update_model_instance(order_obj, status='cancelled')
+        _cancel_locked_orders([int(order_id)])
     except Exception as e:
         logger.error(f'Error cancelling order {order_id}: {e!s}')
         raise RuntimeError(f'Failed to cancel order: {e!s}')
+
+
+@transaction.atomic
+def cancel_orders(order_ids: List[int]) -> List[int]:
+    """
+    Cancel several orders at once and restore their inventory.
+    Orders that are missing or no longer pending are skipped.
+
+    Args:
+        order_ids: IDs of the orders to cancel
+
+    Returns:
+        IDs of the orders that were cancelled
+
+    Raises:
+        ValueError: If order_ids is empty
+    """
+    if not order_ids:
+        raise ValueError('Order IDs list cannot be empty')
+
+    locked_ids = list(
+        db_utils.get_model_queryset(order.Order, id__in=order_ids, status='pending')
+        .select_for_update()
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+    skipped = set(map(int, order_ids)) - set(locked_ids)
+    if skipped:
+        logger.warning(f'Skipping orders that are missing or not pending: {sorted(skipped)}')
+
+    if locked_ids:
+        _cancel_locked_orders(locked_ids)
+        logger.info(f'Cancelled {len(locked_ids)} orders')
+    return locked_ids
@@ -0,0 +1,162 @@
+"""
+In-process fan-out of order changes to staff screens.
+One background thread polls Order.updated_at per interval and hands the changes
+to every subscribed stream, so N open screens cost one query per tick.
+"""
+
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from menu_app.models import order
+from menu_app.services import db_utils
+
+logger = logging.getLogger(__name__)
+
+MAX_QUEUED_EVENTS = 100
+
+
+def _poll_overlap() -> timedelta:
+    # updated_at is set when a row is saved, not when its transaction commits, so
+    # each poll looks back further than the longest order transaction and drops
+    # the (id, updated_at) changes it has already delivered
+    return timedelta(seconds=settings.ORDER_STREAM_POLL_OVERLAP)
+
+
+class OrderChangeHub:
+    """
+    Polls for changed orders and fans the changes out to subscriber queues.
+    The polling thread starts with the first subscriber and stops with the last.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscribers: Set[queue.Queue] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._cursor = timezone.now()
+        self._delivered: Dict[Tuple[int, Any], Any] = {}
+
+    def subscribe(self, limit: Optional[int] = None) -> Optional[queue.Queue]:
+        """
+        Register a new listener and make sure the polling thread is running.
+
+        Args:
+            limit: Most listeners the hub may have; None for no limit
+
+        Returns:
+            The listener, or None if the hub already has limit listeners
+        """
+        listener = queue.Queue(maxsize=MAX_QUEUED_EVENTS)
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(listener)
+            if self._thread is None:
+                self._cursor = timezone.now()
+                self._thread = threading.Thread(
+                    target=self._run, name='order-change-hub', daemon=True
+                )
+                self._thread.start()
+        return listener
+
+    def unsubscribe(self, listener: queue.Queue) -> None:
+        with self._lock:
+            self._subscribers.discard(listener)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def poll(self, publish: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fetch orders changed since the last poll and publish them to subscribers.
+
+        Args:
+            publish: False only records the changes as delivered, so a freshly
+                started hub does not replay the look-back window to new screens
+
+        Returns:
+            The events found
+        """
+        overlap = _poll_overlap()
+        since = self._cursor - overlap
+        rows = (
+            db_utils.get_model_queryset(order.Order, updated_at__gt=since)
+            .order_by('updated_at', 'id')
+            .values('id', 'status', 'claimed_by', 'created_at', 'updated_at')
+        )
+
+        seen_ids = {order_id for order_id, _ in self._delivered}
+        events = []
+        for row in rows:
+            key = (row['id'], row['updated_at'])
+            if key in self._delivered:
+                continue
+            self._delivered[key] = row['updated_at']
+            is_new = row['id'] not in seen_ids and row['created_at'] > since
+            events.append(
+                {
+                    'type': 'order.created' if is_new else 'order.updated',
+                    'order_id': row['id'],
+                    'status': row['status'],
+                    'claimed_by': row['claimed_by'],
+                    'updated_at': row['updated_at'].isoformat(),
+                }
+            )
+            self._cursor = max(self._cursor, row['updated_at'])
+
+        # Forget deliveries that have fallen out of the look-back window
+        horizon = self._cursor - overlap
+        self._delivered = {
+            key: updated_at for key, updated_at in self._delivered.items() if updated_at > horizon
+        }
+
+        if events and publish:
+            self._publish(events)
+        return events
+
+    def _publish(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for listener in subscribers:
+            for event in events:
+                try:
+                    listener.put_nowait(event)
+                except queue.Full:
+                    # A stalled screen must not hold up the others; it will reconnect
+                    logger.warning('Dropping order event for a slow subscriber')
+                    break
+
+    def _run(self) -> None:
+        interval = self.interval or settings.ORDER_STREAM_POLL_INTERVAL
+        try:
+            try:
+                self.poll(publish=False)
+            except Exception as e:
+                logger.error(f'Error polling order changes: {e!s}')
+                close_old_connections()
+            while True:
+                time.sleep(interval)
+                with self._lock:
+                    if not self._subscribers:
+                        self._thread = None
+                        return
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f'Error polling order changes: {e!s}')
+                    close_old_connections()
+        finally:
+            connection.close()
+
+
+hub = OrderChangeHub()
@@ -0,0 +1,207 @@
+"""
+Transactional outbox for order state changes.
+Events are written in the same transaction as the change and consumed later
+by the outbox worker, so slow side effects stay out of the request.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from menu_app.models import outbox
+from menu_app.services import db_utils
+
+logger = logging.getLogger(__name__)
+
+# Events that fail this many times are dead-lettered: the worker stops claiming them
+# until they are retried with retry_dead_letters
+MAX_ATTEMPTS = 5
+
+_handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+
+def register_handler(*event_types: str):
+    """
+    Decorator registering a function as a consumer of the given event types.
+    Handlers receive the event payload and must be idempotent, since an event
+    is retried if any of its handlers fails.
+    """
+
+    def decorator(func):
+        for event_type in event_types:
+            _handlers.setdefault(event_type, []).append(func)
+        return func
+
+    return decorator
+
+
+def get_handlers(event_type: str) -> List[Callable[[Dict[str, Any]], None]]:
+    """Get the handlers registered for an event type."""
+    return list(_handlers.get(event_type, []))
+
+
+def publish(event_type: str, payload: Optional[Dict[str, Any]] = None) -> outbox.OutboxEvent:
+    """
+    Record an event in the outbox as part of the current transaction.
+
+    Args:
+        event_type: Dotted event name, e.g. 'order.completed'
+        payload: JSON-serializable event data
+
+    Returns:
+        The created OutboxEvent
+    """
+    if not event_type:
+        raise ValueError('Event type cannot be empty')
+    return db_utils.create_model_instance(
+        outbox.OutboxEvent, event_type=event_type, payload=payload or {}
+    )
+
+
+def publish_many(event_type: str, payloads: List[Dict[str, Any]]) -> List[outbox.OutboxEvent]:
+    """
+    Record several events of the same type with a single insert.
+
+    Args:
+        event_type: Dotted event name, e.g. 'order.cancelled'
+        payloads: JSON-serializable data for each event
+
+    Returns:
+        The created OutboxEvents
+    """
+    if not event_type:
+        raise ValueError('Event type cannot be empty')
+    return outbox.OutboxEvent.objects.bulk_create(
+        [outbox.OutboxEvent(event_type=event_type, payload=payload) for payload in payloads]
+    )
+
+
+def _dispatch(event: outbox.OutboxEvent) -> Optional[str]:
+    """
+    Run all handlers for one event.
+
+    Returns:
+        None on success, otherwise the error message
+    """
+    try:
+        for handler in get_handlers(event.event_type):
+            handler(event.payload)
+        return None
+    except Exception as e:
+        logger.error(f'Error handling outbox event {event}: {e!s}')
+        return str(e) or e.__class__.__name__
+
+
+def _dispatch_in_thread(event: outbox.OutboxEvent) -> Optional[str]:
+    try:
+        return _dispatch(event)
+    finally:
+        # Pool threads open their own database connections; release them
+        connections.close_all()
+
+
+def process_batch(batch_size: int = 100, max_workers: int = 4) -> int:
+    """
+    Claim and process a batch of pending events.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several workers
+    can run side by side without handling the same event twice.
+
+    Args:
+        batch_size: Maximum number of events to claim
+        max_workers: Number of threads used to run handlers
+
+    Returns:
+        Number of events claimed
+    """
+    if batch_size <= 0 or max_workers <= 0:
+        raise ValueError('Batch size and worker count must be positive')
+
+    with transaction.atomic():
+        events = list(
+            db_utils.get_model_queryset(
+                outbox.OutboxEvent, processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS
+            )
+            .select_for_update(skip_locked=True)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        if max_workers == 1:
+            errors = [_dispatch(event) for event in events]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                errors = list(executor.map(_dispatch_in_thread, events))
+
+        now = timezone.now()
+        dead = []
+        for event, error in zip(events, errors):
+            event.attempts += 1
+            if error is None:
+                event.processed_at = now
+                event.last_error = ''
+            else:
+                event.last_error = error
+                if event.attempts >= MAX_ATTEMPTS:
+                    dead.append(event)
+        outbox.OutboxEvent.objects.bulk_update(events, ['attempts', 'processed_at', 'last_error'])
+
+    for event in dead:
+        logger.error(
+            f'Outbox event {event} dead-lettered after {event.attempts} attempts: '
+            f'{event.last_error}'
+        )
+    failed = sum(1 for error in errors if error is not None)
+    logger.info(f'Processed {len(events) - failed} outbox events ({failed} failed)')
+    return len(events)
+
+
+def _dead_letters():
+    return db_utils.get_model_queryset(
+        outbox.OutboxEvent, processed_at__isnull=True, attempts__gte=MAX_ATTEMPTS
+    )
+
+
+def count_dead_letters() -> int:
+    """Count the events the worker gave up on."""
+    return _dead_letters().count()
+
+
+def retry_dead_letters(event_ids: Optional[List[int]] = None) -> int:
+    """
+    Make dead-lettered events eligible for processing again, once the handler
+    failure behind them has been fixed.
+
+    Args:
+        event_ids: Only retry these events
+
+    Returns:
+        Number of events queued again
+    """
+    dead = _dead_letters()
+    if event_ids is not None:
+        dead = dead.filter(id__in=event_ids)
+    retried = dead.update(attempts=0)
+    if retried:
+        logger.info(f'Queued {retried} dead-lettered outbox events for another attempt')
+    return retried
+
+
+def purge_processed(older_than_days: int = 7) -> int:
+    """
+    Delete events processed more than the given number of days ago.
+    Dead-lettered events were never processed, so they are kept until retried.
+
+    Returns:
+        Number of events deleted
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted, _ = db_utils.get_model_queryset(
+        outbox.OutboxEvent, processed_at__isnull=False, processed_at__lt=cutoff
+    ).delete()
+    return deleted
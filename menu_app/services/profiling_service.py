@@ -0,0 +1,212 @@
+"""
+Per-request profiling for finding slow code in production.
+A sampling thread records the request thread's stack every
+PROFILING_SAMPLE_INTERVAL seconds, for flame graphs and per-function times. Before
+Python 3.12 the request also runs under cProfile, which gives exact call counts
+and times; from 3.12 cProfile uses the interpreter-wide sys.monitoring hooks, so
+under threaded workers it would also time other requests, and only samples are
+used. The SQL the request runs is captured alongside. Results are kept in the
+shared cache for PROFILING_TTL seconds, so any worker can serve them to staff.
+"""
+
+import cProfile
+import logging
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY = 'profiling:profile:{}'
+RECENT_KEY = 'profiling:recent'
+RECENT_COUNT = 50
+TOP_FUNCTION_COUNT = 40
+MAX_QUERIES = 200
+MAX_SQL_LENGTH = 2000
+# cProfile only observes the thread that enabled it before Python 3.12
+USE_CPROFILE = sys.version_info < (3, 12)
+
+
+def _short_path(filename: str) -> str:
+    """Show project files relative to the project and libraries from their package."""
+    base = str(settings.BASE_DIR)
+    if filename.startswith(base):
+        return filename[len(base) :].lstrip('/')
+    _, marker, package_path = filename.rpartition('site-packages/')
+    return package_path if marker else filename
+
+
+def _frame_label(code) -> str:
+    return f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})'
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval and counts each distinct stack."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[';'.join(reversed(labels))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def top_functions(self) -> List[Dict[str, Any]]:
+        """Estimate time per function from the samples it appeared in."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            labels = stack.split(';')
+            own[labels[-1]] += count
+            for label in set(labels):
+                total[label] += count
+        interval_ms = self.interval * 1000
+        return [
+            {
+                'function': label,
+                'calls': None,
+                'own_ms': round(own[label] * interval_ms, 3),
+                'total_ms': round(count * interval_ms, 3),
+            }
+            for label, count in total.most_common(TOP_FUNCTION_COUNT)
+        ]
+
+
+def _top_functions(profiler: cProfile.Profile) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler).stats
+    rows = [
+        {
+            'function': f'{name} ({_short_path(filename)}:{line})',
+            'calls': calls,
+            'own_ms': round(own_time * 1000, 3),
+            'total_ms': round(total_time * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, own_time, total_time, _) in stats.items()
+    ]
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows[:TOP_FUNCTION_COUNT]
+
+
+def _record_query(queries: List[Dict[str, Any]], execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if len(queries) < MAX_QUERIES:
+            queries.append(
+                {
+                    'sql': sql[:MAX_SQL_LENGTH],
+                    'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+                }
+            )
+
+
+@contextmanager
+def profile() -> Iterator[Dict[str, Any]]:
+    """
+    Profile the code run in the block on the current thread.
+
+    Yields:
+        Dict that, when the block ends, holds the duration, the top functions by
+        total time, the sampled stacks in collapsed format and the SQL queries run,
+        with all times in milliseconds
+    """
+    result: Dict[str, Any] = {}
+    queries: List[Dict[str, Any]] = []
+    sampler = _StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL)
+    profiler: Optional[cProfile.Profile] = cProfile.Profile() if USE_CPROFILE else None
+    if profiler is not None:
+        try:
+            profiler.enable()
+        except ValueError:
+            # Only one deterministic profiler can run at a time; the samples still work
+            logger.info('Another profiler is active, recording stack samples only')
+            profiler = None
+
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        with connection.execute_wrapper(
+            lambda *args: _record_query(queries, *args),
+        ):
+            yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        sampler.stop()
+        result.update(
+            duration_ms=round((time.perf_counter() - started) * 1000, 3),
+            functions=(
+                _top_functions(profiler) if profiler is not None else sampler.top_functions()
+            ),
+            sampled=profiler is None,
+            collapsed='\n'.join(
+                f'{stack} {count}' for stack, count in sampler.stacks.most_common()
+            ),
+            queries=queries,
+        )
+
+
+def save_profile(result: Dict[str, Any], **details: Any) -> str:
+    """
+    Store a profile for staff to inspect.
+
+    Args:
+        result: Profile produced by profile()
+        **details: Request details to show with it, such as path and status
+
+    Returns:
+        ID of the stored profile
+    """
+    profile_id = uuid.uuid4().hex[:16]
+    summary = {
+        'id': profile_id,
+        'created_at': timezone.now(),
+        'duration_ms': result['duration_ms'],
+        'query_count': len(result['queries']),
+        **details,
+    }
+    cache.set(PROFILE_KEY.format(profile_id), {**summary, **result}, settings.PROFILING_TTL)
+    # The list is only a convenience: a profile lost to a concurrent save is still
+    # reachable through the X-Profile-Id header of its response
+    recent = [summary, *(cache.get(RECENT_KEY) or [])][:RECENT_COUNT]
+    cache.set(RECENT_KEY, recent, settings.PROFILING_TTL)
+    logger.info(f'Stored profile {profile_id} ({result["duration_ms"]:.0f} ms)')
+    return profile_id
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a stored profile, or None if it expired or never existed.
+    """
+    return cache.get(PROFILE_KEY.format(profile_id))
+
+
+def get_recent_profiles() -> List[Dict[str, Any]]:
+    """
+    Get summaries of the most recent profiles, newest first.
+    """
+    return cache.get(RECENT_KEY) or []
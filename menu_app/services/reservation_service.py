@@ -0,0 +1,262 @@
+"""
+Time-limited stock reservations for customer carts.
+Adding an item to a cart holds its stock, so a sold-out item is reported when it
+is added rather than at checkout. Holds are counted in
+InventoryItem.reserved_quantity, so availability is a column read, not a SUM.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from menu_app.models import inventory, menu_item, reservation
+from menu_app.services import (
+    cache_service,
+    db_utils,
+    ledger_service,
+    low_stock_service,
+    shard_service,
+)
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = 500
+
+
+def _inventory_queryset(**filters):
+    return db_utils.get_model_queryset(inventory.InventoryItem, **filters)
+
+
+def _menu_item_name(menu_item_id: int) -> str:
+    item = db_utils.get_model_queryset(menu_item.MenuItem, id=menu_item_id).first()
+    return item.name if item else f'menu item {menu_item_id}'
+
+
+def _release_counts(counts: Dict[int, int]) -> None:
+    """Give held quantities back to the available stock in a single UPDATE."""
+    if not counts:
+        return
+    released = Case(
+        *[When(menu_item_id=item_id, then=Value(count)) for item_id, count in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    _inventory_queryset(menu_item_id__in=list(counts)).update(
+        reserved_quantity=Greatest(F('reserved_quantity') - released, Value(0))
+    )
+
+
+def _take_stock(menu_item_id: int, quantity: int, held: int) -> bool:
+    """Sell stock from the row in one conditional UPDATE, consuming a hold of held."""
+    # Other carts' holds must still fit in what is left after this order
+    return bool(
+        _inventory_queryset(
+            menu_item_id=menu_item_id,
+            quantity__gte=F('reserved_quantity') - held + quantity,
+        ).update(
+            quantity=F('quantity') - quantity,
+            reserved_quantity=Greatest(F('reserved_quantity') - held, Value(0)),
+        )
+    )
+
+
+@transaction.atomic
+def sync_holds(holder: str, cart: Dict[str, int]) -> None:
+    """
+    Make a cart's holds match its contents and extend their expiry.
+    Lines whose quantity grew take the extra stock only if it is available.
+
+    Args:
+        holder: Token identifying the cart
+        cart: Dict mapping menu item IDs (as strings) to quantities
+
+    Raises:
+        ValueError: If the holder is empty or there is not enough stock for a line;
+            in that case no hold is changed
+    """
+    if not holder:
+        raise ValueError('Reservation holder cannot be empty')
+
+    wanted = {int(menu_item_id): quantity for menu_item_id, quantity in cart.items()}
+
+    # Holding stock of a sharded item would bring back the hot row sharding avoids,
+    # so those lines are only checked against the shards, read exactly
+    for menu_item_id in shard_service.get_sharded_item_ids(wanted):
+        if shard_service.get_total(menu_item_id, cached=False) < wanted.pop(menu_item_id):
+            raise ValueError(f'Insufficient stock for {_menu_item_name(menu_item_id)}')
+    current = {
+        hold.menu_item_id: hold
+        for hold in db_utils.get_model_queryset(
+            reservation.StockReservation, holder=holder
+        ).select_for_update()
+    }
+
+    released = {}
+    for menu_item_id, quantity in wanted.items():
+        held = current[menu_item_id].quantity if menu_item_id in current else 0
+        extra = quantity - held
+        if extra > 0:
+            # Restocks still waiting in the ledger count as stock that can be held
+            # An item sharded since the check above takes no hold
+            taken = _inventory_queryset(
+                menu_item_id=menu_item_id,
+                shard_count=1,
+                quantity__gte=(
+                    F('reserved_quantity') + extra - ledger_service.pending_quantity_subquery()
+                ),
+            ).update(reserved_quantity=F('reserved_quantity') + extra)
+            if not taken:
+                raise ValueError(f'Insufficient stock for {_menu_item_name(menu_item_id)}')
+        elif extra < 0:
+            released[menu_item_id] = -extra
+    for menu_item_id, hold in current.items():
+        if menu_item_id not in wanted:
+            released[menu_item_id] = hold.quantity
+    _release_counts(released)
+
+    expires_at = timezone.now() + timedelta(seconds=settings.CART_RESERVATION_TTL)
+    stale = [hold.id for item_id, hold in current.items() if item_id not in wanted]
+    if stale:
+        db_utils.get_model_queryset(reservation.StockReservation, id__in=stale).delete()
+
+    changed = []
+    for menu_item_id, quantity in wanted.items():
+        hold = current.get(menu_item_id)
+        if hold:
+            hold.quantity = quantity
+            hold.expires_at = expires_at
+            changed.append(hold)
+    db_utils.bulk_update_instances(changed, ['quantity', 'expires_at'])
+    db_utils.bulk_create_instances(
+        reservation.StockReservation,
+        [
+            {
+                'holder': holder,
+                'menu_item_id': menu_item_id,
+                'quantity': quantity,
+                'expires_at': expires_at,
+            }
+            for menu_item_id, quantity in wanted.items()
+            if menu_item_id not in current
+        ],
+    )
+
+
+@transaction.atomic
+def consume_holds(holder: Optional[str], quantities: Dict[int, int]) -> None:
+    """
+    Take the stock for an order, turning the cart's holds into sold stock.
+    Each line is one conditional UPDATE; lines without a live hold, or with a
+    smaller one, only succeed if enough unreserved stock is left. A line the stock
+    row cannot cover folds the item's pending ledger movements in and tries again.
+
+    Args:
+        holder: Token identifying the cart, or None for an order without holds
+        quantities: Dict mapping menu item IDs to ordered quantities
+
+    Raises:
+        ValueError: If there is not enough stock for a line; no stock is taken
+    """
+    holds = {}
+    if holder:
+        holds = dict(
+            db_utils.get_model_queryset(reservation.StockReservation, holder=holder)
+            .select_for_update()
+            .values_list('menu_item_id', 'quantity')
+        )
+
+    sharded = shard_service.get_sharded_item_ids(quantities)
+    for menu_item_id, quantity in sorted(quantities.items()):
+        if menu_item_id in sharded:
+            try:
+                shard_service.take_stock(menu_item_id, quantity)
+            except ValueError:
+                raise ValueError(f'Insufficient stock for {_menu_item_name(menu_item_id)}')
+            continue
+
+        held = holds.pop(menu_item_id, 0)
+        if not _take_stock(menu_item_id, quantity, held):
+            # The stock may be waiting in the ledger; fold it into the row and retry
+            if not ledger_service.compact_movements(menu_item_ids=[menu_item_id]):
+                raise ValueError(f'Insufficient stock for {_menu_item_name(menu_item_id)}')
+            if not _take_stock(menu_item_id, quantity, held):
+                raise ValueError(f'Insufficient stock for {_menu_item_name(menu_item_id)}')
+
+    # Holds for items that did not make it into the order go back to stock
+    _release_counts(holds)
+    if holder:
+        db_utils.get_model_queryset(reservation.StockReservation, holder=holder).delete()
+
+    # Queryset updates bypass signals, so report items that just sold out here
+    if _inventory_queryset(menu_item_id__in=list(quantities), quantity=0).exists():
+        cache_service.bump_availability_version()
+    low_stock_service.refresh_low_stock(set(quantities) - sharded)
+
+
+@transaction.atomic
+def release_holds(holder: str) -> int:
+    """
+    Release every hold of a cart.
+
+    Returns:
+        Number of holds released
+    """
+    holds = db_utils.get_model_queryset(
+        reservation.StockReservation, holder=holder
+    ).select_for_update()
+    counts = dict(holds.values_list('menu_item_id', 'quantity'))
+    _release_counts(counts)
+    holds.delete()
+    return len(counts)
+
+
+def expire_reservations(batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Release expired holds, one batch per transaction.
+    Rows locked by a cart being updated are skipped and picked up next time.
+
+    Args:
+        batch_size: Maximum number of holds released per transaction
+
+    Returns:
+        Number of holds released
+    """
+    if batch_size <= 0:
+        raise ValueError('Batch size must be positive')
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids: List[int] = list(
+                db_utils.get_model_queryset(
+                    reservation.StockReservation, expires_at__lte=timezone.now()
+                )
+                .select_for_update(skip_locked=True)
+                .order_by('expires_at')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            expired = db_utils.get_model_queryset(reservation.StockReservation, id__in=ids)
+            _release_counts(
+                dict(
+                    expired.order_by()
+                    .values('menu_item_id')
+                    .annotate(total=Sum('quantity'))
+                    .values_list('menu_item_id', 'total')
+                )
+            )
+            expired.delete()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if total:
+        logger.info(f'Released {total} expired stock reservations')
+    return total
@@ -0,0 +1,213 @@
+"""
+Sharded stock counters for hot menu items.
+A sharded item's stock is split across StockShard rows. A sale decrements one
+randomly chosen shard with a conditional UPDATE, so concurrent checkouts for the
+same item mostly lock different rows. InventoryItem.quantity mirrors the shard
+total for display and is refreshed by the rebalancer. Carts do not hold stock of
+sharded items, since every hold would lock the InventoryItem row again; they are
+checked against the shard total and the stock is taken at checkout.
+"""
+
+import logging
+import random
+from typing import Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+
+from menu_app.models import inventory, menu_item
+from menu_app.services import cache_service, db_utils, low_stock_service
+
+logger = logging.getLogger(__name__)
+
+MAX_SHARDS = 64
+SHARD_TOTAL_KEY = 'inventory:shard_total:{}'
+
+
+def _shards(menu_item_id: int, **filters):
+    return db_utils.get_model_queryset(inventory.StockShard, menu_item_id=menu_item_id, **filters)
+
+
+def _split(total: int, shard_count: int) -> List[int]:
+    """Split a quantity as evenly as possible across shards."""
+    share, remainder = divmod(total, shard_count)
+    return [share + (1 if index < remainder else 0) for index in range(shard_count)]
+
+
+def get_sharded_item_ids(menu_item_ids: Iterable[int]) -> Set[int]:
+    """
+    Get which of the given menu items keep their stock in shards.
+    """
+    return set(
+        db_utils.get_model_queryset(
+            inventory.InventoryItem, menu_item_id__in=list(menu_item_ids), shard_count__gt=1
+        ).values_list('menu_item_id', flat=True)
+    )
+
+
+@transaction.atomic
+def configure_sharding(menu_item: menu_item.MenuItem, shard_count: int) -> None:
+    """
+    Split a menu item's stock across shards, or merge it back into one row.
+
+    Args:
+        menu_item: The MenuItem to configure
+        shard_count: Number of shards; 1 turns sharding off
+
+    Raises:
+        ValueError: If the shard count is out of range, the item has no inventory, or
+            sharding is turned on while carts hold some of the item's stock
+    """
+    if not 1 <= shard_count <= MAX_SHARDS:
+        raise ValueError(f'Shard count must be between 1 and {MAX_SHARDS}')
+
+    inventory_item = (
+        db_utils.get_model_queryset(inventory.InventoryItem, menu_item=menu_item)
+        .select_for_update()
+        .first()
+    )
+    if not inventory_item:
+        raise ValueError(f'No inventory found for menu item {menu_item.name}')
+    # Carts do not hold sharded stock, so holds taken on the row could never be honoured
+    if shard_count > 1 and not inventory_item.is_sharded and inventory_item.reserved_quantity:
+        raise ValueError(
+            f'{inventory_item.reserved_quantity} of {menu_item.name} are held in carts; '
+            'shard it once the holds are released or expire'
+        )
+
+    shards = _shards(menu_item.id).select_for_update()
+    total = shards.aggregate(total=Sum('quantity'))['total']
+    if total is None:
+        total = inventory_item.quantity
+    shards.delete()
+
+    if shard_count > 1:
+        inventory.StockShard.objects.bulk_create(
+            [
+                inventory.StockShard(menu_item=menu_item, index=index, quantity=quantity)
+                for index, quantity in enumerate(_split(total, shard_count))
+            ]
+        )
+    db_utils.get_model_queryset(inventory.InventoryItem, id=inventory_item.id).update(
+        shard_count=shard_count, quantity=total
+    )
+    low_stock_service.refresh_low_stock([menu_item.id])
+    cache.delete(SHARD_TOTAL_KEY.format(menu_item.id))
+    logger.info(f'Stock for {menu_item.name} now uses {shard_count} shards')
+
+
+def take_stock(menu_item_id: int, quantity: int) -> None:
+    """
+    Take stock from a sharded item.
+    Shards are tried in random order with a conditional UPDATE each; if no single
+    shard holds enough, the shards are locked and the quantity is taken across them.
+
+    Raises:
+        ValueError: If the shards do not hold enough stock in total
+    """
+    if quantity <= 0:
+        raise ValueError('Quantity must be positive')
+
+    indexes = list(_shards(menu_item_id).values_list('index', flat=True))
+    random.shuffle(indexes)
+    for index in indexes:
+        taken = _shards(menu_item_id, index=index, quantity__gte=quantity).update(
+            quantity=F('quantity') - quantity
+        )
+        if taken:
+            return
+
+    with transaction.atomic():
+        shards = list(_shards(menu_item_id, quantity__gt=0).select_for_update().order_by('index'))
+        if sum(shard.quantity for shard in shards) < quantity:
+            raise ValueError('Insufficient stock')
+        remaining = quantity
+        for shard in shards:
+            step = min(shard.quantity, remaining)
+            shard.quantity -= step
+            remaining -= step
+            if not remaining:
+                break
+        inventory.StockShard.objects.bulk_update(shards, ['quantity'])
+
+
+def add_stock(menu_item_id: int, quantity: int) -> None:
+    """
+    Add stock to a random shard of a sharded item; the rebalancer evens it out later.
+    """
+    if quantity <= 0:
+        raise ValueError('Quantity must be positive')
+    indexes = list(_shards(menu_item_id).values_list('index', flat=True))
+    if not indexes:
+        raise ValueError(f'Menu item {menu_item_id} is not sharded')
+    _shards(menu_item_id, index=random.choice(indexes)).update(quantity=F('quantity') + quantity)
+
+
+@transaction.atomic
+def set_stock(menu_item_id: int, quantity: int) -> int:
+    """
+    Replace a sharded item's stock with a counted quantity, split evenly.
+
+    Returns:
+        The stock the shards held before
+    """
+    shards = list(_shards(menu_item_id).select_for_update().order_by('index'))
+    previous = sum(shard.quantity for shard in shards)
+    for shard, share in zip(shards, _split(quantity, len(shards))):
+        shard.quantity = share
+    inventory.StockShard.objects.bulk_update(shards, ['quantity'])
+    cache.delete(SHARD_TOTAL_KEY.format(menu_item_id))
+    return previous
+
+
+def get_total(menu_item_id: int, cached: bool = True) -> int:
+    """
+    Get the stock held by a sharded item's shards.
+    The sum is cached briefly, since exact totals are only needed when selling;
+    pass cached=False to read the shards.
+    """
+    key = SHARD_TOTAL_KEY.format(menu_item_id)
+    total = cache.get(key) if cached else None
+    if total is None:
+        total = _shards(menu_item_id).aggregate(total=Sum('quantity'))['total'] or 0
+        cache.set(key, total, settings.INVENTORY_SHARD_TOTAL_TIMEOUT)
+    return total
+
+
+def rebalance(menu_item_ids: Optional[List[int]] = None) -> int:
+    """
+    Spread each sharded item's stock evenly across its shards, so random picks keep
+    succeeding, and mirror the total into InventoryItem.quantity.
+
+    Args:
+        menu_item_ids: Only rebalance these menu items
+
+    Returns:
+        Number of items rebalanced
+    """
+    sharded = db_utils.get_model_queryset(inventory.InventoryItem, shard_count__gt=1)
+    if menu_item_ids is not None:
+        sharded = sharded.filter(menu_item_id__in=menu_item_ids)
+
+    rebalanced = 0
+    for menu_item_id, previous in sharded.values_list('menu_item_id', 'quantity'):
+        with transaction.atomic():
+            shards = list(_shards(menu_item_id).select_for_update().order_by('index'))
+            total = sum(shard.quantity for shard in shards)
+            for shard, share in zip(shards, _split(total, len(shards))):
+                shard.quantity = share
+            inventory.StockShard.objects.bulk_update(shards, ['quantity'])
+            db_utils.get_model_queryset(inventory.InventoryItem, menu_item_id=menu_item_id).update(
+                quantity=total
+            )
+            # Queryset updates bypass signals, so report sold-out transitions here
+            if (previous == 0) != (total == 0):
+                cache_service.bump_availability_version()
+            low_stock_service.refresh_low_stock([menu_item_id])
+        cache.set(
+            SHARD_TOTAL_KEY.format(menu_item_id), total, settings.INVENTORY_SHARD_TOTAL_TIMEOUT
+        )
+        rebalanced += 1
+    return rebalanced
@@ -0,0 +1,78 @@
+"""
+Process warm-up for application servers.
+Django builds the URL resolver, compiles templates and fills the catalog cache
+lazily, so without warm-up the first requests each worker serves pay for all of
+it. Code warm-up touches no database or cache and can run in the gunicorn master
+before forking, so workers share the result; data warm-up runs in each worker.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Dict
+
+from django.apps import apps
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.urls import Resolver404, get_resolver
+
+from menu_app.services import menu_service
+
+logger = logging.getLogger(__name__)
+
+
+def _template_names():
+    templates_dir = Path(apps.get_app_config('menu_app').path) / 'templates'
+    for path in sorted(templates_dir.rglob('*.html')):
+        yield path.relative_to(templates_dir).as_posix()
+
+
+def warm_code() -> Dict[str, float]:
+    """
+    Build the URL resolver and compile the app's templates.
+
+    Returns:
+        Dict mapping each warm-up step to its duration in seconds
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    resolver = get_resolver()
+    # Resolving a path that matches nothing compiles every pattern's regex on the way
+    try:
+        resolver.resolve('/__warm_up__/')
+    except Resolver404:
+        pass
+    # Reverse lookups are built per resolver, including the namespaced ones
+    for _, included in resolver.namespace_dict.values():
+        included.reverse_dict
+    resolver.reverse_dict
+    timings['urls'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for name in _template_names():
+        try:
+            get_template(name)
+        except TemplateDoesNotExist:
+            logger.warning(f'Could not warm template {name}')
+    timings['templates'] = time.perf_counter() - started
+    return timings
+
+
+def warm_data() -> Dict[str, float]:
+    """
+    Fill the menu catalog cache, then close the connection the warm-up opened.
+
+    Returns:
+        Dict mapping each warm-up step to its duration in seconds
+    """
+    started = time.perf_counter()
+    try:
+        menu_service.get_catalog()
+    except Exception as e:
+        # A worker that cannot warm its cache can still serve requests
+        logger.warning(f'Could not warm the menu catalog: {e!s}')
+    finally:
+        connections.close_all()
+    return {'catalog': time.perf_counter() - started}
@@ -0,0 +1,45 @@
+"""
+Signal handlers that keep cached menu data and stock alerts in step with the database.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.menu_item import MenuItem
+from menu_app.services import cache_service, low_stock_service
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def invalidate_catalog(sender, instance, **kwargs):
+    """Menu item names, prices and categories are part of every cached fragment."""
+    cache_service.bump_catalog_version()
+
+
+@receiver(post_save, sender=InventoryItem)
+def invalidate_availability_on_save(sender, instance, created, **kwargs):
+    """Only sold-out transitions change the rendered menu, not every stock movement."""
+    loaded_values = getattr(instance, '_loaded_values', None)
+    if created or loaded_values is None or 'quantity' not in loaded_values:
+        cache_service.bump_availability_version()
+    elif (loaded_values['quantity'] == 0) != instance.is_sold_out:
+        cache_service.bump_availability_version()
+
+    instance._loaded_values = {**(loaded_values or {}), 'quantity': instance.quantity}
+
+
+@receiver(post_save, sender=InventoryItem)
+def publish_low_stock_transition(sender, instance, created, **kwargs):
+    """Alert on items entering or leaving the low-stock set, not on every save."""
+    loaded_values = getattr(instance, '_loaded_values', None) or {}
+    was_low = loaded_values.get('is_low_stock', False if created else None)
+    if was_low is not None and was_low != instance.is_low_stock:
+        low_stock_service.publish_transition(instance)
+
+    instance._loaded_values = {**loaded_values, 'is_low_stock': instance.is_low_stock}
+
+
+@receiver(post_delete, sender=InventoryItem)
+def invalidate_availability_on_delete(sender, instance, **kwargs):
+    cache_service.bump_availability_version()
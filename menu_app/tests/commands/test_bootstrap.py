@@ -0,0 +1,49 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from menu_app.management.commands import load_initial_data
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.menu_item import MenuItem
+
+
+def _bootstrap():
+    out = StringIO()
+    call_command('bootstrap', '--skip-static', stdout=out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def menu_data(tmp_path, monkeypatch):
+    """Point load_initial_data at a two-item menu."""
+    data_file = tmp_path / 'initial_menu_items.json'
+    data_file.write_text(
+        json.dumps(
+            {
+                'initial_inventory_quantity': 10,
+                'menu_items': [
+                    {'category': 'main', 'name': 'Soup', 'price': '4.50'},
+                    {'category': 'dessert', 'name': 'Pie', 'price': '3.00'},
+                ],
+            }
+        )
+    )
+    monkeypatch.setattr(load_initial_data, 'DATA_FILE', str(data_file))
+
+
+@pytest.mark.django_db
+def test_bootstrap_is_idempotent(menu_data):
+    """Test that a second bootstrap finds every step done and duplicates nothing."""
+    first = _bootstrap()
+    assert 'initial data: loaded 2 menu items' in first
+    assert 'superuser: created admin' in first
+    counts = (MenuItem.objects.count(), InventoryItem.objects.count(), User.objects.count())
+
+    second = _bootstrap()
+    assert 'migrations: up to date' in second
+    assert 'initial data: already loaded' in second
+    assert 'superuser: already exists' in second
+    assert (MenuItem.objects.count(), InventoryItem.objects.count(), User.objects.count()) == counts
@@ -4,6 +4,7 @@ from decimal import Decimal
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
 from django.test import Client
 
 from menu_app.models.inventory import InventoryItem
@@ -58,6 +59,14 @@ def django_db_setup():
     print('------------------------------')
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached menu fragments and versions must not leak between tests."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def client():
     """A Django test client instance."""
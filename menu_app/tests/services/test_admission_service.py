@@ -0,0 +1,43 @@
+import pytest
+
+from menu_app.models.order import Order
+from menu_app.services import admission_service, order_service
+
+
+@pytest.fixture
+def single_slot(settings):
+    """Allow one checkout per item and no waiting for a slot."""
+    settings.CHECKOUT_ITEM_CONCURRENCY = 1
+    settings.CHECKOUT_ADMISSION_TIMEOUT = 0
+    admission_service._semaphores.clear()
+    yield
+    admission_service._semaphores.clear()
+
+
+@pytest.mark.django_db
+def test_sold_out_items_fail_fast(menu_item, inventory_item):
+    """Test that a checkout for a sold-out item is turned away before taking any stock."""
+    inventory_item.quantity = 0
+    inventory_item.save()
+
+    with pytest.raises(RuntimeError, match='is sold out'):
+        order_service.checkout({str(menu_item.id): 1})
+
+    assert not Order.objects.exists()
+    assert admission_service.get_metrics()['rejected_sold_out'] == 1
+
+
+@pytest.mark.django_db
+def test_busy_items_are_turned_away(menu_item, inventory_item, single_slot):
+    """Test that checkouts beyond the per-item limit fail instead of queueing."""
+    with admission_service.admit_checkout({menu_item.id: menu_item}):
+        with pytest.raises(RuntimeError, match='Too many orders'):
+            order_service.checkout({str(menu_item.id): 1})
+
+    order_service.checkout({str(menu_item.id): 1})
+    assert admission_service.get_metrics() == {
+        'admitted': 2,
+        'queued': 0,
+        'rejected_sold_out': 0,
+        'rejected_busy': 1,
+    }
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from menu_app.models.menu_item import MenuItem
+from menu_app.models.order import Order
+from menu_app.services import cache_service, dashboard_service
+
+
+def _place(menu_item, quantity, status='pending'):
+    order = Order.objects.create(status=status)
+    order.items.create(
+        menu_item=menu_item, quantity=quantity, price_at_time_of_order=menu_item.price
+    )
+    return order
+
+
+@pytest.mark.django_db
+def test_summary_counts_today_only(menu_item, inventory_item):
+    """Test the summary figures, with yesterday's orders left out of today's totals."""
+    soup = MenuItem.objects.create(name='Soup', category='appetizer', price=Decimal('4.00'))
+    two_days_ago = timezone.now() - timedelta(days=2)
+    old = _place(menu_item, 9, status='completed')
+    Order.objects.filter(id=old.id).update(created_at=two_days_ago, updated_at=two_days_ago)
+    # Placed earlier but completed today, so it counts as completed today
+    late = _place(menu_item, 2, status='completed')
+    Order.objects.filter(id=late.id).update(created_at=two_days_ago)
+    _place(menu_item, 1)
+    _place(soup, 3, status='completed')
+    _place(soup, 5, status='cancelled')
+
+    with CaptureQueriesContext(connection) as queries:
+        summary = dashboard_service.get_summary()
+    assert len([q for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]) == 3
+
+    assert (summary['pending'], summary['completed_today'], summary['cancelled_today']) == (
+        1,
+        2,
+        1,
+    )
+    assert summary['revenue_today'] == Decimal('22.99')
+    assert summary['low_stock'] == 1
+    assert summary['top_sellers'] == [{'name': 'Soup', 'sold': 3}, {'name': 'Test Item', 'sold': 1}]
+
+
+@pytest.mark.django_db
+def test_summary_is_cached_per_orders_version(menu_item):
+    """Test that the summary is served from the cache until the orders version changes."""
+    dashboard_service.get_summary()
+    _place(menu_item, 1)
+    assert dashboard_service.get_summary()['pending'] == 0
+
+    cache_service._bump(cache_service.ORDERS_VERSION_KEY)
+    assert dashboard_service.get_summary()['pending'] == 1
@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.menu_item import MenuItem
+from menu_app.models.order import Order, OrderItem
+from menu_app.services import db_utils, order_service
+
+
+@pytest.mark.django_db
+def test_update_writes_only_given_fields(inventory_item):
+    """Test that an update writes the changed column, not the whole row."""
+    with CaptureQueriesContext(connection) as queries:
+        db_utils.update_model_instance(inventory_item, quantity=3)
+
+    [update] = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+    assert '"quantity"' in update
+    assert '"low_stock_threshold"' not in update
+    assert InventoryItem.objects.get(id=inventory_item.id).quantity == 3
+
+    with pytest.raises(ValueError, match='Invalid fields'):
+        db_utils.update_model_instance(inventory_item, stock=1)
+
+
+@pytest.mark.django_db
+def test_partial_update_refreshes_auto_now(order):
+    """Test that partial updates still bump auto_now timestamps."""
+    before = order.updated_at
+    db_utils.update_model_instance(order, status='completed')
+    assert Order.objects.get(id=order.id).updated_at > before
+
+
+@pytest.mark.django_db
+def test_bulk_helpers(menu_item, order):
+    """Test that the bulk helpers validate field names and write in one statement each."""
+    with pytest.raises(ValueError, match='Invalid fields'):
+        db_utils.bulk_create_instances(OrderItem, [{'order': order, 'amount': 1}])
+
+    db_utils.bulk_create_instances(
+        OrderItem,
+        [
+            {
+                'order_id': order.id,
+                'menu_item_id': menu_item.id,
+                'quantity': 1,
+                'price_at_time_of_order': menu_item.price,
+            }
+        ],
+    )
+    line = OrderItem.objects.get(order=order)
+    line.quantity = 4
+    with CaptureQueriesContext(connection) as queries:
+        assert db_utils.bulk_update_instances([line], ['quantity']) == 1
+    assert len([q for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]) == 1
+    assert OrderItem.objects.get(id=line.id).quantity == 4
+
+
+@pytest.mark.django_db
+def test_remove_last_unit_deletes_order_line(menu_item, inventory_item):
+    """Test that removing an order line's last unit deletes the line."""
+    placed = order_service.checkout({str(menu_item.id): 1})
+    order_service.remove_item_from_order(placed.id, menu_item.id)
+    assert not OrderItem.objects.filter(order=placed).exists()
+
+
+@pytest.mark.django_db
+def test_claim_version_detects_concurrent_edits(menu_item):
+    """Test that a compare-and-swap on the version column fails for a stale copy."""
+    stale = MenuItem.objects.get(id=menu_item.id)
+    assert db_utils.claim_version(menu_item, expected_version=0) == 1
+
+    with pytest.raises(db_utils.VersionConflictError):
+        db_utils.claim_version(stale, expected_version=stale.version)
+    assert db_utils.claim_version(stale) == 2
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from menu_app.models.menu_item import MenuItem
+from menu_app.models.order import Order, OrderItem
+from menu_app.services import export_service
+
+
+@pytest.fixture
+def orders():
+    burger = MenuItem.objects.create(name='Burger', category='main', price=Decimal('10.50'))
+    soda = MenuItem.objects.create(name='Soda', category='drink', price=Decimal('2.00'))
+    first = Order.objects.create(status='completed')
+    OrderItem.objects.create(order=first, menu_item=burger, quantity=2)
+    OrderItem.objects.create(order=first, menu_item=soda, quantity=1)
+    empty = Order.objects.create(status='pending')
+    return first, empty
+
+
+@pytest.mark.django_db
+def test_export_csv_has_one_row_per_line(orders):
+    """Test that the CSV export lists every order line and orders without lines."""
+    first, empty = orders
+
+    content = ''.join(export_service.export_orders('csv'))
+    rows = list(csv.DictReader(io.StringIO(content)))
+
+    assert [(row['order_id'], row['menu_item_name']) for row in rows] == [
+        (str(first.id), 'Burger'),
+        (str(first.id), 'Soda'),
+        (str(empty.id), ''),
+    ]
+    assert rows[0]['line_total'] == '21.00'
+
+
+@pytest.mark.django_db
+def test_export_jsonl_groups_lines_by_order(orders):
+    """Test that the JSON Lines export nests lines under their order and applies filters."""
+    first, _ = orders
+
+    lines = ''.join(export_service.export_orders('jsonl', status='completed')).splitlines()
+    exported = [json.loads(line) for line in lines]
+
+    assert [o['order_id'] for o in exported] == [first.id]
+    assert exported[0]['total_price'] == '23.00'
+    assert len(exported[0]['items']) == 2
+
+    tomorrow = timezone.localdate() + timedelta(days=1)
+    assert list(export_service.export_orders('jsonl', start_date=tomorrow)) == []
+    with pytest.raises(ValueError):
+        export_service.export_orders('xml')
+    with pytest.raises(ValueError):
+        export_service.export_orders('csv', start_date=tomorrow, end_date=date(2000, 1, 1))
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from menu_app.models.idempotency import IdempotencyKey
+from menu_app.models.order import Order
+from menu_app.services import idempotency_service, order_service
+
+
+@pytest.mark.django_db
+def test_repeated_checkout_returns_first_order(menu_item, inventory_item, test_data):
+    """Test that a resubmitted checkout returns the original order and takes stock once."""
+    key = idempotency_service.new_key()
+    first = order_service.checkout({str(menu_item.id): 2}, idempotency_key=key)
+    again = order_service.checkout({str(menu_item.id): 2}, idempotency_key=key)
+    # A retry arriving after the cart was cleared still gets its order
+    emptied = order_service.checkout({}, idempotency_key=key)
+
+    assert again.id == first.id == emptied.id
+    assert Order.objects.count() == 1
+    # A stale form submitted again with a different cart must not report success
+    with pytest.raises(ValueError, match='already used'):
+        order_service.checkout({str(menu_item.id): 3}, idempotency_key=key)
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == test_data['quantity'] - 2
+
+
+@pytest.mark.django_db
+def test_failed_checkout_releases_key(menu_item, inventory_item, test_data):
+    """Test that a key is only kept once its checkout succeeds."""
+    key = idempotency_service.new_key()
+    with pytest.raises(RuntimeError, match='Insufficient stock'):
+        order_service.checkout({str(menu_item.id): test_data['quantity'] + 1}, idempotency_key=key)
+
+    assert not IdempotencyKey.objects.exists()
+    placed = order_service.checkout({str(menu_item.id): 1}, idempotency_key=key)
+    assert IdempotencyKey.objects.get(key=key).order_id == placed.id
+
+
+@pytest.mark.django_db
+def test_expire_keys(menu_item, inventory_item):
+    """Test that expired keys are deleted in batches and live ones are kept."""
+    for _ in range(3):
+        order_service.checkout(
+            {str(menu_item.id): 1}, idempotency_key=idempotency_service.new_key()
+        )
+    live = IdempotencyKey.objects.order_by('id').last()
+    IdempotencyKey.objects.exclude(id=live.id).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+    assert idempotency_service.expire_keys(batch_size=1) == 2
+    assert list(IdempotencyKey.objects.values_list('id', flat=True)) == [live.id]
+    with pytest.raises(ValueError):
+        idempotency_service.validate_key('x' * (idempotency_service.KEY_MAX_LENGTH + 1))
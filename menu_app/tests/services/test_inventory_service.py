@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.ledger import InventoryMovement
+from menu_app.models.menu_item import MenuItem
+from menu_app.services import inventory_service, reservation_service
+
+
+def _stock_items(count):
+    items = []
+    for index in range(count):
+        menu_item = MenuItem.objects.create(
+            name=f'Item {index}', category='main', price=Decimal('5.00')
+        )
+        items.append(InventoryItem.objects.create(menu_item=menu_item, quantity=10))
+    return items
+
+
+def _count_queries(counts):
+    with CaptureQueriesContext(connection) as queries:
+        inventory_service.set_stock_levels(counts)
+    return len([q for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']])
+
+
+@pytest.mark.django_db
+def test_stock_take_cost_does_not_grow_with_items():
+    """Test that a stock take costs the same number of queries for 2 or 20 items."""
+    items = _stock_items(20)
+    few = _count_queries({item.menu_item_id: 3 for item in items[:2]})
+    many = _count_queries({item.menu_item_id: 2 for item in items[2:]})
+    assert few == many
+
+    assert set(InventoryItem.objects.values_list('quantity', flat=True)) == {3, 2}
+    assert InventoryMovement.objects.filter(kind=InventoryMovement.ADJUSTMENT).count() == 20
+    assert InventoryItem.objects.get(id=items[5].id).is_low_stock
+
+
+@pytest.mark.django_db
+def test_stock_take_reports_rows_it_skips(menu_item, inventory_item):
+    """Test that invalid, unknown and stale rows are reported and the rest applied."""
+    [other] = _stock_items(1)
+    stale = InventoryItem.objects.create(
+        menu_item=MenuItem.objects.create(name='Stale', category='main', price=Decimal('1.00')),
+        quantity=4,
+        version=2,
+    )
+
+    errors = inventory_service.set_stock_levels(
+        {menu_item.id: 12, other.menu_item_id: -1, 99999: 1, stale.menu_item_id: 8},
+        expected_versions={stale.menu_item_id: 1},
+    )
+
+    assert set(errors) == {other.menu_item_id, 99999, stale.menu_item_id}
+    inventory_item.refresh_from_db()
+    assert (inventory_item.quantity, inventory_item.version) == (12, 1)
+    assert InventoryItem.objects.get(id=stale.id).quantity == 4
+
+
+@pytest.mark.django_db
+def test_remove_stock_leaves_held_stock(menu_item, inventory_item, test_data):
+    """Test that removals skip stock held by carts and draw on pending restocks."""
+    reservation_service.sync_holds('cart', {str(menu_item.id): test_data['quantity'] - 1})
+
+    with pytest.raises(ValueError, match='Insufficient stock'):
+        inventory_service.remove_stock(menu_item, 2)
+
+    inventory_service.add_stock(menu_item, 3)
+    inventory_service.remove_stock(menu_item, 4)
+    inventory_item.refresh_from_db()
+    assert (inventory_item.quantity, inventory_item.reserved_quantity) == (
+        test_data['quantity'] - 1,
+        test_data['quantity'] - 1,
+    )
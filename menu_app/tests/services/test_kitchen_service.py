@@ -0,0 +1,31 @@
+import pytest
+
+from menu_app.models.order import Order
+from menu_app.services import kitchen_service
+
+
+@pytest.mark.django_db
+def test_stations_claim_different_orders():
+    """Test that stations claim pending orders oldest first without overlap."""
+    orders = [Order.objects.create(status='pending') for _ in range(3)]
+
+    first = kitchen_service.claim_next_orders('grill', limit=2)
+    second = kitchen_service.claim_next_orders('fryer', limit=2)
+
+    assert [o.id for o in first] == [orders[0].id, orders[1].id]
+    assert [o.id for o in second] == [orders[2].id]
+    assert kitchen_service.claim_next_orders('salad') == []
+
+
+@pytest.mark.django_db
+def test_complete_station_orders():
+    """Test that a station can only complete the orders it claimed."""
+    mine, theirs = Order.objects.create(), Order.objects.create()
+    kitchen_service.claim_next_orders('grill')
+    kitchen_service.claim_next_orders('fryer')
+
+    completed = kitchen_service.complete_station_orders('grill', [mine.id, theirs.id])
+
+    assert completed == [mine.id]
+    assert Order.objects.get(id=mine.id).status == 'completed'
+    assert Order.objects.get(id=theirs.id).status == 'pending'
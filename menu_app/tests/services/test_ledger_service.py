@@ -0,0 +1,67 @@
+import pytest
+
+from menu_app.models.ledger import InventoryMovement
+from menu_app.services import (
+    admission_service,
+    inventory_service,
+    ledger_service,
+    menu_service,
+    menu_utils,
+    order_service,
+    reservation_service,
+)
+
+
+@pytest.mark.django_db
+def test_ledger_records_and_compacts_movements(menu_item, inventory_item, test_data):
+    """Test that restocks stay pending until compaction while sales apply at once."""
+    placed = order_service.checkout({str(menu_item.id): 2})
+    inventory_service.add_stock(menu_item, 10)
+    inventory_service.add_stock(menu_item, 3)
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == test_data['quantity'] - 2
+    assert ledger_service.get_stock_level(menu_item.id) == test_data['quantity'] + 11
+
+    assert ledger_service.compact_movements(batch_size=1) == 2
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == test_data['quantity'] + 11
+    assert ledger_service.get_pending_quantities() == {}
+
+    sale = InventoryMovement.objects.get(kind=InventoryMovement.SALE)
+    assert (sale.order_id, sale.quantity_change) == (placed.id, -2)
+
+
+@pytest.mark.django_db
+def test_set_stock_becomes_snapshot(menu_item, inventory_item, test_data):
+    """Test that a stock count settles pending movements and records the difference."""
+    inventory_service.add_stock(menu_item, 4)
+
+    inventory_service.set_stock(menu_item, 20)
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == 20
+    assert ledger_service.get_stock_level(menu_item.id) == 20
+    adjustment = InventoryMovement.objects.get(kind=InventoryMovement.ADJUSTMENT)
+    assert adjustment.quantity_change == 20 - test_data['quantity'] - 4
+    assert ledger_service.get_pending_quantities() == {}
+
+
+@pytest.mark.django_db
+def test_pending_restock_is_sellable(menu_item, inventory_item, django_capture_on_commit_callbacks):
+    """Test that a restock waiting in the ledger brings a sold-out item back at once."""
+    with django_capture_on_commit_callbacks(execute=True):
+        inventory_item.quantity = 0
+        inventory_item.save()
+    assert menu_item.id in admission_service.get_sold_out_ids()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        inventory_service.add_stock(menu_item, 3)
+
+    assert menu_item.id not in admission_service.get_sold_out_ids()
+    assert menu_service.get_catalog()[0]['available']
+    assert menu_utils.check_item_availability(menu_item, 3)
+    reservation_service.sync_holds('cart', {str(menu_item.id): 3})
+    order_service.checkout({str(menu_item.id): 3}, holder='cart')
+    inventory_item.refresh_from_db()
+    assert (inventory_item.quantity, inventory_item.reserved_quantity) == (0, 0)
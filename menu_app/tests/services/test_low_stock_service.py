@@ -0,0 +1,53 @@
+import pytest
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.outbox import OutboxEvent
+from menu_app.services import (
+    inventory_events,
+    inventory_service,
+    ledger_service,
+    reservation_service,
+)
+
+
+def _events(event_type):
+    return list(OutboxEvent.objects.filter(event_type=event_type))
+
+
+@pytest.mark.django_db
+def test_save_publishes_transitions_only(menu_item):
+    """Test that saving an item publishes an event only when it crosses its threshold."""
+    item = InventoryItem.objects.create(menu_item=menu_item, quantity=10, low_stock_threshold=3)
+    assert not item.is_low_stock
+
+    item.remove_stock(7)
+    assert item.is_low_stock
+    [event] = _events(inventory_events.INVENTORY_LOW_STOCK)
+    assert event.payload['menu_item_id'] == menu_item.id
+    assert event.payload['quantity'] == 3
+
+    item.remove_stock(1)
+    assert len(_events(inventory_events.INVENTORY_LOW_STOCK)) == 1
+
+    item.add_stock(5)
+    assert not item.is_low_stock
+    assert len(_events(inventory_events.INVENTORY_RESTOCKED)) == 1
+
+
+@pytest.mark.django_db
+def test_queryset_updates_keep_flag_in_step(menu_item):
+    """Test that sales and compacted restocks update the flag and the low stock list."""
+    InventoryItem.objects.create(menu_item=menu_item, quantity=6, low_stock_threshold=3)
+
+    reservation_service.consume_holds(None, {menu_item.id: 4})
+    assert InventoryItem.objects.get(menu_item=menu_item).is_low_stock
+    assert [item.menu_item_id for item in inventory_service.get_low_stock_items()] == [menu_item.id]
+    assert len(_events(inventory_events.INVENTORY_LOW_STOCK)) == 1
+
+    inventory_service.add_stock(menu_item, 10)
+    assert InventoryItem.objects.get(menu_item=menu_item).is_low_stock
+
+    ledger_service.compact_movements()
+    assert not InventoryItem.objects.get(menu_item=menu_item).is_low_stock
+    assert inventory_service.get_low_stock_items() == []
+    assert len(_events(inventory_events.INVENTORY_RESTOCKED)) == 1
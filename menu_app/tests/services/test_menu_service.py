@@ -0,0 +1,70 @@
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.menu_item import MenuItem
+from menu_app.models.outbox import OutboxEvent
+from menu_app.services import cache_service, inventory_events, menu_service
+
+
+@pytest.mark.django_db
+def test_bulk_add_creates_items_with_inventory():
+    """Test that bulk-added items get empty inventory and a single catalog invalidation."""
+    with mock.patch.object(cache_service, '_bump') as bump:
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda f: f()):
+            created = menu_service.bulk_add_menu_items(
+                [
+                    {'name': 'Soup', 'price': Decimal('4.50'), 'category': 'appetizer'},
+                    {'name': 'Cake', 'price': Decimal('6.00'), 'category': 'Dessert'},
+                ]
+            )
+
+    assert [item.category for item in created] == ['appetizer', 'dessert']
+    assert InventoryItem.objects.filter(quantity=0, is_low_stock=True).count() == 2
+    low_stock = OutboxEvent.objects.filter(event_type=inventory_events.INVENTORY_LOW_STOCK)
+    assert sorted(event.payload['name'] for event in low_stock) == ['Cake', 'Soup']
+    bump.assert_called_once_with(cache_service.CATALOG_VERSION_KEY)
+
+    with pytest.raises(ValueError, match='already exist: Soup'):
+        menu_service.bulk_add_menu_items([{'name': 'Soup', 'price': 1, 'category': 'main'}])
+    with pytest.raises(ValueError, match='more than once'):
+        menu_service.bulk_add_menu_items([{'name': 'Tea', 'price': 1, 'category': 'beverage'}] * 2)
+    assert MenuItem.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_category_price_change(menu_item):
+    """Test that a category is repriced in one statement and out-of-range changes are refused."""
+    other = MenuItem.objects.create(name='Lemonade', category='beverage', price=Decimal('3.00'))
+
+    assert menu_service.adjust_category_prices('main', percent=Decimal('10')) == 1
+    menu_item.refresh_from_db()
+    assert (menu_item.price, menu_item.version) == (Decimal('12.09'), 1)
+
+    assert menu_service.adjust_category_prices('main', amount=Decimal('-0.09')) == 1
+    menu_item.refresh_from_db()
+    assert menu_item.price == Decimal('12.00')
+
+    with pytest.raises(ValueError, match='out of range'):
+        menu_service.adjust_category_prices('main', amount=Decimal('-12'))
+    with pytest.raises(ValueError, match='either'):
+        menu_service.adjust_category_prices('main')
+    other.refresh_from_db()
+    assert (other.price, other.version) == (Decimal('3.00'), 0)
+
+
+@pytest.mark.django_db
+def test_delete_menu_items_keeps_ordered_items(menu_item, order_item):
+    """Test that items referenced by orders survive a bulk delete and are reported."""
+    spare = MenuItem.objects.create(name='Spare', category='main', price=Decimal('2.00'))
+    InventoryItem.objects.create(menu_item=spare, quantity=3)
+
+    with mock.patch.object(cache_service, '_bump') as bump:
+        with mock.patch('django.db.transaction.on_commit', side_effect=lambda f: f()):
+            deleted, kept = menu_service.delete_menu_items([menu_item.id, spare.id])
+
+    assert (deleted, kept) == (1, [menu_item.id])
+    assert list(MenuItem.objects.values_list('id', flat=True)) == [menu_item.id]
+    assert len({call.args for call in bump.call_args_list}) == len(bump.call_args_list)
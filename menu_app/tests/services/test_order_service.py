@@ -0,0 +1,41 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from menu_app.models.order import Order
+from menu_app.services import ledger_service, order_service
+
+
+@pytest.mark.django_db
+def test_cancel_orders_restores_stock(menu_item, inventory_item, test_data):
+    """Test that bulk cancellation restores stock with a fixed number of queries."""
+    first = order_service.checkout({str(menu_item.id): 2})
+    second = order_service.checkout({str(menu_item.id): 1})
+    completed = order_service.checkout({str(menu_item.id): 1})
+    order_service.complete_order(completed.id)
+
+    with CaptureQueriesContext(connection) as queries:
+        cancelled = order_service.cancel_orders([first.id, second.id, completed.id])
+
+    assert cancelled == [first.id, second.id]
+    statements = [q for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]
+    assert len(statements) <= 7
+
+    # Returned stock reaches the snapshot once the ledger is compacted
+    assert ledger_service.get_stock_level(menu_item.id) == test_data['quantity'] - 1
+    ledger_service.compact_movements()
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == test_data['quantity'] - 1
+    assert Order.objects.get(id=completed.id).status == 'completed'
+    assert set(Order.objects.filter(status='cancelled').values_list('id', flat=True)) == {
+        first.id,
+        second.id,
+    }
+
+
+@pytest.mark.django_db
+def test_cancel_order_rejects_non_pending(order):
+    """Test that a single cancellation still reports orders that are not pending."""
+    order.complete()
+    with pytest.raises(RuntimeError, match='Only pending orders can be cancelled'):
+        order_service.cancel_order(order.id)
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from menu_app.models.order import Order
+from menu_app.services.order_stream import OrderChangeHub
+
+
+@pytest.mark.django_db
+def test_hub_reports_each_change_once():
+    """Test that a poll reports new and updated orders without repeating them."""
+    hub = OrderChangeHub()
+    order = Order.objects.create(status='pending')
+
+    events = hub.poll()
+    assert [(e['type'], e['order_id']) for e in events] == [('order.created', order.id)]
+    assert hub.poll() == []
+
+    order.status = 'completed'
+    order.save()
+
+    events = hub.poll()
+    assert [(e['type'], e['status']) for e in events] == [('order.updated', 'completed')]
+
+
+@pytest.mark.django_db
+def test_hub_reports_late_commits():
+    """Test that a change committed after newer ones were polled is still reported."""
+    hub = OrderChangeHub()
+    Order.objects.create(status='pending')
+    hub.poll(publish=False)
+
+    # A transaction that started earlier commits only now, with an older updated_at
+    late = Order.objects.create(status='pending')
+    Order.objects.filter(id=late.id).update(updated_at=timezone.now() - timedelta(seconds=30))
+
+    events = hub.poll()
+    assert [(e['type'], e['order_id']) for e in events] == [('order.created', late.id)]
+    assert hub.poll() == []
@@ -0,0 +1,73 @@
+import pytest
+
+from menu_app.models.outbox import OutboxEvent
+from menu_app.services import order_events, order_service, outbox_service
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Give the test its own handler registry, so its handlers do not outlive it."""
+    registry = {}
+    monkeypatch.setattr(outbox_service, '_handlers', registry)
+    return registry
+
+
+@pytest.mark.django_db
+def test_checkout_publishes_order_event(menu_item, inventory_item):
+    """Test that placing an order writes an outbox event in the same transaction."""
+    new_order = order_service.checkout({str(menu_item.id): 2})
+
+    event = OutboxEvent.objects.get(event_type=order_events.ORDER_PLACED)
+    assert event.payload['order_id'] == new_order.id
+    assert event.payload['total'] == str(menu_item.price * 2)
+    assert not event.is_processed
+
+
+@pytest.mark.django_db
+def test_process_batch(handlers):
+    """Test that the worker consumes events and records handler failures."""
+    handled = []
+
+    @outbox_service.register_handler('test.event')
+    def record(payload):
+        handled.append(payload['value'])
+
+    @outbox_service.register_handler('test.failure')
+    def fail(payload):
+        raise RuntimeError('handler failed')
+
+    outbox_service.publish('test.event', {'value': 1})
+    outbox_service.publish('test.failure')
+
+    assert outbox_service.process_batch(max_workers=1) == 2
+    assert handled == [1]
+
+    processed = OutboxEvent.objects.get(event_type='test.event')
+    assert processed.is_processed
+    failed = OutboxEvent.objects.get(event_type='test.failure')
+    assert not failed.is_processed
+    assert failed.attempts == 1
+    assert failed.last_error == 'handler failed'
+
+
+@pytest.mark.django_db
+def test_dead_letters_are_kept_and_retried(handlers, caplog):
+    """Test that events failing too often are reported, kept by purge and retried."""
+
+    @outbox_service.register_handler('test.failure')
+    def fail(payload):
+        raise RuntimeError('handler failed')
+
+    event = outbox_service.publish('test.failure')
+    OutboxEvent.objects.filter(id=event.id).update(attempts=outbox_service.MAX_ATTEMPTS - 1)
+
+    assert outbox_service.process_batch(max_workers=1) == 1
+    assert 'dead-lettered' in caplog.text
+    assert outbox_service.process_batch(max_workers=1) == 0
+    assert outbox_service.purge_processed(older_than_days=0) == 0
+    assert outbox_service.count_dead_letters() == 1
+
+    handlers.clear()
+    assert outbox_service.retry_dead_letters() == 1
+    assert outbox_service.process_batch(max_workers=1) == 1
+    assert OutboxEvent.objects.get(id=event.id).is_processed
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+from django.test import override_settings
+
+from menu_app.models.menu_item import MenuItem
+from menu_app.services import profiling_service
+
+
+def _busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.django_db
+@override_settings(PROFILING_SAMPLE_INTERVAL=0.001)
+def test_profile_records_functions_stacks_and_queries(menu_item):
+    """Test that a profile holds timed functions, sampled stacks and the SQL run."""
+    with profiling_service.profile() as result:
+        list(MenuItem.objects.all())
+        _busy_wait(0.05)
+
+    assert result['duration_ms'] >= 50
+    assert any('_busy_wait' in row['function'] for row in result['functions'])
+    assert '_busy_wait' in result['collapsed']
+    stack, count = result['collapsed'].splitlines()[0].rsplit(' ', 1)
+    assert ';' in stack and int(count) > 0
+    assert result['queries'][0]['sql'].startswith('SELECT')
+
+
+@pytest.mark.django_db
+def test_saved_profiles_are_listed_newest_first():
+    """Test that saved profiles can be fetched by ID and are listed newest first."""
+    with profiling_service.profile() as first:
+        pass
+    with profiling_service.profile() as second:
+        pass
+    first_id = profiling_service.save_profile(first, method='GET', path='/a', status=200)
+    second_id = profiling_service.save_profile(second, method='GET', path='/b', status=200)
+
+    assert [p['id'] for p in profiling_service.get_recent_profiles()] == [second_id, first_id]
+    assert profiling_service.get_profile(first_id)['path'] == '/a'
+    assert profiling_service.get_profile('missing') is None
+
+
+@pytest.mark.django_db
+@override_settings(PROFILING_SAMPLE_INTERVAL=0.001)
+def test_sampled_functions_without_cprofile(monkeypatch):
+    """Test that per-function times come from samples where cProfile is not used."""
+    monkeypatch.setattr(profiling_service, 'USE_CPROFILE', False)
+    with profiling_service.profile() as result:
+        _busy_wait(0.05)
+
+    assert result['sampled']
+    [busy] = [row for row in result['functions'] if '_busy_wait' in row['function']]
+    assert busy['calls'] is None
+    assert 0 < busy['own_ms'] <= busy['total_ms']
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from menu_app.models.order import OrderItem
+from menu_app.models.reservation import StockReservation
+from menu_app.services import menu_utils, order_service, reservation_service
+
+
+@pytest.mark.django_db
+def test_holds_limit_available_stock(menu_item, inventory_item, test_data):
+    """Test that stock held by one cart cannot be added to another."""
+    reservation_service.sync_holds('first', {str(menu_item.id): test_data['quantity'] - 1})
+
+    with pytest.raises(ValueError, match='Insufficient stock'):
+        reservation_service.sync_holds('second', {str(menu_item.id): 2})
+    reservation_service.sync_holds('second', {str(menu_item.id): 1})
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.reserved_quantity == test_data['quantity']
+    assert inventory_item.available_quantity == 0
+    assert not menu_utils.check_item_availability(menu_item, 1)
+
+    # Shrinking a cart gives the difference back
+    reservation_service.sync_holds('first', {str(menu_item.id): 1})
+    inventory_item.refresh_from_db()
+    assert inventory_item.reserved_quantity == 2
+
+
+@pytest.mark.django_db
+def test_checkout_converts_holds(menu_item, inventory_item, test_data):
+    """Test that checkout turns held stock into order lines."""
+    cart = {str(menu_item.id): 2}
+    reservation_service.sync_holds('cart', cart)
+
+    placed = order_service.checkout(cart, holder='cart')
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == test_data['quantity'] - 2
+    assert inventory_item.reserved_quantity == 0
+    assert not StockReservation.objects.exists()
+    line = OrderItem.objects.get(order=placed)
+    assert (line.quantity, line.price_at_time_of_order) == (2, menu_item.price)
+
+
+@pytest.mark.django_db
+def test_expire_reservations_releases_stock(menu_item, inventory_item):
+    """Test that the sweeper releases only expired holds."""
+    reservation_service.sync_holds('stale', {str(menu_item.id): 2})
+    reservation_service.sync_holds('live', {str(menu_item.id): 1})
+    StockReservation.objects.filter(holder='stale').update(
+        expires_at=timezone.now() - timedelta(minutes=1)
+    )
+
+    assert reservation_service.expire_reservations(batch_size=1) == 1
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.reserved_quantity == 1
+    assert list(StockReservation.objects.values_list('holder', flat=True)) == ['live']
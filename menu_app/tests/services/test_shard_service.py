@@ -0,0 +1,57 @@
+import pytest
+
+from menu_app.models.inventory import StockShard
+from menu_app.services import menu_utils, order_service, reservation_service, shard_service
+
+
+@pytest.mark.django_db
+def test_sharded_stock_sells_across_shards(menu_item, inventory_item):
+    """Test that sales draw from the shards and the rebalancer mirrors the total."""
+    inventory_item.quantity = 10
+    inventory_item.save()
+    shard_service.configure_sharding(menu_item, 4)
+    assert list(StockShard.objects.values_list('quantity', flat=True)) == [3, 3, 2, 2]
+
+    # No single shard holds 5, so the sale is taken across shards
+    order_service.checkout({str(menu_item.id): 5})
+    assert shard_service.get_total(menu_item.id) == 5
+    # The stock row still mirrors 10 until the rebalancer runs
+    assert not menu_utils.check_item_availability(menu_item, 6)
+    with pytest.raises(RuntimeError, match='Insufficient stock'):
+        order_service.checkout({str(menu_item.id): 6})
+
+    shard_service.rebalance()
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == 5
+    assert sorted(StockShard.objects.values_list('quantity', flat=True)) == [1, 1, 1, 2]
+
+
+@pytest.mark.django_db
+def test_sharded_items_are_not_held(menu_item, inventory_item, test_data):
+    """Test that carts check sharded stock without holding it."""
+    shard_service.configure_sharding(menu_item, 2)
+
+    reservation_service.sync_holds('cart', {str(menu_item.id): test_data['quantity']})
+    with pytest.raises(ValueError, match='Insufficient stock'):
+        reservation_service.sync_holds('cart', {str(menu_item.id): test_data['quantity'] + 1})
+
+    inventory_item.refresh_from_db()
+    assert inventory_item.reserved_quantity == 0
+
+    shard_service.configure_sharding(menu_item, 1)
+    inventory_item.refresh_from_db()
+    assert (inventory_item.shard_count, inventory_item.quantity) == (1, test_data['quantity'])
+    assert not StockShard.objects.exists()
+
+
+@pytest.mark.django_db
+def test_held_items_cannot_be_sharded(menu_item, inventory_item):
+    """Test that sharding is refused while carts hold the item's stock."""
+    reservation_service.sync_holds('cart', {str(menu_item.id): 2})
+
+    with pytest.raises(ValueError, match='held in carts'):
+        shard_service.configure_sharding(menu_item, 4)
+
+    reservation_service.release_holds('cart')
+    shard_service.configure_sharding(menu_item, 4)
+    assert StockShard.objects.count() == 4
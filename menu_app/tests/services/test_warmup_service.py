@@ -0,0 +1,20 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from menu_app.services import menu_service, warmup_service
+
+
+def test_warm_code_needs_no_database():
+    """Test that code warm-up runs without database access, as in the gunicorn master."""
+    assert set(warmup_service.warm_code()) == {'urls', 'templates'}
+
+
+@pytest.mark.django_db
+def test_warm_data_fills_catalog_cache(menu_item, inventory_item):
+    """Test that after data warm-up the first catalog read needs no query."""
+    warmup_service.warm_data()
+    with CaptureQueriesContext(connection) as queries:
+        catalog = menu_service.get_catalog()
+    assert [item['id'] for item in catalog] == [menu_item.id]
+    assert not queries.captured_queries
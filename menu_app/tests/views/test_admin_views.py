@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from menu_app.models.inventory import InventoryItem
+from menu_app.models.menu_item import MenuItem
+from menu_app.models.order import Order
+
+
+@pytest.fixture
+def admin_client(client):
+    user = User.objects.create_superuser('admin', 'admin@example.com', 'admin-password')
+    client.force_login(user)
+    return client
+
+
+def _changelist_queries(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response, len(queries.captured_queries)
+
+
+def _add_orders(start, stop):
+    for index in range(start, stop):
+        menu_item = MenuItem.objects.create(
+            name=f'Dish {index}', category='main', price=Decimal('4.25')
+        )
+        InventoryItem.objects.create(menu_item=menu_item, quantity=10)
+        order = Order.objects.create(status='pending')
+        order.items.create(menu_item=menu_item, quantity=2, price_at_time_of_order=Decimal('4.25'))
+
+
+@pytest.mark.django_db
+def test_changelists_do_not_query_per_row(admin_client):
+    """Test that order and inventory changelists cost the same for 2 or 12 rows."""
+    order_url = reverse('admin:menu_app_order_changelist')
+    inventory_url = reverse('admin:menu_app_inventoryitem_changelist')
+
+    _add_orders(0, 2)
+    _, orders_few = _changelist_queries(admin_client, order_url)
+    _, inventory_few = _changelist_queries(admin_client, inventory_url)
+    _add_orders(2, 12)
+    response, orders_many = _changelist_queries(admin_client, order_url, o='-4')
+    _, inventory_many = _changelist_queries(admin_client, inventory_url)
+
+    assert (orders_few, inventory_few) == (orders_many, inventory_many)
+    assert {order._total for order in response.context['cl'].result_list} == {Decimal('8.50')}
@@ -1,6 +1,25 @@
+import json
+from decimal import Decimal
+
 import pytest
+from django.conf import settings
+from django.core import signing
 from django.urls import reverse
 
+from menu_app.models.order import Order
+from menu_app.services.cart_service import SignedCookieCartStorage
+
+
+def get_cart(client):
+    """Helper function to read the cart from the signed cart cookie."""
+    cookie = client.cookies.get(settings.CART_COOKIE_NAME)
+    if cookie is None or not cookie.value:
+        return {}
+    signer = signing.get_cookie_signer(
+        salt=settings.CART_COOKIE_NAME + SignedCookieCartStorage.salt
+    )
+    return json.loads(signer.unsign(cookie.value))
+
 
 @pytest.mark.django_db
 def test_menu_list_view(client, menu_item, test_data):
@@ -14,7 +33,7 @@ def test_menu_list_view(client, menu_item, test_data):
 
 
 @pytest.mark.django_db
-def test_cart_management(client, menu_item, test_data):
+def test_cart_management(client, menu_item, inventory_item, test_data):
     """Test cart management functionality."""
     # Test adding item to cart
     response = client.post(
@@ -22,10 +41,8 @@ def test_cart_management(client, menu_item, test_data):
     )
     assert response.status_code == 302
 
-    # Check cart in session
-    session = client.session
-    assert 'cart' in session
-    assert session['cart'][str(menu_item.id)] == 1
+    # Check cart in the cart cookie
+    assert get_cart(client)[str(menu_item.id)] == 1
 
     # Test updating item quantity
     response = client.post(
@@ -33,8 +50,7 @@ def test_cart_management(client, menu_item, test_data):
         {'menu_item_id': menu_item.id, 'action': 'update', 'quantity': 2},
     )
     assert response.status_code == 302
-    session = client.session
-    assert session['cart'][str(menu_item.id)] == 2
+    assert get_cart(client)[str(menu_item.id)] == 2
 
     # Test removing item from cart
     response = client.post(
@@ -44,8 +60,7 @@ def test_cart_management(client, menu_item, test_data):
     assert response.status_code == 302
 
     # Check cart is empty
-    session = client.session
-    assert str(menu_item.id) not in session.get('cart', {})
+    assert str(menu_item.id) not in get_cart(client)
 
 
 @pytest.mark.django_db
@@ -57,10 +72,141 @@ def test_checkout_process(client, menu_item, inventory_item, test_data):
     assert response.status_code == 302  # Redirect after checkout
 
     # Check cart is empty after checkout
-    session = client.session
-    session.save()  # Save the session to persist changes
-    assert 'cart' not in session
+    assert get_cart(client) == {}
 
     # Verify inventory was updated
     inventory_item.refresh_from_db()
     assert inventory_item.quantity == test_data['quantity'] - 1  # One item was ordered
+
+
+@pytest.mark.django_db
+def test_double_submitted_checkout_places_one_order(client, menu_item, inventory_item, test_data):
+    """Test that a checkout form submitted twice places a single order."""
+    client.post(reverse('menu_app:menu_list'), {'menu_item_id': menu_item.id, 'action': 'add'})
+    page = client.get(reverse('menu_app:menu_list'))
+    key = page.context['checkout_key']
+    assert f'value="{key}"' in page.content.decode()
+
+    # The second click is sent before the first response has cleared the cart
+    cookies = client.cookies.output(header='')
+    checkout = {'action': 'checkout', 'idempotency_key': key}
+    client.post(reverse('menu_app:menu_list'), checkout)
+    client.cookies.load(cookies)
+    client.post(reverse('menu_app:menu_list'), checkout)
+
+    assert Order.objects.count() == 1
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == test_data['quantity'] - 1
+
+
+@pytest.mark.django_db
+def test_menu_list_conditional_get(client, menu_item, inventory_item):
+    """Test that an unchanged menu is answered with 304 Not Modified."""
+    client.get(reverse('menu_app:menu_list'))  # First visit issues the CSRF cookie
+    response = client.get(reverse('menu_app:menu_list'))
+    assert response.status_code == 200
+    etag = response['ETag']
+
+    response = client.get(reverse('menu_app:menu_list'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    # Adding to the cart changes the visitor's page, so the old ETag no longer matches
+    client.post(reverse('menu_app:menu_list'), {'menu_item_id': menu_item.id, 'action': 'add'})
+    client.get(reverse('menu_app:menu_list'))  # Consume the flash message
+    response = client.get(reverse('menu_app:menu_list'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    # Pages with a cart carry a single-use checkout key, so they are never revalidated
+    assert 'ETag' not in response
+
+
+@pytest.mark.django_db
+def test_menu_fragment_cache_invalidation(
+    client, menu_item, inventory_item, django_capture_on_commit_callbacks
+):
+    """Test that cached menu sections are refreshed when the catalog changes."""
+    response = client.get(reverse('menu_app:menu_list'))
+    assert str(menu_item.price) in response.content.decode()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        menu_item.price = Decimal('12.50')
+        menu_item.save()
+
+    response = client.get(reverse('menu_app:menu_list'))
+    assert '12.50' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_menu_catalog_edge_cache_headers(client, menu_item, inventory_item):
+    """Test that the public catalog is marked cacheable for the edge cache."""
+    response = client.get(reverse('menu_app:menu_catalog'))
+    assert response.status_code == 200
+    data = response.json()
+    assert data['items'][0]['name'] == menu_item.name
+    assert data['items'][0]['available'] is True
+    assert 's-maxage' in response['Cache-Control']
+    assert response['Surrogate-Key'] == 'menu-catalog'
+
+    # The versioned URL never changes content, so it may be cached indefinitely
+    response = client.get(reverse('menu_app:menu_catalog'), {'v': data['version']})
+    assert 'immutable' in response['Cache-Control']
+
+    response = client.get(reverse('menu_app:menu_catalog_category', args=['main']))
+    assert response['Surrogate-Key'] == 'menu-catalog menu-category-main'
+
+
+@pytest.mark.django_db
+def test_cart_migrates_from_session(client, menu_item, inventory_item):
+    """Test that a cart left in the session is moved into the cart cookie."""
+    session = client.session
+    session['cart'] = {str(menu_item.id): 3}
+    session.save()
+
+    client.post(reverse('menu_app:menu_list'), {'menu_item_id': menu_item.id, 'action': 'add'})
+
+    assert get_cart(client)[str(menu_item.id)] == 4
+    assert 'cart' not in client.session
+
+
+@pytest.mark.django_db
+def test_cart_size_limit(client, menu_item):
+    """Test that cart quantities are capped."""
+    response = client.post(
+        reverse('menu_app:menu_list'),
+        {
+            'menu_item_id': menu_item.id,
+            'action': 'update',
+            'quantity': settings.CART_MAX_QUANTITY + 1,
+        },
+        follow=True,
+    )
+    assert 'Quantity must be between' in response.content.decode()
+    assert get_cart(client) == {}
+
+
+@pytest.mark.django_db
+def test_cart_api_batch_operations(client, menu_item, inventory_item, test_data):
+    """Test applying several cart operations in one JSON request."""
+    operations = [
+        {'action': 'add', 'menu_item_id': menu_item.id},
+        {'action': 'add', 'menu_item_id': menu_item.id, 'quantity': 3},
+        {'action': 'decrease', 'menu_item_id': menu_item.id},
+    ]
+    response = client.post(
+        reverse('menu_app:cart_api'),
+        json.dumps({'operations': operations}),
+        content_type='application/json',
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data['count'] == 3
+    assert data['total'] == str(test_data['price'] * 3)
+    assert get_cart(client) == {str(menu_item.id): 3}
+
+    # An invalid operation rejects the whole batch
+    response = client.post(
+        reverse('menu_app:cart_api'),
+        json.dumps({'operations': [{'action': 'remove', 'menu_item_id': menu_item.id}, {}]}),
+        content_type='application/json',
+    )
+    assert response.status_code == 400
+    assert get_cart(client) == {str(menu_item.id): 3}
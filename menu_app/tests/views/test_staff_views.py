@@ -1,8 +1,11 @@
+from decimal import Decimal
+
 import pytest
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 
+from menu_app.models.menu_item import MenuItem
 from menu_app.models.order import Order
 from menu_app.services import inventory_service
 
@@ -55,7 +58,9 @@ def test_staff_dashboard_view(client, staff_user):
     client.login(username='staff', password=settings.STAFF_PASSWORD)
     response = client.get(reverse('menu_app:staff_dashboard'))
     assert response.status_code == 200
-    assert 'orders' in response.context
+    assert response.context['summary']['pending'] == 0
+    assert response.context['admission']['rejected_busy'] == 0
+    assert b'Checkout admission' in response.content
 
 
 @pytest.mark.django_db
@@ -110,3 +115,131 @@ def test_inventory_management_view(client, staff_user, menu_item, inventory_item
     updated_inventory = inventory_service.get_inventory(menu_item)
     assert updated_inventory is not None
     assert updated_inventory.quantity == target_quantity
+
+
+@pytest.mark.django_db
+def test_stale_edits_are_rejected(client, staff_user, menu_item, inventory_item):
+    """Test that edits made from an outdated copy report a conflict instead of overwriting."""
+    client.login(username='staff', password=settings.STAFF_PASSWORD)
+    edit = {'name': 'First Edit', 'price': '9.99', 'category': 'main', 'version': 0}
+
+    response = client.post(reverse('menu_app:staff_menu_update', args=[menu_item.id]), edit)
+    assert response.status_code == 302
+    response = client.post(
+        reverse('menu_app:staff_menu_update', args=[menu_item.id]),
+        {**edit, 'name': 'Second Edit'},
+    )
+    assert response.status_code == 409
+    assert response.context['form']['version'].value() == 1
+    menu_item.refresh_from_db()
+    assert (menu_item.name, menu_item.version) == ('First Edit', 1)
+
+    update_url = reverse('menu_app:inventory_update', args=[menu_item.id])
+    client.post(update_url, {'quantity': 20, 'version': 0})
+    client.post(update_url, {'quantity': 30, 'version': 0})
+    inventory_item.refresh_from_db()
+    assert (inventory_item.quantity, inventory_item.version) == (20, 1)
+
+
+@pytest.mark.django_db
+def test_stock_take_view(client, staff_user, menu_item, inventory_item):
+    """Test that a stock take form applies valid counts and reports the others."""
+    client.login(username='staff', password=settings.STAFF_PASSWORD)
+    url = reverse('menu_app:inventory_stock_take')
+    assert client.get(url).status_code == 200
+
+    response = client.post(url, {f'quantity_{menu_item.id}': 'ten'})
+    assert response.status_code == 400
+    [row] = response.context['rows']
+    assert (row['entered'], row['error']) == ('ten', 'Enter a whole number')
+
+    # A count whose version cannot be read is not applied without its conflict check
+    response = client.post(url, {f'quantity_{menu_item.id}': '25', f'version_{menu_item.id}': 'x'})
+    assert response.status_code == 400
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity != 25
+
+    response = client.post(url, {f'quantity_{menu_item.id}': '25', f'version_{menu_item.id}': 0})
+    assert response.status_code == 302
+    inventory_item.refresh_from_db()
+    assert inventory_item.quantity == 25
+
+
+@pytest.mark.django_db
+def test_kitchen_queue_view(client, staff_user, order):
+    """Test claiming and completing orders from the kitchen queue."""
+    client.login(username='staff', password=settings.STAFF_PASSWORD)
+
+    response = client.get(reverse('menu_app:kitchen_queue'), {'station': 'grill'})
+    assert response.status_code == 200
+    assert response.context['waiting_count'] == 1
+
+    client.post(reverse('menu_app:kitchen_queue'), {'station': 'grill', 'action': 'claim'})
+    response = client.get(reverse('menu_app:kitchen_queue'), {'station': 'grill'})
+    assert [o.id for o in response.context['orders']] == [order.id]
+
+    client.post(
+        reverse('menu_app:kitchen_queue'),
+        {'station': 'grill', 'action': 'complete', 'order_ids': [order.id]},
+    )
+    order.refresh_from_db()
+    assert order.status == 'completed'
+
+
+@pytest.mark.django_db
+def test_bulk_menu_views(client, staff_user, menu_item):
+    """Test the bulk add, category price change and bulk delete forms."""
+    client.login(username='staff', password=settings.STAFF_PASSWORD)
+
+    url = reverse('menu_app:staff_menu_bulk_create')
+    response = client.post(url, {'items': 'Soup, 4.50, appetizer\nBroken, cheap, main'})
+    assert response.status_code == 400
+    assert 'Broken, cheap' in response.context['items']
+    response = client.post(url, {'items': 'Soup, 4.50, appetizer\n"Fish, chips", 9, main\n'})
+    assert response.status_code == 302
+    assert MenuItem.objects.filter(name__in=['Soup', 'Fish, chips']).count() == 2
+
+    client.post(
+        reverse('menu_app:staff_menu_bulk_price'),
+        {'category': 'appetizer', 'mode': 'amount', 'value': '0.50'},
+    )
+    assert MenuItem.objects.get(name='Soup').price == Decimal('5.00')
+
+    ids = list(MenuItem.objects.exclude(id=menu_item.id).values_list('id', flat=True))
+    response = client.post(reverse('menu_app:staff_menu_bulk_delete'), {'menu_ids': ids})
+    assert response.status_code == 302
+    assert list(MenuItem.objects.values_list('id', flat=True)) == [menu_item.id]
+
+
+@pytest.mark.django_db
+def test_profiled_request(client, staff_user, menu_item):
+    """Test that staff can profile a request and inspect the result."""
+    response = client.get(reverse('menu_app:menu_list'), {'profile': 1})
+    assert 'X-Profile-Id' not in response
+    # Requests without the flag never read the session, so shared responses stay shared
+    response = client.get(reverse('menu_app:menu_catalog'))
+    assert 'Cookie' not in response.get('Vary', '')
+
+    client.login(username='staff', password=settings.STAFF_PASSWORD)
+    response = client.get(reverse('menu_app:menu_list'), {'profile': 1})
+    profile_id = response['X-Profile-Id']
+
+    response = client.get(reverse('menu_app:staff_profile_list'))
+    assert [p['id'] for p in response.context['profiles']] == [profile_id]
+    response = client.get(reverse('menu_app:staff_profile_detail', args=[profile_id]))
+    assert response.context['profile']['path'] == '/menu/?profile=1'
+    response = client.get(reverse('menu_app:staff_profile_stacks', args=[profile_id]))
+    assert response['Content-Type'].startswith('text/plain')
+    assert client.get(reverse('menu_app:staff_profile_detail', args=['gone'])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_order_stream_turns_away_beyond_limit(client, staff_user, settings):
+    """Test that a process refuses streams once it serves as many as it may."""
+    settings.ORDER_STREAM_MAX_STREAMS = 0
+    client.login(username='staff', password=settings.STAFF_PASSWORD)
+
+    response = client.get(reverse('menu_app:staff_order_stream'))
+    assert response.status_code == 503
+    assert response['Retry-After'] == str(settings.ORDER_STREAM_BUSY_RETRY)
+    assert response.content.startswith(b'retry: ')
@@ -7,6 +7,13 @@ app_name = 'menu_app'
 urlpatterns = [
     # Customer URLs
     path('', customer_views.MenuListView.as_view(), name='menu_list'),
+    path('cart/', customer_views.CartApiView.as_view(), name='cart_api'),
+    path('catalog.json', customer_views.MenuCatalogView.as_view(), name='menu_catalog'),
+    path(
+        'catalog/<str:category>.json',
+        customer_views.MenuCatalogView.as_view(),
+        name='menu_catalog_category',
+    ),
     # Staff URLs
     path('staff/', staff_views.StaffRootRedirectView.as_view(), name='staff_root'),
     path('staff/login/', staff_views.StaffLoginView.as_view(), name='staff_login'),
@@ -14,6 +21,21 @@ urlpatterns = [
     path('staff/dashboard/', staff_views.StaffDashboardView.as_view(), name='staff_dashboard'),
     path('staff/menu/', staff_views.StaffMenuListView.as_view(), name='staff_menu_list'),
     path('staff/menu/create/', staff_views.StaffMenuCreateView.as_view(), name='staff_menu_create'),
+    path(
+        'staff/menu/bulk-create/',
+        staff_views.StaffMenuBulkCreateView.as_view(),
+        name='staff_menu_bulk_create',
+    ),
+    path(
+        'staff/menu/bulk-price/',
+        staff_views.StaffMenuBulkPriceView.as_view(),
+        name='staff_menu_bulk_price',
+    ),
+    path(
+        'staff/menu/bulk-delete/',
+        staff_views.StaffMenuBulkDeleteView.as_view(),
+        name='staff_menu_bulk_delete',
+    ),
     path(
         'staff/menu/<int:pk>/update/',
         staff_views.StaffMenuUpdateView.as_view(),
@@ -29,16 +51,49 @@ urlpatterns = [
     path(
         'staff/inventory/low-stock/', staff_views.LowStockListView.as_view(), name='low_stock_list'
     ),
+    path(
+        'staff/inventory/stock-take/',
+        staff_views.InventoryStockTakeView.as_view(),
+        name='inventory_stock_take',
+    ),
     path(
         'staff/inventory/<int:menu_item_id>/update/',
         staff_views.InventoryUpdateView.as_view(),
         name='inventory_update',
     ),
     # Staff Order URLs
+    path('staff/kitchen/', staff_views.KitchenQueueView.as_view(), name='kitchen_queue'),
     path('staff/orders/', staff_views.StaffOrderListView.as_view(), name='staff_order_list'),
+    path(
+        'staff/orders/bulk-cancel/',
+        staff_views.StaffOrderBulkCancelView.as_view(),
+        name='staff_order_bulk_cancel',
+    ),
+    path(
+        'staff/orders/export/',
+        staff_views.StaffOrderExportView.as_view(),
+        name='staff_order_export',
+    ),
+    path(
+        'staff/orders/stream/',
+        staff_views.StaffOrderStreamView.as_view(),
+        name='staff_order_stream',
+    ),
     path(
         'staff/orders/<int:pk>/',
         staff_views.StaffOrderDetailView.as_view(),
         name='staff_order_detail',
     ),
+    # Staff profiling URLs
+    path('staff/profiles/', staff_views.StaffProfileListView.as_view(), name='staff_profile_list'),
+    path(
+        'staff/profiles/<str:profile_id>/',
+        staff_views.StaffProfileDetailView.as_view(),
+        name='staff_profile_detail',
+    ),
+    path(
+        'staff/profiles/<str:profile_id>/stacks.folded',
+        staff_views.StaffProfileStacksView.as_view(),
+        name='staff_profile_stacks',
+    ),
 ]
@@ -1,9 +1,62 @@
+import hashlib
+import json
+
+from django.conf import settings
 from django.contrib import messages
+from django.http import Http404, JsonResponse
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic import ListView
 
 from menu_app.models.menu_item import MenuItem
-from menu_app.services import menu_service, order_service
+from menu_app.services import (
+    cache_service,
+    cart_service,
+    idempotency_service,
+    menu_service,
+    order_service,
+)
+from menu_app.views.http_cache import edge_cacheable
+
+
+def _has_pending_messages(request):
+    """Pages carrying flash messages are one-off and must always be rendered."""
+    return len(messages.get_messages(request)) > 0
+
+
+def _menu_etag(request, *args, **kwargs):
+    """
+    ETag for the menu page, built from the cache versions, the category filter and the
+    visitor's CSRF cookie, which the page embeds.
+    Pages with a cart carry a fresh checkout key, so they are always rendered: a
+    cached page would resubmit a key that was already used.
+    """
+    if _has_pending_messages(request) or cart_service.get_cart(request):
+        return None
+
+    versions = cache_service.get_menu_versions()
+    parts = [
+        versions['catalog'],
+        versions['availability'],
+        request.GET.get('category', ''),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ]
+    return hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()[:32]
+
+
+def _menu_last_modified(request, *args, **kwargs):
+    """
+    Last-Modified only describes the shared catalog, so it is omitted for visitors
+    whose page also carries a cart or flash messages.
+    """
+    if _has_pending_messages(request) or cart_service.get_cart(request):
+        return None
+    return cache_service.get_menu_last_modified()
 
 
 class MenuListView(ListView):
@@ -13,113 +66,208 @@ class MenuListView(ListView):
     template_name = 'menu_app/menu_list.html'
     context_object_name = 'menus'
 
+    # The page embeds the visitor's cart and CSRF token, so the edge must never share it
+    @method_decorator(cache_control(private=True))
+    @method_decorator(condition(etag_func=_menu_etag, last_modified_func=_menu_last_modified))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         category = self.request.GET.get('category')
         return menu_service.get_menu(category=category)
 
+    def get_menu_sections(self):
+        """
+        One lazily evaluated queryset per category, so sections served from the
+        fragment cache never touch the database.
+        """
+        category = self.request.GET.get('category')
+        if category:
+            category = menu_service.validate_category(category)
+
+        return [
+            {
+                'category': code,
+                'label': label,
+                'items': menu_service.with_stock(self.object_list.filter(category=code)),
+            }
+            for code, label in MenuItem.CATEGORY_CHOICES
+            if not category or code == category
+        ]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['categories'] = MenuItem.CATEGORY_CHOICES
+        context['menu_sections'] = self.get_menu_sections()
+        context['menu_versions'] = cache_service.get_menu_versions()
+        context['menu_cache_timeout'] = settings.MENU_CACHE_TIMEOUT
+        context['catalog_url'] = (
+            f'{reverse("menu_app:menu_catalog")}?v={cache_service.get_menu_version_token()}'
+        )
 
-        # Get cart from session
-        cart = self.request.session.get('cart', {})
+        # Get cart from the configured cart storage and price it in one query
+        cart = cart_service.get_cart(self.request)
         if cart:
-            # Calculate total price and get menu items
-            total_price = 0
-            cart_items = []
-            for menu_item_id, quantity in cart.items():
-                menu_item = menu_service.get_menu_item(menu_item_id=menu_item_id)
-                if menu_item:
-                    item_total = menu_item.price * quantity
-                    total_price += item_total
-                    cart_items.append(
-                        {
-                            'menu_item': menu_item,
-                            'quantity': quantity,
-                            'total_price': item_total,
-                        }
-                    )
-
-            context['cart_items'] = cart_items
-            context['cart_total'] = total_price
+            context['cart_items'], context['cart_total'] = cart_service.price_cart(cart)
+        context['cart_api_url'] = reverse('menu_app:cart_api')
+        context['checkout_key'] = idempotency_service.new_key()
 
         return context
 
     def post(self, request):
         """Handle cart actions"""
+        response = redirect('menu_app:menu_list')
         try:
             menu_item_id = request.POST.get('menu_item_id')
             action = request.POST.get('action')
 
-            # Initialize cart if not exists
-            if 'cart' not in request.session:
-                request.session['cart'] = {}
-
-            cart = request.session['cart']
+            cart = dict(cart_service.get_cart(request))
+            notice = None
 
             if action == 'add':
                 # Add item to cart
                 cart[menu_item_id] = cart.get(menu_item_id, 0) + 1
-                messages.success(request, 'Item added to cart!')
-                request.session.modified = True
+                cart_service.validate_cart(cart)
+                notice = 'Item added to cart!'
 
             elif action == 'decrease':
                 # Decrease item quantity
                 if menu_item_id in cart and cart[menu_item_id] > 1:
                     cart[menu_item_id] -= 1
-                    messages.success(request, 'Item quantity decreased!')
+                    notice = 'Item quantity decreased!'
                 elif menu_item_id in cart:
                     del cart[menu_item_id]
-                    messages.success(request, 'Item removed from cart!')
-                request.session.modified = True
+                    notice = 'Item removed from cart!'
 
             elif action == 'remove':
                 # Remove item from cart
                 if menu_item_id in cart:
                     del cart[menu_item_id]
-                    messages.success(request, 'Item removed from cart!')
-                request.session.modified = True
+                    notice = 'Item removed from cart!'
 
             elif action == 'update':
                 # Update item quantity
                 quantity = int(request.POST.get('quantity', 1))
                 if quantity > 0:
                     cart[menu_item_id] = quantity
-                    messages.success(request, 'Cart updated!')
+                    cart_service.validate_cart(cart)
+                    notice = 'Cart updated!'
                 else:
-                    del cart[menu_item_id]
-                    messages.success(request, 'Item removed from cart!')
-                request.session.modified = True
+                    cart.pop(menu_item_id, None)
+                    notice = 'Item removed from cart!'
 
             elif action == 'checkout':
                 # Create order from cart
                 if cart:
                     try:
-                        # Create new order
-                        new_order = order_service.create_order()
-
-                        # Add items to order
-                        for menu_item_id, quantity in cart.items():
-                            order_service.add_item_to_order(
-                                new_order.id, int(menu_item_id), quantity
-                            )
-
+                        order_service.checkout(
+                            cart,
+                            holder=cart_service.get_cart_holder(request),
+                            idempotency_key=(
+                                request.POST.get('idempotency_key')
+                                or request.headers.get('Idempotency-Key')
+                            ),
+                        )
                         messages.success(request, 'Order placed successfully!')
                     except Exception as e:
                         messages.error(request, f'Error processing order: {e!s}')
                     finally:
-                        # Clear cart regardless of success or failure
-                        del request.session['cart']
-                        request.session.modified = True
-                    return redirect('menu_app:menu_list')
+                        # Clear cart and release its holds regardless of success or failure
+                        cart_service.update_cart(request, response, {})
+                    return response
                 else:
                     messages.warning(request, 'Your cart is empty!')
 
-            # Save cart to session
-            request.session['cart'] = cart
-            request.session.modified = True
+            # Hold the stock and save cart to the configured storage
+            cart_service.update_cart(request, response, cart)
+            if notice:
+                messages.success(request, notice)
 
         except Exception as e:
             messages.error(request, f'Error: {e!s}')
 
-        return redirect('menu_app:menu_list')
+        return response
+
+
+def _catalog_etag(request, category=None):
+    return f'{cache_service.get_menu_version_token()}-{category or "all"}'
+
+
+def _catalog_surrogate_keys(request, category=None):
+    keys = ['menu-catalog']
+    if category:
+        keys.append(f'menu-category-{category}')
+    return keys
+
+
+class MenuCatalogView(View):
+    """
+    Public JSON catalog of the menu, safe to serve from the edge cache.
+    It never reads the session, so the response is identical for every visitor.
+    """
+
+    @method_decorator(edge_cacheable(_catalog_surrogate_keys, cache_service.get_menu_version_token))
+    @method_decorator(condition(etag_func=_catalog_etag))
+    def get(self, request, category=None):
+        try:
+            items = menu_service.get_catalog(category=category)
+        except ValueError as e:
+            raise Http404(str(e))
+        return JsonResponse({'version': cache_service.get_menu_version_token(), 'items': items})
+
+
+class CartApiView(View):
+    """
+    JSON cart API. POST applies a batch of cart operations in one request and
+    returns the priced cart, so the menu page can update the cart in place.
+    """
+
+    def _cart_response(self, request, cart, hold_stock=False):
+        cart_items, cart_total = cart_service.price_cart(cart)
+        html = render_to_string(
+            'menu_app/partials/cart.html',
+            {
+                'cart_items': cart_items,
+                'cart_total': cart_total,
+                'checkout_key': idempotency_service.new_key(),
+            },
+            request=request,
+        )
+        response = JsonResponse(
+            {
+                'items': [
+                    {
+                        'menu_item_id': item['menu_item'].id,
+                        'name': item['menu_item'].name,
+                        'price': str(item['menu_item'].price),
+                        'quantity': item['quantity'],
+                        'total_price': str(item['total_price']),
+                    }
+                    for item in cart_items
+                ],
+                'total': str(cart_total),
+                'count': sum(item['quantity'] for item in cart_items),
+                'html': html,
+            }
+        )
+        # Persist the new cart, dropping items that are no longer on the menu
+        priced_cart = {str(item['menu_item'].id): item['quantity'] for item in cart_items}
+        if priced_cart != cart_service.get_cart(request):
+            if hold_stock:
+                cart_service.update_cart(request, response, priced_cart)
+            else:
+                cart_service.save_cart(request, response, priced_cart)
+        return response
+
+    def get(self, request):
+        return self._cart_response(request, cart_service.get_cart(request))
+
+    def post(self, request):
+        try:
+            payload = json.loads(request.body)
+            cart = cart_service.apply_operations(
+                cart_service.get_cart(request), payload.get('operations')
+            )
+            return self._cart_response(request, cart, hold_stock=True)
+        except (ValueError, AttributeError) as e:
+            return JsonResponse({'error': str(e)}, status=400)
@@ -0,0 +1,60 @@
+"""
+HTTP caching headers for responses that can be shared by an edge cache (nginx).
+"""
+
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+# Long enough to outlive any deploy; versioned URLs change whenever the menu does
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def _is_shareable(response) -> bool:
+    """A response is shareable only if nothing in it depends on the visitor's cookies."""
+    if response.status_code not in (200, 304) or response.cookies:
+        return False
+    vary = {header.strip().lower() for header in response.get('Vary', '').split(',')}
+    return 'cookie' not in vary
+
+
+def edge_cacheable(surrogate_keys, current_version):
+    """
+    Mark anonymous responses as cacheable by the edge cache.
+
+    Requests whose ``v`` query parameter matches ``current_version()`` are cached
+    as immutable, since a menu change produces a new URL. Unversioned requests are
+    cached for ``EDGE_CACHE_TTL`` seconds and then revalidated against the ETag.
+
+    Args:
+        surrogate_keys: Callable returning the surrogate keys for a request
+        current_version: Callable returning the current version token
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            if not _is_shareable(response):
+                patch_cache_control(response, private=True)
+                return response
+
+            if request.GET.get('v') == current_version():
+                patch_cache_control(
+                    response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+                )
+            else:
+                patch_cache_control(
+                    response,
+                    public=True,
+                    max_age=0,
+                    s_maxage=settings.EDGE_CACHE_TTL,
+                    stale_while_revalidate=settings.EDGE_CACHE_TTL,
+                )
+            response['Surrogate-Key'] = ' '.join(surrogate_keys(request, *args, **kwargs))
+            return response
+
+        return wrapper
+
+    return decorator
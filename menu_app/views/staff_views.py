@@ -1,12 +1,22 @@
+import csv
+import io
+import json
 import logging
+import queue
+import time
+from decimal import Decimal, InvalidOperation
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
 from django.views import View
 from django.views.generic import (
     CreateView,
@@ -20,7 +30,18 @@ from menu_app.forms import MenuForm
 from menu_app.models.inventory import InventoryItem
 from menu_app.models.menu_item import MenuItem
 from menu_app.models.order import Order
-from menu_app.services import inventory_service, menu_service, order_service
+from menu_app.services import (
+    admission_service,
+    dashboard_service,
+    db_utils,
+    export_service,
+    inventory_service,
+    kitchen_service,
+    menu_service,
+    order_service,
+    order_stream,
+    profiling_service,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -69,9 +90,14 @@ class StaffDashboardView(LoginRequiredMixin, View):
         if not request.user.is_staff:
             return redirect('menu_app:staff_login')
 
-        # Get all orders for the dashboard
-        orders = order_service.get_all_orders()
-        return render(request, self.template_name, {'orders': orders})
+        return render(
+            request,
+            self.template_name,
+            {
+                'summary': dashboard_service.get_summary(),
+                'admission': admission_service.get_metrics(),
+            },
+        )
 
 
 # Staff views
@@ -148,9 +174,22 @@ class StaffMenuUpdateView(LoginRequiredMixin, UpdateView):
                 name=form.cleaned_data['name'],
                 price=form.cleaned_data['price'],
                 category=form.cleaned_data['category'],
+                expected_version=form.cleaned_data['version'],
             )
             messages.success(self.request, 'Menu item updated successfully.')
             return redirect(self.success_url)
+        except db_utils.VersionConflictError:
+            # Show the current values so the editor can reapply their change to them
+            self.object.refresh_from_db()
+            messages.warning(
+                self.request,
+                'This menu item was changed by someone else. Your changes were not saved; '
+                'review the current values and try again.',
+            )
+            return self.render_to_response(
+                self.get_context_data(form=self.get_form_class()(instance=self.object)),
+                status=409,
+            )
         except Exception as e:
             messages.error(self.request, f'Error updating menu item: {e!s}')
             return self.form_invalid(form)
@@ -179,6 +218,93 @@ class StaffMenuDeleteView(LoginRequiredMixin, DeleteView):
             return redirect(self.success_url)
 
 
+class StaffMenuBulkCreateView(LoginRequiredMixin, View):
+    """View for staff to add many menu items at once, one per line"""
+
+    template_name = 'menu_app/staff/menu_bulk_create.html'
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+        return render(request, self.template_name)
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+
+        text = request.POST.get('items', '')
+        try:
+            items = []
+            for line_number, row in enumerate(csv.reader(io.StringIO(text)), start=1):
+                if not row or not ''.join(row).strip():
+                    continue
+                if len(row) != 3:
+                    raise ValueError(f'Line {line_number}: expected name, price, category')
+                name, price, category = (value.strip() for value in row)
+                try:
+                    price = Decimal(price)
+                except InvalidOperation:
+                    raise ValueError(f'Line {line_number}: invalid price {price!r}')
+                items.append({'name': name, 'price': price, 'category': category})
+
+            created = menu_service.bulk_add_menu_items(items)
+            messages.success(request, f'Created {len(created)} menu items.')
+            return redirect('menu_app:staff_menu_list')
+        except Exception as e:
+            messages.error(request, f'Error creating menu items: {e!s}')
+            return render(request, self.template_name, {'items': text}, status=400)
+
+
+class StaffMenuBulkPriceView(LoginRequiredMixin, View):
+    """View for staff to change the prices of a whole category"""
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+
+        category = request.POST.get('category', '')
+        try:
+            value = Decimal(request.POST.get('value', ''))
+            if request.POST.get('mode') == 'percent':
+                repriced = menu_service.adjust_category_prices(category, percent=value)
+            else:
+                repriced = menu_service.adjust_category_prices(category, amount=value)
+            messages.success(request, f'Updated prices of {repriced} menu items.')
+        except InvalidOperation:
+            messages.error(request, 'Enter a number for the price change.')
+        except Exception as e:
+            messages.error(request, f'Error updating prices: {e!s}')
+
+        return redirect(
+            f'{reverse("menu_app:staff_menu_list")}?{urlencode({"category": category})}'
+        )
+
+
+class StaffMenuBulkDeleteView(LoginRequiredMixin, View):
+    """View for staff to delete several menu items at once"""
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+
+        try:
+            menu_item_ids = [int(menu_item_id) for menu_item_id in request.POST.getlist('menu_ids')]
+            if not menu_item_ids:
+                messages.warning(request, 'No menu items selected.')
+                return redirect('menu_app:staff_menu_list')
+
+            deleted, kept = menu_service.delete_menu_items(menu_item_ids)
+            messages.success(request, f'Deleted {deleted} menu items.')
+            if kept:
+                messages.warning(
+                    request, f'{len(kept)} menu items appear in orders and were not deleted.'
+                )
+        except Exception as e:
+            messages.error(request, f'Error deleting menu items: {e!s}')
+
+        return redirect('menu_app:staff_menu_list')
+
+
 # Inventory Management Views
 class InventoryListView(LoginRequiredMixin, ListView):
     """View for staff to manage inventory"""
@@ -209,8 +335,7 @@ class LowStockListView(LoginRequiredMixin, ListView):
         return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
-        threshold = int(self.request.GET.get('threshold', 10))
-        return inventory_service.get_low_stock_items(threshold)
+        return inventory_service.get_low_stock_items()
 
 
 class InventoryUpdateView(LoginRequiredMixin, View):
@@ -223,14 +348,19 @@ class InventoryUpdateView(LoginRequiredMixin, View):
         try:
             menu_item = MenuItem.objects.get(id=menu_item_id)
             quantity = int(request.POST.get('quantity', 0))
+            version = request.POST.get('version')
 
-            # Calculate quantity change from current inventory
-            current_inventory = inventory_service.get_inventory(menu_item)
-            current_quantity = current_inventory.quantity if current_inventory else 0
-            quantity_change = quantity - current_quantity
-
-            inventory_service.update_inventory(menu_item, quantity_change)
+            # The counted quantity becomes the new stock snapshot
+            inventory_service.set_stock(
+                menu_item, quantity, expected_version=int(version) if version else None
+            )
             messages.success(request, f'Inventory updated for {menu_item.name}')
+        except db_utils.VersionConflictError:
+            messages.warning(
+                request,
+                f'Stock for {menu_item.name} was counted by someone else in the meantime. '
+                'Your count was not saved; check the current stock and try again.',
+            )
         except MenuItem.DoesNotExist:
             messages.error(request, 'Menu item not found')
         except ValueError as e:
@@ -241,6 +371,87 @@ class InventoryUpdateView(LoginRequiredMixin, View):
         return redirect('menu_app:inventory_list')
 
 
+class InventoryStockTakeView(LoginRequiredMixin, View):
+    """View for staff to enter a stock count for many items in one submission"""
+
+    template_name = 'menu_app/staff/inventory_stock_take.html'
+
+    def _render(self, request, entered=None, errors=None, status=200):
+        entered = entered or {}
+        errors = errors or {}
+        rows = [
+            {
+                'item': item,
+                'entered': entered.get(item.menu_item_id, ''),
+                'error': errors.get(item.menu_item_id),
+            }
+            for item in inventory_service.get_all_inventory_items()
+        ]
+        return render(request, self.template_name, {'rows': rows}, status=status)
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+        return self._render(request)
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+
+        # Only the rows that were filled in are counted
+        entered = {}
+        counts = {}
+        versions = {}
+        errors = {}
+        for key, value in request.POST.items():
+            if not key.startswith('quantity_') or not value.strip():
+                continue
+            try:
+                menu_item_id = int(key.removeprefix('quantity_'))
+            except ValueError:
+                continue
+            entered[menu_item_id] = value
+            version = request.POST.get(f'version_{menu_item_id}')
+            # Both values are parsed before either is recorded, so a row with a bad
+            # version is never counted without its conflict check
+            try:
+                count = int(value)
+            except ValueError:
+                errors[menu_item_id] = 'Enter a whole number'
+                continue
+            try:
+                version = int(version) if version else None
+            except ValueError:
+                errors[menu_item_id] = 'Reload the page and enter this count again'
+                continue
+            counts[menu_item_id] = count
+            if version is not None:
+                versions[menu_item_id] = version
+
+        if not entered:
+            messages.warning(request, 'Enter at least one count.')
+            return self._render(request)
+
+        if counts:
+            try:
+                errors.update(inventory_service.set_stock_levels(counts, versions))
+            except Exception as e:
+                messages.error(request, f'Error applying stock take: {e!s}')
+                return self._render(request, entered, errors, status=500)
+
+        applied = len(entered) - len(errors)
+        if not errors:
+            messages.success(request, f'Stock updated for {applied} items.')
+            return redirect('menu_app:inventory_list')
+
+        if applied:
+            messages.success(request, f'Stock updated for {applied} items.')
+        messages.error(request, f'{len(errors)} counts were not applied; see below.')
+        # Keep only the failed rows filled in, so they can be corrected and resubmitted
+        failed = {menu_item_id: entered[menu_item_id] for menu_item_id in errors}
+        return self._render(request, failed, errors, status=400)
+
+
 # Order Management Views
 class StaffOrderListView(LoginRequiredMixin, ListView):
     """View for staff to view all orders"""
@@ -258,6 +469,121 @@ class StaffOrderListView(LoginRequiredMixin, ListView):
         return order_service.get_all_orders()
 
 
+class StaffOrderBulkCancelView(LoginRequiredMixin, View):
+    """View for staff to cancel several orders at once"""
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return redirect('staff_login')
+
+        try:
+            order_ids = [int(order_id) for order_id in request.POST.getlist('order_ids')]
+            if not order_ids:
+                messages.warning(request, 'No orders selected.')
+                return redirect('staff_order_list')
+
+            cancelled = order_service.cancel_orders(order_ids)
+            messages.success(request, f'Cancelled {len(cancelled)} orders.')
+            skipped = len(set(order_ids)) - len(cancelled)
+            if skipped:
+                messages.warning(request, f'{skipped} orders were not pending and were skipped.')
+        except Exception as e:
+            messages.error(request, f'Error cancelling orders: {e!s}')
+
+        return redirect('staff_order_list')
+
+
+class StaffOrderExportView(LoginRequiredMixin, View):
+    """View for staff to download orders and their lines as CSV or JSON Lines"""
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return redirect('staff_login')
+
+        export_format = request.GET.get('format', 'csv')
+        try:
+            start_date = self._parse_date(request.GET.get('start'))
+            end_date = self._parse_date(request.GET.get('end'))
+            chunks = export_service.export_orders(
+                export_format,
+                start_date=start_date,
+                end_date=end_date,
+                status=request.GET.get('status') or None,
+            )
+        except ValueError as e:
+            messages.error(request, f'Error exporting orders: {e!s}')
+            return redirect('staff_order_list')
+
+        response = StreamingHttpResponse(
+            chunks, content_type=export_service.EXPORT_FORMATS[export_format]
+        )
+        filename = f'orders-{timezone.now():%Y%m%d}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def _parse_date(value):
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValueError(f'Invalid date: {value}')
+        return parsed
+
+
+class StaffOrderStreamView(LoginRequiredMixin, View):
+    """
+    Server-sent events stream of order changes for staff screens.
+    Every open stream shares the hub's single polling query, but holds a server
+    thread while open, so each process serves at most ORDER_STREAM_MAX_STREAMS.
+    """
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return redirect('staff_login')
+
+        if order_stream.hub.subscriber_count >= settings.ORDER_STREAM_MAX_STREAMS:
+            return self.busy()
+        response = StreamingHttpResponse(self.events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Tell nginx to pass events through instead of buffering them
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def busy(self):
+        """Turn a stream away while this process serves as many as it may."""
+        response = HttpResponse(
+            f'retry: {settings.ORDER_STREAM_BUSY_RETRY * 1000}\n\n',
+            status=503,
+            content_type='text/event-stream',
+        )
+        response['Retry-After'] = settings.ORDER_STREAM_BUSY_RETRY
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    def events(self):
+        listener = order_stream.hub.subscribe(limit=settings.ORDER_STREAM_MAX_STREAMS)
+        if listener is None:
+            # Another stream took the last place since the check in get()
+            yield f'retry: {settings.ORDER_STREAM_BUSY_RETRY * 1000}\n\n'
+            return
+        deadline = time.monotonic() + settings.ORDER_STREAM_MAX_DURATION
+        try:
+            # Browsers reconnect on their own once the stream ends
+            yield f'retry: {settings.ORDER_STREAM_POLL_INTERVAL * 1000}\n\n'
+            while time.monotonic() < deadline:
+                try:
+                    event = listener.get(timeout=settings.ORDER_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    # Comment line keeping idle connections open through proxies
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+        finally:
+            order_stream.hub.unsubscribe(listener)
+
+
 class StaffOrderDetailView(LoginRequiredMixin, View):
     """View for staff to view order details"""
 
@@ -285,12 +611,8 @@ class StaffOrderDetailView(LoginRequiredMixin, View):
                 order_service.cancel_order(pk)
                 messages.success(request, 'Order cancelled successfully.')
             elif action == 'complete':
-                order = order_service.get_order(pk)
-                if order and order.status == 'pending':
-                    order.complete()
-                    messages.success(request, 'Order completed successfully.')
-                else:
-                    messages.error(request, 'Cannot complete a non-pending order.')
+                order_service.complete_order(pk)
+                messages.success(request, 'Order completed successfully.')
             else:
                 messages.error(request, 'Invalid action.')
         except Exception as e:
@@ -299,6 +621,111 @@ class StaffOrderDetailView(LoginRequiredMixin, View):
         return redirect('staff_order_list')
 
 
+class KitchenQueueView(LoginRequiredMixin, View):
+    """View for kitchen stations to claim and complete orders"""
+
+    template_name = 'menu_app/staff/kitchen_queue.html'
+    default_station = 'kitchen'
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return redirect('staff_login')
+
+        station = request.GET.get('station', self.default_station)
+        try:
+            orders = kitchen_service.get_station_orders(station)
+        except ValueError as e:
+            messages.error(request, str(e))
+            station, orders = self.default_station, []
+
+        context = {
+            'station': station,
+            'orders': orders,
+            'waiting_count': kitchen_service.count_waiting_orders(),
+        }
+        return render(request, self.template_name, context)
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return redirect('staff_login')
+
+        station = request.POST.get('station', self.default_station)
+        try:
+            action = request.POST.get('action')
+            order_ids = [int(order_id) for order_id in request.POST.getlist('order_ids')]
+            if action == 'claim':
+                claimed = kitchen_service.claim_next_orders(
+                    station, limit=int(request.POST.get('count', 1))
+                )
+                if claimed:
+                    messages.success(request, f'Claimed {len(claimed)} orders.')
+                else:
+                    messages.info(request, 'No orders waiting.')
+            elif action == 'complete':
+                completed = kitchen_service.complete_station_orders(station, order_ids)
+                messages.success(request, f'Completed {len(completed)} orders.')
+            elif action == 'release':
+                released = kitchen_service.release_station_orders(station, order_ids)
+                messages.success(request, f'Released {released} orders.')
+            else:
+                messages.error(request, 'Invalid action.')
+        except Exception as e:
+            messages.error(request, f'Error processing orders: {e!s}')
+
+        return redirect(f'{reverse("menu_app:kitchen_queue")}?{urlencode({"station": station})}')
+
+
+class StaffProfileListView(LoginRequiredMixin, View):
+    """View for staff to list recent request profiles"""
+
+    template_name = 'menu_app/staff/profile_list.html'
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+        return render(
+            request,
+            self.template_name,
+            {
+                'profiles': profiling_service.get_recent_profiles(),
+                'sample_rate': settings.PROFILING_SAMPLE_RATE,
+            },
+        )
+
+
+class StaffProfileDetailView(LoginRequiredMixin, View):
+    """View for staff to inspect one request profile"""
+
+    template_name = 'menu_app/staff/profile_detail.html'
+
+    def get(self, request, profile_id):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+
+        profile = profiling_service.get_profile(profile_id)
+        if profile is None:
+            raise Http404('Profile not found or expired')
+        return render(request, self.template_name, {'profile': profile})
+
+
+class StaffProfileStacksView(LoginRequiredMixin, View):
+    """
+    View for staff to download a profile's sampled stacks in collapsed format,
+    as read by flamegraph.pl and speedscope
+    """
+
+    def get(self, request, profile_id):
+        if not request.user.is_staff:
+            return redirect('menu_app:staff_login')
+
+        profile = profiling_service.get_profile(profile_id)
+        if profile is None:
+            raise Http404('Profile not found or expired')
+        response = HttpResponse(profile['collapsed'], content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.folded"'
+        return response
+
+
 class StaffLogoutView(View):
     """View for staff logout"""
 
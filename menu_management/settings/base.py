@@ -25,6 +25,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Needs request.user, so it runs after authentication
+    'menu_app.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,5 +83,67 @@ STATICFILES_DIRS = [
 # Create static directory if it doesn't exist
 os.makedirs(os.path.join(BASE_DIR, 'static'), exist_ok=True)
 
+# Caching
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Menu fragments are keyed by catalog/availability versions, so this is only an upper bound
+MENU_CACHE_TIMEOUT = 60 * 60
+
+# How long the edge cache (nginx) may serve unversioned catalog URLs before revalidating
+EDGE_CACHE_TTL = 10
+
+# Cart storage: 'signed_cookie' keeps carts out of the database, 'session' uses SESSION_ENGINE
+CART_STORAGE = 'signed_cookie'
+CART_COOKIE_NAME = 'cart'
+CART_COOKIE_AGE = 60 * 60 * 24 * 7
+CART_MAX_ITEMS = 50
+CART_MAX_QUANTITY = 99
+# Stock added to a cart is held for this long after the cart was last changed
+CART_RESERVATION_TTL = 15 * 60
+CART_HOLDER_COOKIE_NAME = 'cart_holder'
+
+# Sharded stock: shard totals are cached briefly, as exact sums are only needed to sell
+INVENTORY_SHARD_TOTAL_TIMEOUT = 2
+
+# Checkout admission: concurrent checkouts allowed per menu item (per process, and
+# across processes on PostgreSQL), how long a checkout waits for a slot, and how long
+# the sold-out set may be cached between availability changes
+CHECKOUT_ITEM_CONCURRENCY = 4
+CHECKOUT_ADMISSION_TIMEOUT = 2
+CHECKOUT_SOLD_OUT_TIMEOUT = 60
+# Repeated checkout submissions return the first order for this long
+CHECKOUT_IDEMPOTENCY_TTL = 24 * 60 * 60
+
+# Seconds before an order claimed by a kitchen station returns to the queue
+KITCHEN_CLAIM_TIMEOUT = 15 * 60
+
+# Staff order stream: one shared poll per interval, streams closed after a while so
+# workers are recycled (browsers reconnect automatically)
+ORDER_STREAM_POLL_INTERVAL = 2
+ORDER_STREAM_HEARTBEAT = 15
+ORDER_STREAM_MAX_DURATION = 5 * 60
+# Each open stream holds a gunicorn thread for up to ORDER_STREAM_MAX_DURATION, so a
+# process serves at most this many (half the default 4 GUNICORN_THREADS) and keeps
+# the rest for customers; further screens get a 503 and retry after
+# ORDER_STREAM_BUSY_RETRY seconds. Raise it together with GUNICORN_THREADS.
+ORDER_STREAM_MAX_STREAMS = 2
+ORDER_STREAM_BUSY_RETRY = 10
+# Seconds each poll looks back for orders whose transaction committed after their
+# updated_at; keep it above the longest transaction that writes orders
+ORDER_STREAM_POLL_OVERLAP = 60
+
+# Seconds the staff dashboard summary may be cached between order changes
+DASHBOARD_SUMMARY_TIMEOUT = 5
+
+# Request profiling: share of all requests profiled at random (staff can also ask
+# with ?profile=1), stack sampling interval in seconds, and how long profiles are kept
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_SAMPLE_INTERVAL = 0.005
+PROFILING_TTL = 60 * 60
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'